@@ -0,0 +1,73 @@
+import time
+
+# === Snapshot configuration ===
+ACCOUNT_TTL = 15.0  # Seconds a fetched account listing stays valid
+
+
+def available_value(account):
+    """Available balance of an account, whether the SDK gives an object or a dict"""
+    available_balance_obj = getattr(account, 'available_balance', {})
+    if hasattr(available_balance_obj, 'value'):
+        available_balance = getattr(available_balance_obj, 'value', '0')
+    else:
+        available_balance = available_balance_obj.get('value', '0') if isinstance(available_balance_obj, dict) else '0'
+    return float(available_balance) if available_balance else 0.0
+
+
+class AccountSnapshot:
+    """One get_accounts listing indexed by currency, shared by every balance lookup.
+
+    The listing is refetched once it is older than `ttl`, or on the next lookup
+    after invalidate(), which adjust() calls when it can't tell whether the
+    listing already includes a fill.
+    """
+
+    def __init__(self, client, ttl=ACCOUNT_TTL, clock=time.monotonic):
+        self.client = client
+        self.ttl = ttl
+        self.clock = clock
+        self.balances = {}
+        self._fetched_at = None
+
+    def refresh(self):
+        """Fetch every account page and rebuild the currency -> balance index"""
+        balances = {}
+        cursor = None
+        while True:
+            response = self.client.get_accounts(cursor=cursor) if cursor else self.client.get_accounts()
+            for account in response.accounts:
+                currency = getattr(account, 'currency', '')
+                balances.setdefault(currency, available_value(account))
+            cursor = getattr(response, 'cursor', None)
+            if not getattr(response, 'has_next', False) or not cursor:
+                break
+        self.balances = balances
+        self._fetched_at = self.clock()
+        return balances
+
+    def adjust(self, currency, delta, since=None):
+        """Apply a known balance change (e.g. an order fill) without refetching.
+
+        Skipped when the snapshot was fetched after `since`: that listing may
+        or may not include the change, so it is invalidated and the next
+        lookup refetches instead of guessing. Also skipped while invalidated.
+        """
+        if self._fetched_at is None:
+            return  # The next lookup refetches anyway
+        if since is not None and self._fetched_at > since:
+            self.invalidate()
+            return
+        self.balances[currency] = self.balances.get(currency, 0.0) + delta
+
+    def invalidate(self):
+        self._fetched_at = None
+
+    @property
+    def stale(self):
+        return self._fetched_at is None or self.clock() - self._fetched_at > self.ttl
+
+    def balance(self, currency):
+        """Available balance for a currency, refreshing the snapshot if it is stale"""
+        if self.stale:
+            self.refresh()
+        return self.balances.get(currency, 0.0)
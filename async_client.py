@@ -0,0 +1,187 @@
+import json
+import asyncio
+import threading
+from urllib.parse import urlencode, quote
+from signing import shared_signer
+
+# === Async client configuration ===
+BASE_URL = "https://api.coinbase.com"
+API_PREFIX = "/api/v3/brokerage"
+POOL_SIZE = 16  # Keep-alive connections shared by all in-flight requests
+KEEPALIVE_TIMEOUT = 60  # Seconds an idle pooled connection stays open
+REQUEST_TIMEOUT = 10
+
+
+class AdvancedTradeError(Exception):
+    """Non-2xx answer from the API; `status` is the HTTP status code"""
+
+    def __init__(self, status, method, path, body):
+        super().__init__(f"{status} {method} {path}: {body}")
+        self.status = status
+        self.status_code = status  # Read by rate_limit.is_rate_limited
+        self.body = body
+
+
+class Record(dict):
+    """JSON object readable both as a dict and by attribute, like the SDK's responses"""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+
+def _decode(text):
+    return json.loads(text, object_hook=Record) if text else Record()
+
+
+class AsyncAdvancedTradeClient:
+    """asyncio client for the Advanced Trade REST API over one pooled keep-alive session.
+
+    Requests are signed by the shared signer (cached JWTs), bodies are sent
+    as compact JSON and answers decoded into Records, so code written against
+    the SDK's attribute access keeps working. Any number of requests can be
+    awaited together (see get_candles_many); they share up to `pool_size`
+    warm connections instead of opening one each.
+
+        async with AsyncAdvancedTradeClient(api_key, api_secret) as client:
+            product, accounts = await asyncio.gather(client.get_product("SOL-EUR"), client.get_accounts())
+    """
+
+    def __init__(self, api_key=None, api_secret=None, base_url=BASE_URL, signer=None, pool_size=POOL_SIZE,
+                 timeout=REQUEST_TIMEOUT):
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = base_url.rstrip('/')
+        self.signer = signer or (shared_signer(api_key, api_secret) if api_key else None)
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+
+    # === Session ===
+    async def start(self):
+        if self._session is None or self._session.closed:
+            import aiohttp
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=KEEPALIVE_TIMEOUT,
+                                             ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def request(self, method, path, params=None, body=None):
+        """Signed request to API_PREFIX + path; returns the decoded JSON answer"""
+        if self._session is None:
+            await self.start()
+        path = API_PREFIX + path
+        if params:
+            query = urlencode({key: value for key, value in params.items() if value is not None}, doseq=True)
+            path = f"{path}?{query}" if query else path
+        data = json.dumps(body, separators=(",", ":")) if body is not None else ""
+        headers = (self.signer.headers(method, path, data) if self.signer is not None
+                   else {"Content-Type": "application/json"})
+        async with self._session.request(method, self.base_url + path, data=data or None,
+                                         headers=headers) as response:
+            text = await response.text()
+            if response.status >= 400:
+                raise AdvancedTradeError(response.status, method, path, text)
+        return _decode(text)
+
+    # === Accounts ===
+    async def get_accounts(self, limit=None, cursor=None):
+        return await self.request("GET", "/accounts", {"limit": limit, "cursor": cursor})
+
+    async def get_account(self, account_uuid):
+        return await self.request("GET", f"/accounts/{account_uuid}")
+
+    # === Products and market data ===
+    async def get_products(self, **params):
+        return await self.request("GET", "/products", params)
+
+    async def get_product(self, product_id):
+        return await self.request("GET", f"/products/{quote(product_id)}")
+
+    async def get_best_bid_ask(self, product_ids=None):
+        return await self.request("GET", "/best_bid_ask", {"product_ids": product_ids})
+
+    async def get_candles(self, product_id, start, end, granularity, limit=None):
+        params = {"start": start, "end": end, "granularity": granularity, "limit": limit}
+        return await self.request("GET", f"/products/{quote(product_id)}/candles", params)
+
+    async def get_candles_many(self, product_ids, start, end, granularity, limit=None):
+        """{product_id: candles response}, fetched concurrently over the pool"""
+        responses = await asyncio.gather(*(self.get_candles(product_id, start, end, granularity, limit)
+                                           for product_id in product_ids))
+        return dict(zip(product_ids, responses))
+
+    # === Orders ===
+    async def create_order(self, client_order_id, product_id, side, order_configuration):
+        return await self.request("POST", "/orders", body={
+            "client_order_id": client_order_id,
+            "product_id": product_id,
+            "side": side,
+            "order_configuration": order_configuration,
+        })
+
+    async def market_order_buy(self, client_order_id, product_id, quote_size):
+        return await self.create_order(client_order_id, product_id, "BUY",
+                                       {"market_market_ioc": {"quote_size": str(quote_size)}})
+
+    async def market_order_sell(self, client_order_id, product_id, base_size):
+        return await self.create_order(client_order_id, product_id, "SELL",
+                                       {"market_market_ioc": {"base_size": str(base_size)}})
+
+    async def limit_order_gtc(self, client_order_id, product_id, side, base_size, limit_price, post_only=False):
+        return await self.create_order(client_order_id, product_id, side, {"limit_limit_gtc": {
+            "base_size": str(base_size), "limit_price": str(limit_price), "post_only": post_only}})
+
+    async def cancel_orders(self, order_ids):
+        return await self.request("POST", "/orders/batch_cancel", body={"order_ids": list(order_ids)})
+
+    async def get_order(self, order_id):
+        return await self.request("GET", f"/orders/historical/{order_id}")
+
+    async def list_orders(self, **params):
+        return await self.request("GET", "/orders/historical/batch", params)
+
+
+class BlockingClient:
+    """Synchronous face of an AsyncAdvancedTradeClient, for the polling bots.
+
+    Runs the client's event loop on a daemon thread and blocks each call on
+    it, so the same pooled session can sit behind RateLimitedClient where the
+    SDK's RESTClient did.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.call(client.start)
+
+    def call(self, function, *args, **kwargs):
+        return asyncio.run_coroutine_threadsafe(function(*args, **kwargs), self.loop).result()
+
+    def __getattr__(self, name):
+        attribute = getattr(self.client, name)
+        if not asyncio.iscoroutinefunction(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            return self.call(attribute, *args, **kwargs)
+        return call
+
+    def close(self):
+        self.call(self.client.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
@@ -0,0 +1,104 @@
+import os
+import sys
+import json
+import time
+import calendar
+from concurrent.futures import ThreadPoolExecutor
+from candle_archive import CandleArchive
+from candle_store import GRANULARITY_SECONDS, MAX_CANDLES_PER_REQUEST, decode_candles
+
+# === Backfill configuration ===
+BACKFILL_WORKERS = 8  # Pages in flight at once
+PAGES_PER_CHECKPOINT = 64  # Pages written between progress checkpoints
+MARKER_FILE = "backfill.json"
+
+
+def fetch_page(client, product_id, granularity, page_start, page_end):
+    """Fetch one exchange-sized page of candles as decoded columns, limited to [page_start, page_end)"""
+    response = client.get_candles(
+        product_id=product_id,
+        start=str(page_start),
+        end=str(page_end - 1),
+        granularity=granularity,
+        limit=MAX_CANDLES_PER_REQUEST
+    )
+    columns = decode_candles(getattr(response, 'candles', None) or [])
+    starts = columns["start"]
+    keep = (starts >= page_start) & (starts < page_end)
+    return {name: column[keep] for name, column in columns.items()}
+
+
+def _load_marker(path, start, end):
+    """Where an interrupted backfill of the same range stopped, if any"""
+    try:
+        with open(path) as f:
+            marker = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if marker.get("start") == start and marker.get("end") == end:
+        return marker.get("done_until")
+    return None
+
+
+def _save_marker(path, start, end, done_until):
+    temporary = path + ".tmp"
+    with open(temporary, "w") as f:
+        json.dump({"start": start, "end": end, "done_until": done_until}, f)
+    os.replace(temporary, path)
+
+
+def backfill(client, product_id, start, end, granularity="ONE_MINUTE",
+             archive=None, workers=BACKFILL_WORKERS):
+    """Download [start, end) into the candle archive, resuming an interrupted run.
+
+    Pages are fetched concurrently but written in order, and progress is
+    checkpointed after every batch, so a restart only repeats unfinished pages.
+    """
+    archive = archive or CandleArchive()
+    seconds = GRANULARITY_SECONDS[granularity]
+    start -= start % seconds
+    page = MAX_CANDLES_PER_REQUEST * seconds
+
+    series = archive.series_dir(product_id, granularity)
+    os.makedirs(series, exist_ok=True)
+    marker = os.path.join(series, MARKER_FILE)
+    resume = _load_marker(marker, start, end) or start
+    if resume > start:
+        print(f"🔁 Resuming backfill of {product_id} from {time.strftime('%Y-%m-%d %H:%M', time.gmtime(resume))}")
+
+    pages = [(page_start, min(page_start + page, end)) for page_start in range(resume, end, page)]
+    written = 0
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for first in range(0, len(pages), PAGES_PER_CHECKPOINT):
+            batch = pages[first:first + PAGES_PER_CHECKPOINT]
+            results = pool.map(lambda bounds: fetch_page(client, product_id, granularity, *bounds), batch)
+            for columns in results:
+                written += archive.append(product_id, granularity, columns)
+            _save_marker(marker, start, end, batch[-1][1])
+            done = first + len(batch)
+            print(f"📥 {product_id}: {done}/{len(pages)} pages, {written} candles "
+                  f"({done / max(time.time() - started, 1e-9):.1f} pages/s)")
+
+    # Pages may overlap candles archived earlier (e.g. by the live bot)
+    archive.compact(product_id, granularity)
+    os.remove(marker)
+    print(f"✅ Backfilled {written} {granularity} candles for {product_id}")
+    return written
+
+
+def parse_day(value):
+    return calendar.timegm(time.strptime(value, "%Y-%m-%d"))
+
+
+# === Entry point ===
+if __name__ == "__main__":
+    if len(sys.argv) not in (4, 5):
+        print("Usage: python backfill.py <product_id> <start YYYY-MM-DD> <end YYYY-MM-DD> [granularity]")
+        sys.exit(1)
+    import momentum
+    try:
+        backfill(momentum.client, sys.argv[1], parse_day(sys.argv[2]), parse_day(sys.argv[3]),
+                 sys.argv[4] if len(sys.argv) == 5 else "ONE_MINUTE")
+    except KeyboardInterrupt:
+        print("\n🛑 Backfill interrupted, run the same command again to resume")
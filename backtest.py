@@ -0,0 +1,178 @@
+import os
+import sys
+import numpy as np
+from candle_archive import CandleArchive
+from indicators import sma_array
+from strategies import MACrossover, jit
+
+# === Backtest configuration (mirrors momentum.py) ===
+FAST_MA = 5
+SLOW_MA = 15
+EUR_AMOUNT = 10.00
+POSITION_THRESHOLD = 0.001  # SOL above which run_bot considers itself long
+INITIAL_EUR = 100.00
+FEE_RATE = 0.006  # Coinbase taker fee
+SLIPPAGE = 0.0005  # Fraction of price lost on each market fill
+
+
+def backtest(candles, fast_ma=FAST_MA, slow_ma=SLOW_MA, eur_amount=EUR_AMOUNT,
+             threshold=POSITION_THRESHOLD, initial_eur=INITIAL_EUR,
+             fee_rate=FEE_RATE, slippage=SLIPPAGE, fast=None, slow=None, state=None, strategy=None):
+    """Replay run_bot's strategy over candle columns without a per-bar loop.
+
+    `candles` is anything indexable by column name (a CandleStore, a DataFrame or
+    a dict of arrays). One decision is made per candle on its close, like the
+    live loop polling once per minute. The rule is `strategy` (see
+    strategies.py), by default MACrossover(fast_ma, slow_ma), the same code
+    run_bot trades on. Precomputed `fast`/`slow` SMAs or the long/flat
+    `state` itself can be passed in to share work across runs.
+
+    run_bot only counts itself long above `threshold` SOL. When a buy fills at
+    or below it, the next bar buys again (and a flat signal sells nothing);
+    that path depends on every earlier fill, so it is replayed bar by bar.
+    """
+    close = np.asarray(candles["close"], dtype=np.float64)
+    bars = len(close)
+    if state is None:
+        values = None
+        if strategy is None:
+            strategy = MACrossover(fast_ma, slow_ma)
+            values = {strategy.fast: sma_array(close, fast_ma) if fast is None else fast,
+                      strategy.slow: sma_array(close, slow_ma) if slow is None else slow}
+        state = strategy.state(candles, values)
+
+    long = state.copy()
+    previous = np.concatenate(([False], long[:-1]))
+    buy_bars = np.flatnonzero(long & ~previous)
+    sell_bars = np.flatnonzero(~long & previous)
+
+    # Round trip k is bought at buy_bars[k] and sold at sell_bars[k] (or still open)
+    buy_price = close[buy_bars] * (1 + slippage)
+    quantity = eur_amount * (1 - fee_rate) / buy_price
+    proceeds = quantity[:len(sell_bars)] * close[sell_bars] * (1 - slippage) * (1 - fee_rate)
+    trip_pnl = proceeds - eur_amount
+
+    # A buy with too little EUR is skipped, and while flat the balance never
+    # changes again, so every later signal is skipped too: cut trading there.
+    balance_before = initial_eur + np.concatenate(([0.0], np.cumsum(trip_pnl)))[:len(buy_bars)]
+    broke = np.flatnonzero(balance_before < eur_amount)
+    if len(broke):
+        stop = broke[0]
+        long[buy_bars[stop]:] = False
+        buy_bars, quantity = buy_bars[:stop], quantity[:stop]
+        sell_bars, proceeds, trip_pnl = sell_bars[:stop], proceeds[:stop], trip_pnl[:stop]
+
+    if np.any(quantity <= threshold):
+        return _per_bar_backtest(close, state, eur_amount, threshold, initial_eur, fee_rate, slippage)
+
+    cash_flow = np.zeros(bars)
+    cash_flow[buy_bars] -= eur_amount
+    cash_flow[sell_bars] += proceeds
+    eur = initial_eur + np.cumsum(cash_flow)
+
+    bought = np.zeros(bars, dtype=np.int64)
+    bought[buy_bars] = 1
+    trip = np.cumsum(bought) - 1
+    held = quantity[np.maximum(trip, 0)] if len(quantity) else np.zeros(bars)
+    sol = np.where(long, held, 0.0)
+
+    fees = eur_amount * fee_rate * len(buy_bars) + np.sum(proceeds / (1 - fee_rate) * fee_rate)
+    return _result(close, eur, sol, buy_bars, sell_bars, quantity, trip_pnl, fees, bool(len(broke)), 0, initial_eur)
+
+
+@jit
+def _run_bot_bars(close, long, eur_amount, threshold, initial_eur, fee_rate, slippage):
+    """run_bot one bar at a time: buy while long and holding at most `threshold`, sell while flat above it"""
+    bars = len(close)
+    eur, sol = np.empty(bars), np.empty(bars)
+    side = np.zeros(bars, dtype=np.int8)  # 1 bought, -1 sold on that bar
+    amount = np.zeros(bars)  # SOL bought or sold
+    pnl = np.zeros(bars)  # Round-trip PnL, on sell bars
+    cash, held, cost, fees, rebuys, skipped = initial_eur, 0.0, 0.0, 0.0, 0, False
+    for i in range(bars):
+        if long[i] and held <= threshold:
+            if cash >= eur_amount:
+                bought = eur_amount * (1 - fee_rate) / (close[i] * (1 + slippage))
+                if held > 0:
+                    rebuys += 1
+                held += bought
+                cash -= eur_amount
+                cost += eur_amount
+                fees += eur_amount * fee_rate
+                side[i], amount[i] = 1, bought
+            else:
+                skipped = True
+        elif not long[i] and held > threshold:
+            gross = held * close[i] * (1 - slippage)
+            fees += gross * fee_rate
+            cash += gross * (1 - fee_rate)
+            side[i], amount[i], pnl[i] = -1, held, gross * (1 - fee_rate) - cost
+            held, cost = 0.0, 0.0
+        eur[i], sol[i] = cash, held
+    return eur, sol, side, amount, pnl, fees, rebuys, skipped
+
+
+def _per_bar_backtest(close, state, eur_amount, threshold, initial_eur, fee_rate, slippage):
+    eur, sol, side, amount, pnl, fees, rebuys, skipped = _run_bot_bars(
+        close, np.ascontiguousarray(state, dtype=np.bool_), float(eur_amount), float(threshold),
+        float(initial_eur), float(fee_rate), float(slippage))
+    buy_bars, sell_bars = np.flatnonzero(side == 1), np.flatnonzero(side == -1)
+    return _result(close, eur, sol, buy_bars, sell_bars, amount[buy_bars], pnl[sell_bars], fees, bool(skipped),
+                   int(rebuys), initial_eur)
+
+
+def _result(close, eur, sol, buy_bars, sell_bars, quantity, trip_pnl, fees, ran_out_of_eur, rebuys, initial_eur):
+    bars = len(close)
+    equity = eur + sol * close
+    return {
+        "buy_bars": buy_bars,
+        "sell_bars": sell_bars,
+        "quantity": quantity,
+        "trip_pnl": trip_pnl,
+        "position": sol,
+        "eur": eur,
+        "equity": equity,
+        "summary": {
+            "bars": bars,
+            "trades": int(len(buy_bars) + len(sell_bars)),
+            "round_trips": int(len(sell_bars)),
+            "win_rate": float(np.mean(trip_pnl > 0)) if len(trip_pnl) else 0.0,
+            "fees": float(fees),
+            "pnl": float(equity[-1] - initial_eur) if bars else 0.0,
+            "max_drawdown": float(np.max(np.maximum.accumulate(equity) - equity)) if bars else 0.0,
+            "ran_out_of_eur": ran_out_of_eur,
+            # Extra buys made because a fill left run_bot at or below its long threshold
+            "rebuys": rebuys,
+        },
+    }
+
+
+def backtest_products(candles, strategy, **kwargs):
+    """backtest() every product of 2-D (products x bars) candle columns, evaluating the strategy once for all"""
+    state = strategy.state(candles)
+    return [backtest({name: column[row] for name, column in candles.items()}, state=state[row], **kwargs)
+            for row in range(len(state))]
+
+
+def load_candles(path):
+    """Load candle columns from an archive series directory, an .npz file or a CSV with a header row"""
+    if os.path.isdir(path):
+        # e.g. candle_archive/SOL-EUR/ONE_MINUTE
+        series, granularity = os.path.split(os.path.normpath(path))
+        root, product_id = os.path.split(series)
+        return CandleArchive(root).read(product_id, granularity)
+    if path.endswith(".npz"):
+        return dict(np.load(path))
+    data = np.genfromtxt(path, delimiter=",", names=True)
+    return {name: data[name] for name in data.dtype.names}
+
+
+# === Entry point ===
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python backtest.py <archive series dir|candles.npz|candles.csv>")
+        sys.exit(1)
+    result = backtest(load_candles(sys.argv[1]))
+    print(f"📈 Backtest {FAST_MA}/{SLOW_MA} MA crossover, €{EUR_AMOUNT:.2f} per buy")
+    for key, value in result["summary"].items():
+        print(f"   {key}: {value}")
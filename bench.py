@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import time
+import platform
+import statistics
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import momentum
+import momentum2
+import supervisor
+import candle_store
+from account_snapshot import AccountSnapshot
+from backtest import load_candles
+from candle_store import MAX_CANDLES_PER_REQUEST, CandleStore
+from eventlog import log
+from indicators import engine_for, prefix_sums, sma_array
+from order_manager import OrderManager
+from paper_exchange import SimulatedExchange
+
+# === Benchmark configuration ===
+FIXTURE_CANDLES = 5000  # Minutes of synthetic history per product
+FIXTURE_SEED = 42
+FIXTURE_START = 1_700_000_000
+PRODUCT_COUNTS = (1, 10, 100)
+TICKS = 200  # Simulated minutes timed per loop benchmark
+REPEAT = 200  # Calls timed per stateless benchmark
+RESULTS_DIR = "bench_results"
+REGRESSION_THRESHOLD = 0.10  # Median slowdown flagged when comparing runs
+
+
+# === Fixtures ===
+def synthetic_candles(count=FIXTURE_CANDLES, seed=FIXTURE_SEED, start=FIXTURE_START, price=100.0):
+    """Deterministic random-walk minute candles as columns"""
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.001, count)))
+    open_ = np.concatenate(([price], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.0005, count)) * close
+    return {
+        "start": start + 60 * np.arange(count, dtype=np.int64),
+        "low": np.minimum(open_, close) - spread,
+        "high": np.maximum(open_, close) + spread,
+        "open": open_,
+        "close": close,
+        "volume": rng.uniform(0.1, 10.0, count),
+    }
+
+
+def product_ids(count):
+    """The bot's own product first (run_bot trades only that one), then synthetic ones"""
+    return [momentum.PRODUCT_ID] + [f"P{i:03d}-EUR" for i in range(1, count)]
+
+
+def stub_bots(candles, count):
+    """Point momentum (and so supervisor) at a replaying paper exchange of `count` products"""
+    ids = product_ids(count)
+    start = int(candles["start"][momentum.CANDLE_HISTORY]) + 60
+    exchange = SimulatedExchange({product_id: candles for product_id in ids}, start=start,
+                                 balances={"EUR": 1e6})
+    candle_store._stores.clear()
+    momentum.PAPER_TRADING = True  # Orders go to the exchange, not the live executor
+    momentum.ARCHIVE_CANDLES = False
+    momentum.client = exchange
+    momentum.clock = exchange.clock
+    momentum.accounts = AccountSnapshot(exchange, ttl=momentum.ACCOUNT_TTL, clock=exchange.clock.monotonic)
+    momentum.orders = OrderManager(exchange, momentum.accounts)
+    return exchange, ids
+
+
+# === Timing ===
+def timed(function, runs):
+    """Per-call seconds of `runs` calls of function()"""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(samples, **info):
+    return dict(info, runs=len(samples), best_us=min(samples) * 1e6, median_us=statistics.median(samples) * 1e6,
+                mean_us=statistics.fmean(samples) * 1e6)
+
+
+# === Benchmarks ===
+def bench_process_candle_response(candles):
+    """momentum2.process_candle_response on a full 350-candle page of SDK-style strings"""
+    exchange = SimulatedExchange({momentum2.PRODUCT_ID: candles}, start=int(candles["start"][-1]) + 60)
+    now = exchange.now
+    response = exchange.get_candles(momentum2.PRODUCT_ID, now - MAX_CANDLES_PER_REQUEST * 60, now)
+    return summarize(timed(lambda: momentum2.process_candle_response(response), REPEAT),
+                     candles=len(response.candles))
+
+
+def bench_get_recent_data(candles):
+    """momentum.get_recent_data per tick against the stubbed client: one new candle each call"""
+    exchange, _ = stub_bots(candles, 1)
+    momentum.get_recent_data()  # Cold fill of the store
+
+    def tick():
+        exchange.clock.sleep(60)
+        momentum.get_recent_data()
+    return summarize(timed(tick, TICKS))
+
+
+def bench_get_recent_data_cold(candles):
+    """momentum.get_recent_data into an empty store (first tick or restart)"""
+    stub_bots(candles, 1)
+
+    def cold():
+        candle_store._stores.clear()
+        momentum.get_recent_data()
+    return summarize(timed(cold, REPEAT // 4), candles=momentum.CANDLE_HISTORY)
+
+
+def bench_moving_average(candles):
+    """Vectorized fast and slow MAs over the whole history, as the backtest computes them"""
+    close = candles["close"]
+
+    def both():
+        cumsum = prefix_sums(close)
+        sma_array(close, momentum.FAST_MA, cumsum)
+        sma_array(close, momentum.SLOW_MA, cumsum)
+    return summarize(timed(both, REPEAT), candles=len(close))
+
+
+def bench_indicator_sync(candles):
+    """Streaming MAs brought up to date after one new candle, as run_bot does each tick"""
+    store = CandleStore("BENCH-EUR", capacity=momentum.CANDLE_HISTORY)
+    columns = {name: values[:momentum.CANDLE_HISTORY] for name, values in candles.items()}
+    store.extend_columns(columns)
+    engine = engine_for(store, ("sma", momentum.FAST_MA), ("sma", momentum.SLOW_MA))
+    engine.sync(store)
+    rows = iter(range(momentum.CANDLE_HISTORY, len(candles["start"])))
+
+    def tick():
+        i = next(rows)
+        store.append(*(candles[name][i] for name in candle_store.CANDLE_FIELDS))
+        engine.sync(store)
+        engine.sma(momentum.FAST_MA), engine.sma(momentum.SLOW_MA)
+    return summarize(timed(tick, min(TICKS, len(candles["start"]) - momentum.CANDLE_HISTORY)))
+
+
+def bench_run_bot_tick(candles):
+    """One run_bot loop body (candles, balances, price, MAs, signal and any order) for one product"""
+    exchange, _ = stub_bots(candles, 1)
+
+    def tick():
+        exchange.clock.sleep(60)
+        store = momentum.get_recent_data()
+        if len(store) >= momentum.STRATEGY.warmup:
+            momentum.check_signal(store)
+    samples = timed(tick, TICKS)
+    return summarize(samples, fills=exchange.fills)
+
+
+def bench_supervisor_tick(candles, count):
+    """One supervisor tick over `count` products (one account fetch, concurrent refreshes, orders)"""
+    exchange, ids = stub_bots(candles, count)
+    states = [supervisor.ProductState(product_id) for product_id in ids]
+    with ThreadPoolExecutor(max_workers=supervisor.WORKERS) as pool:
+        supervisor.run_tick(states, pool)  # Cold fill of every store
+
+        def tick():
+            exchange.clock.sleep(60)
+            supervisor.run_tick(states, pool)
+        samples = timed(tick, TICKS)
+    return summarize(samples, products=count, fills=exchange.fills)
+
+
+def run_all(candles):
+    results = {
+        "process_candle_response": bench_process_candle_response(candles),
+        "get_recent_data": bench_get_recent_data(candles),
+        "get_recent_data_cold": bench_get_recent_data_cold(candles),
+        "moving_average": bench_moving_average(candles),
+        "indicator_sync": bench_indicator_sync(candles),
+        "run_bot_tick": bench_run_bot_tick(candles),
+    }
+    for count in PRODUCT_COUNTS:
+        results[f"supervisor_tick_{count}"] = bench_supervisor_tick(candles, count)
+    return results
+
+
+# === Results ===
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save(results, fixture, directory=RESULTS_DIR):
+    """Write this run to RESULTS_DIR/<commit>.json and return the path"""
+    commit = git_commit()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{commit}.json")
+    with open(path, "w") as f:
+        json.dump({"commit": commit, "timestamp": int(time.time()), "fixture": fixture,
+                   "python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+                   "results": results}, f, indent=2)
+    return path
+
+
+def previous_run(path, directory=RESULTS_DIR):
+    """Most recent other result file, to compare against"""
+    others = [os.path.join(directory, name) for name in os.listdir(directory)
+              if name.endswith(".json") and os.path.join(directory, name) != path]
+    return max(others, key=os.path.getmtime) if others else None
+
+
+def report(results, baseline=None):
+    """Print medians, with the change against `baseline` results when given; True if nothing regressed"""
+    ok = True
+    for name, result in results.items():
+        line = f"   {name:26s} median {result['median_us']:10.1f} µs   best {result['best_us']:10.1f} µs"
+        if baseline and name in baseline:
+            change = result["median_us"] / baseline[name]["median_us"] - 1
+            slower = change > REGRESSION_THRESHOLD
+            ok &= not slower
+            line += f"   {change:+7.1%}{' ❌' if slower else ''}"
+        print(line)
+    return ok
+
+
+# === Entry point ===
+if __name__ == "__main__":
+    # Usage: python bench.py [candles.npz|candles.csv|archive series dir] [--compare results.json]
+    args = sys.argv[1:]
+    baseline_path = None
+    if "--compare" in args:
+        index = args.index("--compare")
+        baseline_path = args[index + 1]
+        del args[index:index + 2]
+
+    log.configure(path="", level="ERROR", echo=False)  # Time the code, not the event log
+    fixture = args[0] if args else f"synthetic:{FIXTURE_CANDLES}:{FIXTURE_SEED}"
+    candles = load_candles(args[0]) if args else synthetic_candles()
+    print(f"⏱️  Benchmarking on {fixture} ({len(candles['start'])} candles)")
+
+    baseline = None
+    results_path = os.path.join(RESULTS_DIR, f"{git_commit()}.json")
+    baseline_path = baseline_path or (previous_run(results_path) if os.path.isdir(RESULTS_DIR) else None)
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+    results = run_all(candles)
+    path = save(results, fixture)
+    if baseline:
+        print(f"📊 Compared with {baseline['commit']} on {baseline['fixture']} ({baseline_path})")
+    ok = report(results, baseline and baseline["results"])
+    print(f"💾 Results saved to {path}")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,239 @@
+import os
+import sys
+import time
+import shutil
+import numpy as np
+from datetime import datetime, timezone
+
+# === Archive configuration ===
+ARCHIVE_DIR = "candle_archive"
+COLUMNS = (
+    ("start", np.int64),
+    ("low", np.float64),
+    ("high", np.float64),
+    ("open", np.float64),
+    ("close", np.float64),
+    ("volume", np.float64),
+)
+DAY = 86400
+
+
+def day_name(epoch):
+    return datetime.fromtimestamp(epoch - epoch % DAY, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+class CandleArchive:
+    """Columnar on-disk candle history.
+
+    Layout: <root>/<product>/<granularity>/<YYYY-MM-DD>/<column>.bin, each file a
+    raw little-endian int64 or float64 array, so a day opens as memory maps
+    with no parsing. The live bot only appends closed candles newer than the
+    last archived one; backfills may write older days, and compact() sorts
+    and deduplicates them. An append that a crash cut short leaves some
+    columns longer than others; the next append to that day first trims
+    every column back to the rows all of them hold, so rows stay aligned. A
+    compact() cut short is rolled back the next time the days are listed.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self._last_start = {}
+
+    def series_dir(self, product_id, granularity):
+        return os.path.join(self.root, product_id, granularity)
+
+    def days(self, product_id, granularity="ONE_MINUTE"):
+        path = self.series_dir(product_id, granularity)
+        if not os.path.isdir(path):
+            return []
+        names = os.listdir(path)
+        if any(name.endswith((".old", ".tmp")) for name in names):
+            self.recover_compaction(path)
+            names = os.listdir(path)
+        return sorted(name for name in names if len(name) == 10 and name[4] == '-')
+
+    @staticmethod
+    def recover_compaction(path):
+        """Undo a compact() that crashed mid-swap, so no day is left hidden under .old"""
+        for name in os.listdir(path):
+            if not name.endswith(".old"):
+                continue
+            day = os.path.join(path, name[:-4])
+            if os.path.isdir(day):
+                shutil.rmtree(os.path.join(path, name))  # Crashed after the swap, before cleanup
+            else:
+                os.rename(os.path.join(path, name), day)  # Crashed between the renames: keep the original
+        for name in os.listdir(path):
+            if name.endswith(".tmp"):
+                shutil.rmtree(os.path.join(path, name))  # Unfinished rewrite; the day itself is intact
+
+    # === Writing ===
+    def append(self, product_id, granularity, columns):
+        """Append candle columns (sorted by start) into their day partitions"""
+        starts = np.asarray(columns["start"], dtype=np.int64)
+        if len(starts) == 0:
+            return 0
+        day_index = starts // DAY
+        boundaries = np.flatnonzero(np.diff(day_index)) + 1
+        for chunk in np.split(np.arange(len(starts)), boundaries):
+            path = os.path.join(self.series_dir(product_id, granularity), day_name(int(starts[chunk[0]])))
+            os.makedirs(path, exist_ok=True)
+            self.trim_torn_rows(path)
+            for name, dtype in COLUMNS:
+                with open(os.path.join(path, name + ".bin"), "ab") as f:
+                    f.write(np.ascontiguousarray(np.asarray(columns[name])[chunk], dtype=dtype).tobytes())
+        key = (product_id, granularity)
+        if key in self._last_start:
+            # Backfills may append history older than what is already archived
+            self._last_start[key] = max(self._last_start[key] or 0, int(starts[-1]))
+        return len(starts)
+
+    @staticmethod
+    def trim_torn_rows(path):
+        """Cut every column file of a day partition back to the whole rows all columns hold"""
+        sizes = {}
+        for name, dtype in COLUMNS:
+            file_path = os.path.join(path, name + ".bin")
+            sizes[file_path] = (os.path.getsize(file_path) if os.path.exists(file_path) else 0, np.dtype(dtype).itemsize)
+        rows = min(size // itemsize for size, itemsize in sizes.values())
+        for file_path, (size, itemsize) in sizes.items():
+            if size != rows * itemsize:
+                os.truncate(file_path, rows * itemsize)
+
+    def append_closed(self, store, now=None):
+        """Archive the store's closed candles that are not archived yet"""
+        now = int(now if now is not None else time.time())
+        last = self.last_start(store.product_id, store.granularity)
+        starts = store["start"]
+        keep = (starts + store.seconds <= now)
+        if last is not None:
+            keep &= starts > last
+        if not keep.any():
+            return 0
+        return self.append(store.product_id, store.granularity,
+                           {name: store[name][keep] for name, _ in COLUMNS})
+
+    # === Reading ===
+    def last_start(self, product_id, granularity="ONE_MINUTE"):
+        key = (product_id, granularity)
+        if key not in self._last_start:
+            days = self.days(product_id, granularity)
+            starts = self.open_day(product_id, granularity, days[-1])["start"] if days else []
+            self._last_start[key] = int(starts[-1]) if len(starts) else None
+        return self._last_start[key]
+
+    def open_day(self, product_id, granularity, day):
+        """Memory-map one day partition, one read-only array per column"""
+        path = os.path.join(self.series_dir(product_id, granularity), day)
+        columns = {}
+        for name, dtype in COLUMNS:
+            file_path = os.path.join(path, name + ".bin")
+            size = os.path.getsize(file_path) // np.dtype(dtype).itemsize if os.path.exists(file_path) else 0
+            columns[name] = np.memmap(file_path, dtype=dtype, mode="r", shape=(size,)) if size else np.empty(0, dtype)
+        rows = min(len(column) for column in columns.values())
+        return {name: column[:rows] for name, column in columns.items()}
+
+    def read_days(self, product_id, granularity="ONE_MINUTE", start=None, end=None):
+        """Per-day memory-mapped columns for [start, end) epoch seconds, oldest day first (nothing is copied)"""
+        days = self.days(product_id, granularity)
+        if start is not None:
+            days = [day for day in days if day >= day_name(start)]
+        if end is not None:
+            days = [day for day in days if day <= day_name(end - 1)]
+        for day in days:
+            columns = self.open_day(product_id, granularity, day)
+            first = 0 if start is None else int(np.searchsorted(columns["start"], start))
+            last = len(columns["start"]) if end is None else int(np.searchsorted(columns["start"], end))
+            yield {name: column[first:last] for name, column in columns.items()}
+
+    def read(self, product_id, granularity="ONE_MINUTE", start=None, end=None):
+        """Columns for [start, end) epoch seconds.
+
+        A range inside one day is returned as memory-mapped views; longer
+        ranges are concatenated (copied) once into regular arrays. Use
+        read_days() to walk months of history without copying it.
+        """
+        parts = list(self.read_days(product_id, granularity, start, end))
+
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([part[name] for part in parts]) if parts else np.empty(0, dtype)
+                for name, dtype in COLUMNS}
+
+    # === Maintenance ===
+    def check(self, product_id, granularity="ONE_MINUTE"):
+        """Return a list of integrity problems (empty when the series is healthy)"""
+        problems = []
+        previous = None
+        for day in self.days(product_id, granularity):
+            path = os.path.join(self.series_dir(product_id, granularity), day)
+            lengths = {}
+            for name, dtype in COLUMNS:
+                file_path = os.path.join(path, name + ".bin")
+                size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+                if size % np.dtype(dtype).itemsize:
+                    problems.append(f"{day}: {name} has a partial record")
+                lengths[name] = size // np.dtype(dtype).itemsize
+            if len(set(lengths.values())) > 1:
+                problems.append(f"{day}: column lengths differ {lengths}")
+
+            columns = self.open_day(product_id, granularity, day)
+            starts = columns["start"]
+            if len(starts) and (day_name(int(starts[0])) != day or day_name(int(starts[-1])) != day):
+                problems.append(f"{day}: candles outside the partition's day")
+            if np.any(np.diff(starts) <= 0):
+                problems.append(f"{day}: starts not strictly increasing")
+            if previous is not None and len(starts) and starts[0] <= previous:
+                problems.append(f"{day}: overlaps the previous day")
+            for name, _ in COLUMNS[1:]:
+                if not np.all(np.isfinite(columns[name])):
+                    problems.append(f"{day}: non-finite values in {name}")
+            if len(starts):
+                previous = int(starts[-1])
+        return problems
+
+    def compact(self, product_id, granularity="ONE_MINUTE"):
+        """Rewrite each day sorted, deduplicated (last write wins) and trimmed to whole rows"""
+        for day in self.days(product_id, granularity):
+            path = os.path.join(self.series_dir(product_id, granularity), day)
+            columns = {name: np.array(column) for name, column in self.open_day(product_id, granularity, day).items()}
+            starts = columns["start"]
+            # Stable sort, then keep the last row written for each start
+            order = np.argsort(starts, kind="stable")
+            starts = starts[order]
+            last_of_start = np.append(starts[1:] != starts[:-1], True) if len(starts) else np.empty(0, bool)
+            rows = order[last_of_start]
+
+            temporary = path + ".tmp"
+            shutil.rmtree(temporary, ignore_errors=True)
+            os.makedirs(temporary)
+            for name, dtype in COLUMNS:
+                with open(os.path.join(temporary, name + ".bin"), "wb") as f:
+                    f.write(columns[name][rows].astype(dtype).tobytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+            old = path + ".old"
+            os.rename(path, old)
+            os.rename(temporary, path)
+            shutil.rmtree(old)
+        self._last_start.pop((product_id, granularity), None)
+
+
+# === Entry point ===
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4) or sys.argv[1] not in ("check", "compact"):
+        print("Usage: python candle_archive.py check|compact <product_id> [granularity]")
+        sys.exit(1)
+    command, product_id = sys.argv[1], sys.argv[2]
+    granularity = sys.argv[3] if len(sys.argv) == 4 else "ONE_MINUTE"
+    archive = CandleArchive()
+
+    if command == "compact":
+        archive.compact(product_id, granularity)
+        print(f"✅ Compacted {len(archive.days(product_id, granularity))} days of {product_id} {granularity}")
+    problems = archive.check(product_id, granularity)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if not problems:
+        print(f"✅ {product_id} {granularity}: archive OK")
+    sys.exit(1 if problems else 0)
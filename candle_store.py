@@ -0,0 +1,230 @@
+import time
+import numpy as np
+from datetime import datetime
+from itertools import chain
+from operator import attrgetter, itemgetter
+
+# === Candle store configuration ===
+GRANULARITY_SECONDS = {
+    "ONE_MINUTE": 60,
+    "FIVE_MINUTE": 300,
+    "FIFTEEN_MINUTE": 900,
+    "THIRTY_MINUTE": 1800,
+    "ONE_HOUR": 3600,
+    "TWO_HOUR": 7200,
+    "SIX_HOUR": 21600,
+    "ONE_DAY": 86400,
+}
+MAX_CANDLES_PER_REQUEST = 350  # Coinbase get_candles page limit
+PRICE_COLUMNS = ("low", "high", "open", "close", "volume")
+CANDLE_FIELDS = ("start",) + PRICE_COLUMNS
+
+
+def to_epoch(value):
+    """Convert a candle start (epoch seconds, epoch millis or ISO string) to epoch seconds"""
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.isdigit()):
+        timestamp = int(value)
+        return timestamp if timestamp < 1e11 else timestamp // 1000
+    return int(datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp())
+
+
+def decode_candles(candles):
+    """Decode a get_candles page straight into typed column arrays sorted by start.
+
+    The SDK hands every field over as a string, so all of them are gathered into
+    one flat list and converted by a single np.array() call. Parsing the
+    decimal strings themselves is the floor: long full-precision values cost
+    several times more than prices quoted to the tick size. The timestamp
+    format (epoch seconds, epoch millis or ISO) is detected once per batch.
+    Duplicate starts keep the last candle.
+    """
+    count = len(candles)
+    if count == 0:
+        columns = {name: np.empty(0) for name in PRICE_COLUMNS}
+        columns["start"] = np.empty(0, dtype=np.int64)
+        return columns
+
+    by_key = isinstance(candles[0], dict)
+    first_start = candles[0].get("start") if by_key else getattr(candles[0], "start", None)
+    iso = isinstance(first_start, str) and not first_start.isdigit()
+    fields = PRICE_COLUMNS if iso else CANDLE_FIELDS
+    getter = itemgetter(*fields) if by_key else attrgetter(*fields)
+
+    try:
+        values = np.array(list(chain.from_iterable(map(getter, candles))), dtype=np.float64)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        # Numeric or missing fields: convert one candle at a time with defaults
+        read = (lambda candle, name: candle.get(name, 0)) if by_key else (lambda candle, name: getattr(candle, name, 0))
+        values = np.array([[float(read(candle, name) or 0) for name in fields] for candle in candles])
+    values = values.reshape(count, len(fields))
+
+    if iso:
+        read_start = itemgetter("start") if by_key else attrgetter("start")
+        starts = np.array([value[:19] for value in map(read_start, candles)], dtype='datetime64[s]').astype(np.int64)
+        prices = values
+    else:
+        starts = values[:, 0].astype(np.int64)
+        if starts.max() >= 1e11:
+            starts //= 1000
+        prices = values[:, 1:]
+
+    if count > 1 and starts[0] > starts[-1]:
+        starts, prices = starts[::-1], prices[::-1]  # Coinbase pages come newest first
+    if np.any(np.diff(starts) <= 0):
+        order = np.argsort(starts, kind="stable")
+        starts, prices = starts[order], prices[order]
+        last_of_start = np.append(starts[1:] != starts[:-1], True)
+        starts, prices = starts[last_of_start], prices[last_of_start]
+
+    columns = {name: np.ascontiguousarray(prices[:, i]) for i, name in enumerate(PRICE_COLUMNS)}
+    columns["start"] = np.ascontiguousarray(starts)
+    return columns
+
+
+# === Append-only ring buffer of candles ===
+class CandleStore:
+    """Most recent candles for one (product, granularity) pair.
+
+    Columns live in preallocated arrays of twice the capacity; every candle is
+    written at both i and i + capacity, so the live window is always one
+    contiguous slice and can be handed out as a zero-copy view.
+    """
+
+    def __init__(self, product_id, granularity="ONE_MINUTE", capacity=500):
+        self.product_id = product_id
+        self.granularity = granularity
+        self.seconds = GRANULARITY_SECONDS[granularity]
+        self.capacity = capacity
+        self._start = np.zeros(2 * capacity, dtype=np.int64)
+        self._prices = np.zeros((len(PRICE_COLUMNS), 2 * capacity), dtype=np.float64)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, column):
+        """Zero-copy view of one column, oldest candle first"""
+        end = self._head + self._size
+        if column == "start":
+            return self._start[self._head:end]
+        return self._prices[PRICE_COLUMNS.index(column), self._head:end]
+
+    @property
+    def last_start(self):
+        if self._size == 0:
+            return None
+        return int(self._start[self._head + self._size - 1])
+
+    def append(self, start, low, high, open_, close, volume):
+        """Add one candle; a repeated start overwrites the in-progress candle.
+
+        Returns True if a new candle was added.
+        """
+        last = self.last_start
+        if last is not None and start < last:
+            return False  # Older than what we hold, already seen
+
+        if last is not None and start == last:
+            slot = (self._head + self._size - 1) % self.capacity
+            added = False
+        elif self._size < self.capacity:
+            slot = (self._head + self._size) % self.capacity
+            self._size += 1
+            added = True
+        else:
+            slot = self._head
+            self._head = (self._head + 1) % self.capacity
+            added = True
+
+        for index in (slot, slot + self.capacity):
+            self._start[index] = start
+            self._prices[:, index] = (low, high, open_, close, volume)
+        return added
+
+    def extend(self, candles):
+        """Add candles from a get_candles response (any order). Returns the count of new candles"""
+        return self.extend_columns(decode_candles(candles))
+
+    def extend_columns(self, columns):
+        """Add decoded candle columns (sorted by start) in bulk. Returns the count of new candles"""
+        starts = columns["start"]
+        first = 0
+        last = self.last_start
+        if last is not None:
+            first = int(np.searchsorted(starts, last))
+            if first < len(starts) and starts[first] == last:
+                self.append(last, *(float(columns[name][first]) for name in PRICE_COLUMNS))
+                first += 1
+
+        count = len(starts) - first
+        if count <= 0:
+            return 0
+        first = max(first, len(starts) - self.capacity)  # Only the newest candles fit
+        rows = np.arange(first, len(starts))
+        slots = (self._head + self._size + np.arange(len(rows))) % self.capacity
+        for offset in (0, self.capacity):
+            self._start[slots + offset] = starts[rows]
+            for i, name in enumerate(PRICE_COLUMNS):
+                self._prices[i, slots + offset] = columns[name][rows]
+
+        overflow = max(0, self._size + len(rows) - self.capacity)
+        self._head = (self._head + overflow) % self.capacity
+        self._size = min(self.capacity, self._size + len(rows))
+        return count
+
+    def refresh(self, client, now=None):
+        """Fetch only candles newer than the last stored start, paging over any gap"""
+        now = int(now if now is not None else time.time())
+        oldest_useful = now - self.capacity * self.seconds
+        # Re-request the last stored candle too: it may still have been in progress
+        since = oldest_useful if self._size == 0 else max(self.last_start, oldest_useful)
+
+        page = MAX_CANDLES_PER_REQUEST * self.seconds
+        added = 0
+        for page_start in range(since, now, page):
+            response = client.get_candles(
+                product_id=self.product_id,
+                start=str(page_start),
+                end=str(min(page_start + page - 1, now)),  # end is inclusive: at most one full page
+                granularity=self.granularity
+            )
+            if not hasattr(response, 'candles'):
+                raise Exception("No candles attribute in response")
+            added += self.extend(response.candles)
+        return added
+
+    @classmethod
+    def from_rows(cls, product_id, rows, granularity="ONE_MINUTE"):
+        """Build a standalone store from row dicts (used by the synthetic fallbacks)"""
+        store = cls(product_id, granularity, capacity=max(len(rows), 1))
+        for row in sorted(rows, key=lambda r: to_epoch(r['start'])):
+            store.append(to_epoch(row['start']), row['low'], row['high'],
+                         row['open'], row['close'], row['volume'])
+        return store
+
+    @classmethod
+    def from_columns(cls, product_id, columns, granularity="ONE_MINUTE"):
+        """Build a standalone store from decoded candle columns"""
+        store = cls(product_id, granularity, capacity=max(len(columns["start"]), 1))
+        store.extend_columns(columns)
+        return store
+
+    def to_frame(self):
+        """Copy the window into a DataFrame for ad-hoc analysis"""
+        import pandas as pd
+        df = pd.DataFrame({column: self[column] for column in ("start",) + PRICE_COLUMNS})
+        df['time'] = pd.to_datetime(df['start'], unit='s', utc=True)
+        return df
+
+
+# === Shared store registry ===
+_stores = {}
+
+
+def get_store(product_id, granularity="ONE_MINUTE", capacity=500):
+    """Return the persistent store for (product, granularity), creating it on first use"""
+    key = (product_id, granularity)
+    if key not in _stores:
+        _stores[key] = CandleStore(product_id, granularity, capacity)
+    return _stores[key]
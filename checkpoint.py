@@ -0,0 +1,63 @@
+import os
+import io
+import json
+import numpy as np
+from candle_store import CANDLE_FIELDS
+from eventlog import log
+
+# === Checkpoint configuration ===
+CHECKPOINT_VERSION = 1  # Bumped when the layout changes; other versions are ignored
+
+
+def write_atomic(path, data):
+    """Replace `path` with `data` so a crash leaves either the old or the new file, never a torn one.
+
+    The bytes go to a temporary file next to it, are fsynced, renamed over
+    the old file in one step, and the directory entry is fsynced too.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+    try:
+        descriptor = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return  # Platforms without directory handles (Windows)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def save_checkpoint(path, state, store):
+    """Write bot state (plain JSON values) and the candle window of `store` as one compact .npz"""
+    buffer = io.BytesIO()
+    columns = {name: np.ascontiguousarray(store[name]) for name in CANDLE_FIELDS}
+    np.savez(buffer, state=np.array(json.dumps(dict(state, version=CHECKPOINT_VERSION))), **columns)
+    write_atomic(path, buffer.getvalue())
+
+
+def load_checkpoint(path):
+    """(state, candle columns) from save_checkpoint(), or None if there is no usable checkpoint"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            state = json.loads(str(data["state"]))
+            columns = {name: data[name] for name in CANDLE_FIELDS}
+    except Exception as e:
+        log.warning("checkpoint", "⚠️  Ignoring unreadable checkpoint {path}: {error}", path=path, error=str(e))
+        return None
+    if state.get("version") != CHECKPOINT_VERSION:
+        log.warning("checkpoint", "⚠️  Ignoring checkpoint {path} of version {version}", path=path,
+                    version=state.get("version"))
+        return None
+    return state, columns
@@ -0,0 +1,71 @@
+import time
+from datetime import datetime, timezone
+
+
+class Clock:
+    """Source of time for the trading loops.
+
+    Everything that reads the time or waits goes through a clock, so the same
+    loop runs live on WallClock or against recorded data on ReplayClock.
+    sleep() returns False once there is no more time to run (end of a replay).
+    """
+
+    def time(self):
+        raise NotImplementedError
+
+    def monotonic(self):
+        raise NotImplementedError
+
+    def sleep(self, seconds):
+        raise NotImplementedError
+
+    def now(self):
+        """Local naive datetime, like datetime.now()"""
+        return datetime.fromtimestamp(self.time())
+
+    def utcnow(self):
+        """UTC naive datetime, like datetime.utcnow()"""
+        return datetime.fromtimestamp(self.time(), tz=timezone.utc).replace(tzinfo=None)
+
+    def strftime(self, format='%Y-%m-%d %H:%M:%S'):
+        return time.strftime(format, time.localtime(self.time()))
+
+
+class WallClock(Clock):
+    """Real time, for live trading"""
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+        return True
+
+
+class ReplayClock(Clock):
+    """Simulated time that only moves when the loop sleeps.
+
+    With speed=None a sleep returns at once, so a replay runs as fast as the
+    loop can compute; speed=1000 still waits 1/1000 of each sleep in real time.
+    Sleeping past `end` returns False.
+    """
+
+    def __init__(self, start, end=None, speed=None):
+        self._now = float(start)
+        self.end = end
+        self.speed = speed
+
+    def time(self):
+        return self._now
+
+    def monotonic(self):
+        return self._now
+
+    def sleep(self, seconds):
+        if self.speed:
+            time.sleep(seconds / self.speed)
+        self._now += seconds
+        return self.end is None or self._now <= self.end
@@ -0,0 +1,138 @@
+import sys
+import json
+import time
+import atexit
+import threading
+from collections import deque
+
+# === Event log configuration ===
+LOG_FILE = "coinbot.jsonl"
+LOG_LEVEL = "INFO"
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+FLUSH_INTERVAL = 0.1  # Seconds the writer thread waits between drains
+
+
+def _json_default(value):
+    # NumPy scalars and anything else json can't encode
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+class EventLog:
+    """Structured event log written as JSON lines by a background thread.
+
+    log.info("order", "✅ {side} order placed", side="BUY", order_id=...) only
+    appends a tuple to a deque (atomic in CPython, so producers only take a
+    lock to start the writer); the writer thread formats the message, writes
+    one JSON record per event to `path` and echoes the message to stdout.
+    Events below `level` are dropped before any formatting.
+    """
+
+    def __init__(self, path=LOG_FILE, level=LOG_LEVEL, echo=True, clock=time.time):
+        self.path = path
+        self.threshold = LEVELS[level]
+        self.echo = echo
+        self.clock = clock
+        self.queue = deque()
+        self._file = None
+        self._drain_lock = threading.Lock()
+        self._start_lock = threading.Lock()  # Two first events must not start two writers
+        self._writer = None
+
+    def configure(self, path=None, level=None, echo=None, clock=None):
+        self.flush()
+        if path is not None and path != self.path:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.path = path
+        if level is not None:
+            self.threshold = LEVELS[level]
+        if echo is not None:
+            self.echo = echo
+        if clock is not None:
+            self.clock = clock
+
+    def enabled(self, level):
+        return LEVELS[level] >= self.threshold
+
+    # === Producers ===
+    def log(self, level, event, message=None, **fields):
+        if LEVELS[level] < self.threshold:
+            return
+        self.queue.append((self.clock(), level, event, message, fields))
+        if self._writer is None:
+            self._start()
+
+    def debug(self, event, message=None, **fields):
+        self.log("DEBUG", event, message, **fields)
+
+    def info(self, event, message=None, **fields):
+        self.log("INFO", event, message, **fields)
+
+    def warning(self, event, message=None, **fields):
+        self.log("WARNING", event, message, **fields)
+
+    def error(self, event, message=None, **fields):
+        self.log("ERROR", event, message, **fields)
+
+    # === Writer ===
+    def _start(self):
+        with self._start_lock:
+            if self._writer is not None:
+                return
+            writer = threading.Thread(target=self._run, daemon=True)
+            writer.start()
+            atexit.register(self.flush)
+            self._writer = writer
+
+    def _run(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception as e:
+                sys.stderr.write(f"event log write failed: {e}\n")
+
+    @staticmethod
+    def _format(timestamp, level, event, message, fields):
+        """(JSON line, echoed text) for one event; a bad template or field never raises"""
+        record = {"ts": round(timestamp, 6), "level": level, "event": event}
+        text = None
+        if message is not None:
+            try:
+                text = message.format(**fields) if fields else message
+            except (AttributeError, KeyError, IndexError, TypeError, ValueError):
+                text = message
+            record["msg"] = text
+        try:
+            return json.dumps(dict(record, **fields), default=_json_default, ensure_ascii=False), text
+        except (TypeError, ValueError) as e:
+            record["log_error"] = str(e)  # e.g. circular fields; keep the event, drop its fields
+            return json.dumps(record, ensure_ascii=False), text
+
+    def flush(self):
+        """Write out every queued event (call before prompting on stdin)"""
+        with self._drain_lock:
+            records = []
+            echoed = []
+            while True:
+                try:
+                    timestamp, level, event, message, fields = self.queue.popleft()
+                except IndexError:
+                    break
+                line, text = self._format(timestamp, level, event, message, fields)
+                records.append(line)
+                if text is not None and self.echo:
+                    echoed.append(text)
+
+            if records and self.path:
+                if self._file is None:
+                    self._file = open(self.path, "a", encoding="utf-8")
+                self._file.write("\n".join(records) + "\n")
+                self._file.flush()
+            if echoed:
+                sys.stdout.write("\n".join(echoed) + "\n")
+                sys.stdout.flush()
+
+
+log = EventLog()  # Shared by every module of the bot
@@ -0,0 +1,111 @@
+import json
+import time
+import threading
+import requests
+from collections import deque
+from metrics import metrics
+from eventlog import log
+from signing import shared_signer
+from coinbase.constants import BASE_URL
+
+# === Execution configuration ===
+ORDER_PATH = "/api/v3/brokerage/orders"
+TIME_PATH = "/api/v3/brokerage/time"  # Cheap public endpoint used to keep the connection warm
+KEEPALIVE_INTERVAL = 20  # Seconds between keep-alive pings
+REQUEST_TIMEOUT = 10
+LATENCY_HISTORY = 1000  # Recent orders kept in OrderExecutor.latencies; metrics has the full histograms
+
+
+class OrderExecutor:
+    """Sends market orders over one warm, kept-alive HTTPS connection.
+
+    Order bodies are pre-templated per (product, side) and the order JWT is
+    signed ahead of time by the shared signer, kept fresh by a background
+    thread, so the only work left on the signal-to-order path is formatting
+    two strings and writing the request.
+    """
+
+    def __init__(self, client, scheduler=None):
+        self.signer = shared_signer(client.api_key, client.api_secret)
+        self.scheduler = scheduler or getattr(client, 'scheduler', None)
+        self.session = requests.Session()
+        self.session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self._templates = {}
+        self._stop = threading.Event()
+        self._keepalive = None
+        self.latencies = deque(maxlen=LATENCY_HISTORY)  # (product_id, side, signal_to_wire_ms, round_trip_ms)
+
+    # === Preparation (off the critical path) ===
+    def template(self, product_id, side):
+        """JSON body with %s slots for the client order id and the size"""
+        key = (product_id, side)
+        if key not in self._templates:
+            size_key = "quote_size" if side == "BUY" else "base_size"
+            self._templates[key] = json.dumps({
+                "client_order_id": "%s",
+                "product_id": product_id,
+                "side": side,
+                "order_configuration": {"market_market_ioc": {size_key: "%s"}},
+            }, separators=(",", ":"))
+        return self._templates[key]
+
+    def prepare(self, product_ids):
+        """Build the order templates for every product/side up front"""
+        for product_id in product_ids:
+            for side in ("BUY", "SELL"):
+                self.template(product_id, side)
+
+    def warm(self):
+        """Open the TLS connection and sign the order JWT ahead of the first signal"""
+        self.signer.prewarm([("POST", ORDER_PATH)])
+        self.signer.refresh()
+        self.session.get(f"https://{BASE_URL}{TIME_PATH}", timeout=REQUEST_TIMEOUT)
+
+    def start(self, product_ids=()):
+        """Prepare templates, warm up, and keep the connection and JWT fresh in the background"""
+        self.prepare(product_ids)
+        self.warm()
+        if self._keepalive is None:
+            self._keepalive = threading.Thread(target=self._keep_warm, daemon=True)
+            self._keepalive.start()
+
+    def _keep_warm(self):
+        while not self._stop.wait(KEEPALIVE_INTERVAL):
+            try:
+                self.warm()
+            except Exception as e:
+                log.warning("execution", "⚠️  Order connection keep-alive failed: {error}", error=str(e))
+
+    def stop(self):
+        self._stop.set()
+        self.session.close()
+
+    # === Critical path ===
+    def send(self, product_id, side, amount, client_order_id, signal_time=None):
+        """Send a market order; signal_time is the time.perf_counter() of the signal"""
+        signal_time = signal_time if signal_time is not None else time.perf_counter()
+        body = self.template(product_id, side) % (client_order_id, amount)
+        headers = self.signer.headers("POST", ORDER_PATH)
+
+        def post():
+            wire = time.perf_counter()
+            response = self.session.post(f"https://{BASE_URL}{ORDER_PATH}", data=body,
+                                         headers=headers, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()  # Lets the scheduler see a 429
+            return wire, response
+
+        if self.scheduler is not None:
+            wire, response = self.scheduler.call("orders", post)
+        else:
+            wire, response = post()
+        done = time.perf_counter()
+
+        signal_to_wire = (wire - signal_time) * 1000
+        round_trip = (done - wire) * 1000
+        self.latencies.append((product_id, side, signal_to_wire, round_trip))
+        metrics.observe("order_signal_to_wire", wire - signal_time, product_id=product_id)
+        metrics.observe("order_round_trip", done - wire, product_id=product_id)
+        log.info("order_latency", "⏱️  {side} {product_id}: signal→wire {signal_to_wire_ms:.2f} ms, "
+                 "round trip {round_trip_ms:.1f} ms",
+                 side=side, product_id=product_id, signal_to_wire_ms=signal_to_wire, round_trip_ms=round_trip)
+        return response.json()
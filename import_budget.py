@@ -0,0 +1,61 @@
+import sys
+import subprocess
+
+# === Import budget configuration ===
+# Milliseconds a fresh interpreter may spend importing each module. NumPy
+# alone takes ~100 ms; the SDK, requests, websockets and pandas must stay out.
+IMPORT_BUDGET_MS = {
+    "momentum": 200,
+    "momentum2": 200,
+    "supervisor": 200,
+    "backtest": 180,
+    "indicators": 160,
+}
+RUNS = 5  # Best of, to smooth out disk cache and scheduler noise
+FORBIDDEN = ("coinbase", "requests", "websockets", "pandas", "ecdsa", "dotenv")
+SLOWEST = 10  # Imports listed when a module is over budget
+
+
+def import_time_ms(module):
+    """Best-of-RUNS wall time of `import module` in a fresh interpreter"""
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    best = min(float(subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                    check=True).stdout) for _ in range(RUNS))
+    return best * 1000
+
+
+def imported_modules(module):
+    """(cumulative microseconds, name) of everything `import module` loads, slowest first"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)
+
+
+def check(budgets=IMPORT_BUDGET_MS):
+    """Print each module's import time against its budget; True when all are within it"""
+    ok = True
+    for module, budget in budgets.items():
+        elapsed = import_time_ms(module)
+        loaded = imported_modules(module)
+        heavy = sorted({name.split('.')[0] for _, name in loaded} & set(FORBIDDEN))
+        within = elapsed <= budget and not heavy
+        ok &= within
+        print(f"{'✅' if within else '❌'} {module}: {elapsed:.1f} ms (budget {budget} ms)"
+              + (f", loads {', '.join(heavy)}" if heavy else ""))
+        if not within:
+            for cumulative, name in loaded[:SLOWEST]:
+                print(f"     {cumulative / 1000:7.1f} ms  {name}")
+    return ok
+
+
+# === Entry point ===
+if __name__ == "__main__":
+    modules = sys.argv[1:]
+    budgets = {module: IMPORT_BUDGET_MS.get(module, max(IMPORT_BUDGET_MS.values())) for module in modules}
+    sys.exit(0 if check(budgets or IMPORT_BUDGET_MS) else 1)
@@ -0,0 +1,281 @@
+import math
+import weakref
+import numpy as np
+
+
+# === Streaming indicators ===
+# Each indicator takes one candle at a time. push() adds a new candle,
+# amend() replaces the newest one (the in-progress candle changed).
+
+class SMA:
+    """Simple moving average over the last `window` closes"""
+
+    def __init__(self, window):
+        self.window = window
+        self._values = [0.0] * window
+        self._index = 0
+        self._count = 0
+        self._sum = 0.0
+
+    def push(self, close, volume=0.0, high=None, low=None):
+        if self._count == self.window:
+            self._sum -= self._values[self._index]
+        else:
+            self._count += 1
+        self._values[self._index] = close
+        self._sum += close
+        self._index = (self._index + 1) % self.window
+        if self._index == 0:
+            self._sum = math.fsum(self._values[:self._count])  # Drop accumulated rounding error
+
+    def amend(self, close, volume=0.0, high=None, low=None):
+        last = (self._index - 1) % self.window
+        self._sum += close - self._values[last]
+        self._values[last] = close
+
+    @property
+    def value(self):
+        return self._sum / self.window if self._count == self.window else math.nan
+
+    def state(self):
+        return [list(self._values), self._index, self._count, self._sum]
+
+    def load(self, state):
+        values, self._index, self._count, self._sum = state
+        self._values = [float(value) for value in values]
+
+
+class EMA:
+    """Exponential moving average, seeded with the first close (pandas adjust=False)"""
+
+    def __init__(self, window):
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self._count = 0
+        self._previous = math.nan
+        self._value = math.nan
+
+    def push(self, close, volume=0.0, high=None, low=None):
+        self._previous = self._value
+        self._count += 1
+        self._value = self._step(close)
+
+    def amend(self, close, volume=0.0, high=None, low=None):
+        self._value = self._step(close)
+
+    def _step(self, close):
+        if math.isnan(self._previous):
+            return close
+        return self.alpha * close + (1 - self.alpha) * self._previous
+
+    @property
+    def value(self):
+        return self._value if self._count >= self.window else math.nan
+
+    def state(self):
+        return [self._count, self._previous, self._value]
+
+    def load(self, state):
+        self._count, self._previous, self._value = state
+
+
+class VWAP:
+    """Volume-weighted average of the typical price over the last `window` candles"""
+
+    def __init__(self, window):
+        self.window = window
+        self._pv = SMA(window)
+        self._volume = SMA(window)
+
+    def push(self, close, volume=0.0, high=None, low=None):
+        self._pv.push(self._typical(close, high, low) * volume)
+        self._volume.push(volume)
+
+    def amend(self, close, volume=0.0, high=None, low=None):
+        self._pv.amend(self._typical(close, high, low) * volume)
+        self._volume.amend(volume)
+
+    @staticmethod
+    def _typical(close, high, low):
+        if high is None or low is None:
+            return close
+        return (high + low + close) / 3.0
+
+    @property
+    def value(self):
+        volume = self._volume.value
+        return self._pv.value / volume if volume else math.nan
+
+    def state(self):
+        return [self._pv.state(), self._volume.state()]
+
+    def load(self, state):
+        self._pv.load(state[0])
+        self._volume.load(state[1])
+
+
+INDICATORS = {"sma": SMA, "ema": EMA, "vwap": VWAP}
+
+
+# === Whole-array indicators ===
+# Same definitions as the streaming classes, computed over every bar at once
+# along the last axis, so a 2-D (products x bars) input runs in one call.
+
+def prefix_sums(values):
+    """Running sums along the last axis with a leading zero, shareable by every sma_array window"""
+    values = np.asarray(values, dtype=np.float64)
+    return np.concatenate((np.zeros(values.shape[:-1] + (1,)), np.cumsum(values, axis=-1)), axis=-1)
+
+
+def sma_array(close, window, cumsum=None):
+    close = np.asarray(close, dtype=np.float64)
+    if cumsum is None:
+        cumsum = prefix_sums(close)
+    result = np.full(close.shape, np.nan)
+    if window <= close.shape[-1]:
+        result[..., window - 1:] = (cumsum[..., window:] - cumsum[..., :-window]) / window
+    return result
+
+
+def ema_array(close, window):
+    close = np.asarray(close, dtype=np.float64)
+    alpha = 2.0 / (window + 1)
+    result = np.empty(close.shape)
+    if close.shape[-1] == 0:
+        return result
+    value = close[..., 0]
+    result[..., 0] = value
+    for i in range(1, close.shape[-1]):  # One step per bar, vectorized across products
+        value = alpha * close[..., i] + (1 - alpha) * value
+        result[..., i] = value
+    result[..., :window - 1] = np.nan
+    return result
+
+
+def vwap_array(close, volume, high=None, low=None, window=1):
+    close = np.asarray(close, dtype=np.float64)
+    typical = close if high is None or low is None else (np.asarray(high) + np.asarray(low) + close) / 3.0
+    average_volume = sma_array(volume, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(average_volume != 0, sma_array(typical * volume, window) / average_volume, np.nan)
+
+
+def indicator_arrays(candles, specs):
+    """{(kind, window): array} for candle columns (1-D, or 2-D products x bars)"""
+    close = candles["close"]
+    values = {}
+    for kind, window in specs:
+        if (kind, window) in values:
+            continue
+        if kind == "sma":
+            values[(kind, window)] = sma_array(close, window)
+        elif kind == "ema":
+            values[(kind, window)] = ema_array(close, window)
+        elif kind == "vwap":
+            values[(kind, window)] = vwap_array(close, candles["volume"], candles["high"], candles["low"], window)
+        else:
+            raise KeyError(f"Unknown indicator {kind}")
+    return values
+
+
+# === Indicator engine ===
+class IndicatorEngine:
+    """Set of streaming indicators kept in sync with one candle store.
+
+    Indicators are shared by (kind, window), so several MA pairs on the same
+    product only pay once for each distinct window.
+    """
+
+    def __init__(self, *specs):
+        self._indicators = {}
+        self._pending = []
+        self.last_start = None
+        for kind, window in specs:
+            self.require(kind, window)
+
+    def require(self, kind, window):
+        key = (kind, window)
+        if key not in self._indicators:
+            indicator = INDICATORS[kind](window)
+            self._indicators[key] = indicator
+            self._pending.append(indicator)
+        return self._indicators[key]
+
+    def sync(self, store):
+        """Feed candles added to the store since the last sync"""
+        starts = store["start"]
+        if len(starts) == 0:
+            return
+
+        # Indicators added since the last sync replay the whole window
+        for indicator in self._pending:
+            self._replay(indicator, store, 0, len(starts))
+        if self._pending and self.last_start is None:
+            self.last_start = int(starts[-1])
+            self._pending = []
+            return
+        fresh = [i for i in self._indicators.values() if i not in self._pending]
+        self._pending = []
+
+        first = 0 if self.last_start is None else int(np.searchsorted(starts, self.last_start))
+        closes, volumes = store["close"], store["volume"]
+        highs, lows = store["high"], store["low"]
+        for i in range(first, len(starts)):
+            start = int(starts[i])
+            amend = start == self.last_start
+            for indicator in fresh:
+                update = indicator.amend if amend else indicator.push
+                update(float(closes[i]), float(volumes[i]), float(highs[i]), float(lows[i]))
+            self.last_start = start
+
+    @staticmethod
+    def _replay(indicator, store, first, last):
+        closes, volumes = store["close"], store["volume"]
+        highs, lows = store["high"], store["low"]
+        for i in range(first, last):
+            indicator.push(float(closes[i]), float(volumes[i]), float(highs[i]), float(lows[i]))
+
+    def value(self, kind, window):
+        return self._indicators[(kind, window)].value
+
+    # === Checkpointing ===
+    def snapshot(self):
+        """Accumulators of every synced indicator, as plain JSON values"""
+        return {"last_start": self.last_start,
+                "indicators": [[kind, window, indicator.state()]
+                               for (kind, window), indicator in self._indicators.items()
+                               if indicator not in self._pending]}
+
+    def restore(self, snapshot):
+        """Resume from snapshot(): the next sync only feeds candles after its last_start"""
+        for kind, window, state in snapshot["indicators"]:
+            indicator = INDICATORS[kind](window)
+            indicator.load(state)
+            previous = self._indicators.get((kind, window))
+            if previous in self._pending:
+                self._pending.remove(previous)
+            self._indicators[(kind, window)] = indicator
+        self.last_start = snapshot["last_start"]
+
+    def sma(self, window):
+        return self.value("sma", window)
+
+    def ema(self, window):
+        return self.value("ema", window)
+
+    def vwap(self, window):
+        return self.value("vwap", window)
+
+
+# === Engine registry ===
+_engines = weakref.WeakKeyDictionary()
+
+
+def engine_for(store, *specs):
+    """Return the engine attached to a candle store, requiring the given (kind, window) specs"""
+    engine = _engines.get(store)
+    if engine is None:
+        engine = _engines[store] = IndicatorEngine()
+    for kind, window in specs:
+        engine.require(kind, window)
+    return engine
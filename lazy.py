@@ -0,0 +1,51 @@
+import threading
+
+_MISSING = object()
+
+
+class Lazy:
+    """Stand-in for a module-level object that is only built on first use.
+
+    The first attribute access calls `factory()` once (thread-safe) and every
+    access is forwarded to the result, so a module can declare its client and
+    friends at import time without reading credentials or opening connections.
+    """
+    __slots__ = ("_factory", "_value", "_lock", "_building")
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = _MISSING
+        self._lock = threading.RLock()
+        self._building = False
+
+    def _resolve(self):
+        value = self._value
+        if value is _MISSING:
+            with self._lock:
+                if self._value is _MISSING:
+                    if self._building:
+                        raise RuntimeError(f"{self!r} is needed to build itself")
+                    self._building = True
+                    try:
+                        self._value = self._factory()
+                    finally:
+                        self._building = False
+                value = self._value
+        return value
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __repr__(self):
+        if self._value is _MISSING:
+            return f"<Lazy {getattr(self._factory, '__name__', 'object')} (not built)>"
+        return repr(self._value)
+
+
+def resolve(value):
+    """The object behind a Lazy (building it if needed), or `value` itself"""
+    return value._resolve() if isinstance(value, Lazy) else value
+
+
+def is_built(value):
+    return not isinstance(value, Lazy) or value._value is not _MISSING
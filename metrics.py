@@ -0,0 +1,160 @@
+import math
+import time
+import threading
+import numpy as np
+from contextlib import contextmanager
+from eventlog import log
+
+# === Metrics configuration ===
+PREFIX = "coinbot"
+QUANTILES = (0.5, 0.9, 0.99)
+SAMPLE_WINDOW = 1024  # Recent samples each quantile is computed over
+
+
+def _label_text(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+class Timing:
+    """Latency samples of one span: a ring of recent values plus lifetime count and sum"""
+
+    def __init__(self, size=SAMPLE_WINDOW):
+        self.samples = np.zeros(size)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.samples[self.count % len(self.samples)] = seconds
+        self.count += 1
+        self.sum += seconds
+
+    def quantiles(self, quantiles=QUANTILES):
+        recent = self.samples[:min(self.count, len(self.samples))]
+        if len(recent) == 0:
+            return [math.nan] * len(quantiles)
+        return list(np.quantile(recent, quantiles))
+
+
+class Metrics:
+    """Timing spans and counters for the trading loop.
+
+    span("stage", stage="candles") times a block into the summary
+    coinbot_stage_seconds{stage="candles"}; count("fallbacks", kind="stored")
+    increments coinbot_fallbacks_total{kind="stored"}. render() gives the
+    Prometheus text format served by serve(), dump() a readable table.
+    """
+
+    def __init__(self, prefix=PREFIX):
+        self.prefix = prefix
+        self.timings = {}  # (name, labels) -> Timing
+        self.counters = {}  # (name, labels) -> int
+        self._lock = threading.Lock()
+        self._server = None
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            timing = self.timings.get(key)
+            if timing is None:
+                timing = self.timings[key] = Timing()
+            timing.observe(seconds)
+
+    @contextmanager
+    def span(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def count(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    # === Export ===
+    def snapshot(self):
+        """{metric: {"count", "mean", "p50", ...}} for timings and {metric: total} for counters"""
+        result = {}
+        with self._lock:
+            for (name, labels), timing in sorted(self.timings.items()):
+                entry = {"count": timing.count, "mean": timing.sum / timing.count if timing.count else math.nan}
+                for quantile, value in zip(QUANTILES, timing.quantiles()):
+                    entry[f"p{quantile * 100:g}"] = value
+                result[f"{name}{_label_text(labels)}"] = entry
+            for (name, labels), total in sorted(self.counters.items()):
+                result[f"{name}{_label_text(labels)}"] = total
+        return result
+
+    def render(self):
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), timing in sorted(self.timings.items()):
+                metric = f"{self.prefix}_{name}_seconds"
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} summary")
+                    typed.add(metric)
+                for quantile, value in zip(QUANTILES, timing.quantiles()):
+                    lines.append(f"{metric}{_label_text(labels, quantile=quantile)} {value:.6g}")
+                lines.append(f"{metric}_sum{_label_text(labels)} {timing.sum:.6g}")
+                lines.append(f"{metric}_count{_label_text(labels)} {timing.count}")
+            for (name, labels), total in sorted(self.counters.items()):
+                metric = f"{self.prefix}_{name}_total"
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} counter")
+                    typed.add(metric)
+                lines.append(f"{metric}{_label_text(labels)} {total}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """Log every timing (ms) and counter as one "metrics" event"""
+        snapshot = self.snapshot()
+        lines = ["📏 Metrics:"]
+        for metric, value in snapshot.items():
+            if isinstance(value, dict):
+                lines.append(f"   {metric}: n={value['count']} p50={value['p50'] * 1000:.2f}ms "
+                             f"p99={value['p99'] * 1000:.2f}ms mean={value['mean'] * 1000:.2f}ms")
+            else:
+                lines.append(f"   {metric}: {value}")
+        log.info("metrics", "\n".join(lines).replace("{", "{{").replace("}", "}}"), metrics=snapshot)
+
+    def start_dump(self, interval):
+        """dump() every `interval` seconds from a daemon thread"""
+        def run():
+            while True:
+                time.sleep(interval)
+                self.dump()
+        threading.Thread(target=run, daemon=True).start()
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve render() at http://host:port/metrics from a daemon thread"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the bot's output
+
+        if self._server is None:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+
+metrics = Metrics()  # Shared by every module of the bot
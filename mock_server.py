@@ -0,0 +1,155 @@
+import sys
+import json
+import time
+import asyncio
+from types import SimpleNamespace
+from async_client import API_PREFIX
+
+# === Mock server configuration ===
+HOST = "127.0.0.1"
+PORT = 8765
+LATENCY = 0.0  # Seconds added to every answer, to stand in for the network
+
+
+def to_json(value):
+    """SDK-shaped SimpleNamespace responses (as the paper exchange gives) to plain JSON values"""
+    if isinstance(value, SimpleNamespace):
+        value = vars(value)
+    if isinstance(value, dict):
+        return {key: to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value.item() if hasattr(value, 'item') else value
+
+
+class MockAdvancedTradeServer:
+    """Local HTTP stand-in for api.coinbase.com/api/v3/brokerage.
+
+    Serves accounts, products, candles and orders from a SimulatedExchange,
+    so AsyncAdvancedTradeClient (or any raw-HTTP code) can be exercised and
+    timed offline with realistic fills. Requests without an Authorization or
+    CB-ACCESS-SIGN header get a 401, like the real API.
+
+        server = MockAdvancedTradeServer(SimulatedExchange({"SOL-EUR": candles}))
+        await server.start()  # then point the client at server.url
+    """
+
+    def __init__(self, exchange, host=HOST, port=PORT, latency=LATENCY, require_auth=True):
+        self.exchange = exchange
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.require_auth = require_auth
+        self.requests = 0
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def application(self):
+        from aiohttp import web
+
+        @web.middleware
+        async def common(request, handler):
+            self.requests += 1
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            if self.require_auth and not ("Authorization" in request.headers
+                                          or "CB-ACCESS-SIGN" in request.headers):
+                return web.json_response({"error": "UNAUTHENTICATED", "message": "missing signature"}, status=401)
+            try:
+                return web.json_response(to_json(await handler(request)))
+            except (KeyError, ValueError) as e:
+                return web.json_response({"error": "INVALID_ARGUMENT", "message": str(e)}, status=400)
+
+        app = web.Application(middlewares=[common])
+        app.router.add_routes([
+            web.get(API_PREFIX + "/time", self.server_time),
+            web.get(API_PREFIX + "/accounts", self.accounts),
+            web.get(API_PREFIX + "/products", self.products),
+            web.get(API_PREFIX + "/products/{product_id}", self.product),
+            web.get(API_PREFIX + "/products/{product_id}/candles", self.candles),
+            web.post(API_PREFIX + "/orders", self.create_order),
+            web.post(API_PREFIX + "/orders/batch_cancel", self.cancel_orders),
+            web.get(API_PREFIX + "/orders/historical/batch", self.list_orders),
+            web.get(API_PREFIX + "/orders/historical/{order_id}", self.order),
+        ])
+        return app
+
+    # === Handlers ===
+    async def server_time(self, request):
+        now = self.exchange.clock.time()
+        return {"iso": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)), "epochSeconds": str(int(now))}
+
+    async def accounts(self, request):
+        return self.exchange.get_accounts()
+
+    async def products(self, request):
+        products = [self.exchange.get_product(product_id) for product_id in self.exchange.candles]
+        return {"products": products, "num_products": len(products)}
+
+    async def product(self, request):
+        return self.exchange.get_product(request.match_info["product_id"])
+
+    async def candles(self, request):
+        query = request.query
+        limit = int(query["limit"]) if "limit" in query else None
+        return self.exchange.get_candles(request.match_info["product_id"], query["start"], query["end"],
+                                         query.get("granularity"), limit)
+
+    async def create_order(self, request):
+        body = json.loads(await request.text())
+        return self.exchange.create_order(body["client_order_id"], body["product_id"], body["side"],
+                                          body["order_configuration"])
+
+    async def cancel_orders(self, request):
+        body = json.loads(await request.text())
+        return self.exchange.cancel_orders(body["order_ids"])
+
+    async def order(self, request):
+        return self.exchange.get_order(request.match_info["order_id"])
+
+    async def list_orders(self, request):
+        return self.exchange.list_orders(request.query.getall("order_ids", None))
+
+    # === Lifecycle ===
+    async def start(self):
+        from aiohttp import web
+        self._runner = web.AppRunner(self.application(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0:
+            self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+# === Entry point ===
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python mock_server.py <product_id> <archive series dir|candles.npz|candles.csv> [port]")
+        sys.exit(1)
+    from backtest import load_candles
+    from paper_exchange import SimulatedExchange
+    from clock import ReplayClock
+
+    candles = load_candles(sys.argv[2])
+    # Time stands still just after the last candle, so every candle is closed and served
+    exchange = SimulatedExchange({sys.argv[1]: candles}, clock=ReplayClock(int(candles["start"][-1]) + 60))
+    server = MockAdvancedTradeServer(exchange, port=int(sys.argv[3]) if len(sys.argv) > 3 else PORT)
+
+    async def serve():
+        await server.start()
+        print(f"🧪 Mock Advanced Trade API at {server.url}{API_PREFIX}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
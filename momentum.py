@@ -1,98 +1,155 @@
 import os
 import time
-import pandas as pd
-from dotenv import load_dotenv
-from coinbase.rest import RESTClient
-import requests
-from ecdsa import SigningKey, NIST256p
-import hashlib
-import base64
-from datetime import datetime, timedelta
-
-# === Load environment variables ===
-load_dotenv(dotenv_path="/home/alecrimi/Documents/coinbot/my.env")
-API_KEY = os.getenv("COINBASE_API_KEY_ID")
-PRIVATE_KEY = os.getenv("COINBASE_PRIVATE_KEY")
-
-if not all([API_KEY, PRIVATE_KEY]):
-    raise ValueError("❌ Missing Coinbase API keys in .env file!")
+import traceback
+from datetime import datetime, timedelta, timezone
+from account_snapshot import AccountSnapshot
+from candle_archive import CandleArchive
+from candle_store import GRANULARITY_SECONDS, CandleStore, get_store
+from clock import WallClock
+from lazy import Lazy, is_built
+from order_manager import OrderManager, field
+from order_book import BOOK_DEPTH, choose_order, get_book, market_configuration
+from rate_limit import RateLimitedClient
+from indicators import engine_for
+from timeframes import timeframe_store
+from checkpoint import load_checkpoint, save_checkpoint
+from strategies import FLAT, LONG, MACrossover
+from eventlog import log
+from metrics import metrics
+# The SDK, requests, websockets and the paper exchange are imported where they are first used
+
+# === Environment ===
+ENV_FILE = os.getenv("COINBOT_ENV_FILE", "/home/alecrimi/Documents/coinbot/my.env")
 
 # === Configuration ===
 PRODUCT_ID = "SOL-EUR"
 FAST_MA = 5   # Reduced for testing
 SLOW_MA = 15  # Reduced for testing
+STRATEGY = MACrossover(FAST_MA, SLOW_MA)  # Any strategies.Strategy (e.g. ConfirmedCrossover(5, 15, 3))
 EUR_AMOUNT = 10.00
 SLEEP_TIME = 60
+ACCOUNT_TTL = 15  # Seconds an account listing is reused across balance lookups
+ARCHIVE_CANDLES = True  # Keep closed candles in the on-disk archive
+CANDLE_HISTORY = 100  # Minutes of candles kept in the store (at least)
+SIGNAL_GRANULARITY = "ONE_MINUTE"  # Bars the crossover runs on, aggregated from the 1-minute candles (e.g. "FIFTEEN_MINUTE")
 PAPER_TRADING = False
+PAPER_BALANCES = {"EUR": 100.00}  # Starting balances of the simulated paper exchange
+PAPER_REPLAY = None  # Candle archive dir/.npz/.csv to replay offline when paper trading; None uses live prices
+REPLAY_SPEED = None  # Replay speed-up over wall time (e.g. 1000); None runs as fast as possible
+FAST_EXECUTION = True  # Send orders over the pre-warmed OrderExecutor connection
+ORDER_BOOK = True  # Price each order against the L2 book; a market order that would walk it goes out as a limit
+MAX_SLIPPAGE = 0.002  # Estimated slippage vs mid a market order may have before it is capped by a limit
+STREAMING = False  # Build candles from the WebSocket trade feed instead of polling
+RECONNECT_DELAY = 5
+CHECKPOINT_FILE = "coinbot_state.npz"  # Candles, indicators, open orders and positions kept for a warm restart; None disables it
+CHECKPOINT_INTERVAL = 60  # Seconds between checkpoints
+WARM_RESTART_MAX_AGE = 900  # A younger checkpoint resumes without the warm-up fetch, safety checks or confirmation
+METRICS_PORT = 9108  # Prometheus scrape endpoint at http://127.0.0.1:9108/metrics; None disables it
+METRICS_DUMP_INTERVAL = 600  # Seconds between metric dumps to the output; None disables them
+LOG_FILE = "coinbot.jsonl"  # Structured event log, one JSON record per line
+LOG_LEVEL = "INFO"  # DEBUG adds the per-tick candle, balance and MA chatter
+
+log.configure(path=LOG_FILE, level=LOG_LEVEL)
 
 # === Initialize Coinbase Client ===
+def load_credentials():
+    """API key id and private key from the environment, after loading ENV_FILE"""
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=ENV_FILE)
+    api_key = os.getenv("COINBASE_API_KEY_ID")
+    private_key = os.getenv("COINBASE_PRIVATE_KEY")
+    if not all([api_key, private_key]):
+        raise ValueError("❌ Missing Coinbase API keys in .env file!")
+    return api_key, private_key.replace('\\n', '\n')
+
 def initialize_client():
-    fixed_private_key = PRIVATE_KEY.replace('\\n', '\n')
+    if PAPER_TRADING and PAPER_REPLAY:
+        from backtest import load_candles
+        from paper_exchange import SimulatedExchange
+        exchange = SimulatedExchange({PRODUCT_ID: load_candles(PAPER_REPLAY)}, balances=PAPER_BALANCES,
+                                     speed=REPLAY_SPEED)
+        log.info("client", "🧪 Paper exchange replaying {replay}", replay=PAPER_REPLAY)
+        return exchange
+
+    from coinbase.rest import RESTClient
+    api_key, private_key = load_credentials()
     client = RESTClient(
-        api_key=API_KEY,
-        api_secret=fixed_private_key
+        api_key=api_key,
+        api_secret=private_key
     )
-    print("✅ Coinbase Advanced API client initialized")
-    return client
+    log.info("client", "✅ Coinbase Advanced API client initialized")
+    if PAPER_TRADING:
+        from paper_exchange import SimulatedExchange
+        # Live prices, simulated balances and fills
+        log.info("client", "🧪 Paper exchange on live prices")
+        return SimulatedExchange(market=RateLimitedClient(client), balances=PAPER_BALANCES)
+    return RateLimitedClient(client)
 
-client = initialize_client()
+def initialize_clock():
+    # Replays run on the paper exchange's simulated clock, live trading on wall time
+    return client.clock if PAPER_TRADING and PAPER_REPLAY else WallClock()
+
+def initialize_executor():
+    from execution import OrderExecutor
+    return OrderExecutor(client)
+
+# Built on first use, so importing the strategy needs no credentials or network
+client = Lazy(initialize_client)
+clock = Lazy(initialize_clock)
+accounts = Lazy(lambda: AccountSnapshot(client, ttl=ACCOUNT_TTL, clock=clock.monotonic))
+executor = Lazy(initialize_executor)
+orders = Lazy(lambda: OrderManager(client, accounts))
+archive = CandleArchive()
+# Events logged while the client is still being built fall back to wall time
+log.configure(clock=lambda: clock.time() if is_built(clock) else time.time())
 
 # === Get recent price candles ===
+def minute_history():
+    """Minutes kept in the store: CANDLE_HISTORY, or enough for the strategy's warm-up in SIGNAL_GRANULARITY bars"""
+    return max(CANDLE_HISTORY, (STRATEGY.warmup + 1) * GRANULARITY_SECONDS[SIGNAL_GRANULARITY] // 60)
+
+def signal_candles(store):
+    """The 1-minute store aggregated to SIGNAL_GRANULARITY bars (no extra API calls)"""
+    with metrics.span("stage", stage="aggregate"):
+        return timeframe_store(store, SIGNAL_GRANULARITY, capacity=CANDLE_HISTORY)
+
 def get_recent_data():
-    """Get recent candle data with correct date parameters"""
+    """Refresh the candle store with only the candles that are new since the last tick"""
+    store = get_store(PRODUCT_ID, "ONE_MINUTE", capacity=minute_history())
     try:
-        # Calculate start and end times (last 100 minutes)
-        end_time = datetime.now()
-        start_time = end_time - timedelta(minutes=100)
-        
-        # Format dates as ISO strings
-        start_str = start_time.strftime('%Y-%m-%dT%H:%M:%SZ')
-        end_str = end_time.strftime('%Y-%m-%dT%H:%M:%SZ')
-        
-        print(f"📊 Fetching candles from {start_str} to {end_str}")
-        
-        response = client.get_candles(
-            product_id=PRODUCT_ID,
-            start=start_str,
-            end=end_str,
-            granularity="ONE_MINUTE"
-        )
-        
-        if hasattr(response, 'candles'):
-            candles = response.candles
-            print(f"✅ Received {len(candles)} candles")
-            
-            data = []
-            for candle in candles:
-                data.append({
-                    'start': getattr(candle, 'start', ''),
-                    'low': float(getattr(candle, 'low', 0)),
-                    'high': float(getattr(candle, 'high', 0)),
-                    'open': float(getattr(candle, 'open', 0)),
-                    'close': float(getattr(candle, 'close', 0)),
-                    'volume': float(getattr(candle, 'volume', 0))
-                })
-            
-            df = pd.DataFrame(data)
-            if len(df) > 0:
-                df['time'] = pd.to_datetime(df['start'])
-                df = df.sort_values('time')
-                print(f"✅ Processed {len(df)} candles")
-                return df
-            else:
-                raise Exception("No candle data in response")
-        else:
-            raise Exception("No candles attribute in response")
+        with metrics.span("stage", stage="candles"):
+            added = store.refresh(client, now=clock.time())
+        log.debug("candles", "📊 Received {added} new candles, {stored} stored", added=added, stored=len(store))
+        if ARCHIVE_CANDLES and not PAPER_TRADING:
+            archive_candles(store)
+        if len(store) > 0:
+            return store
+        raise Exception("No candle data in response")
             
     except Exception as e:
-        print(f"❌ SDK candle error: {e}")
+        log.error("candle_error", "❌ SDK candle error: {error}", error=str(e))
+        if len(store) > 0:
+            metrics.count("fallbacks", kind="stored_candles")
+            log.warning("fallback", "⚠️ Using {stored} stored candles", kind="stored_candles", stored=len(store))
+            return store
         # Fallback to simple price data
         return get_simple_price_data()
 
+def archive_candles(store):
+    """Append newly closed candles to the on-disk archive"""
+    try:
+        with metrics.span("stage", stage="archive"):
+            archived = archive.append_closed(store, now=clock.time())
+        if archived:
+            log.debug("archive", "🗄️ Archived {archived} closed candles", archived=archived)
+    except Exception as e:
+        log.error("archive_error", "❌ Candle archive error: {error}", error=str(e))
+
 def get_simple_price_data():
     """Fallback: Create synthetic data from recent prices"""
     try:
-        print("🔄 Using simple price data fallback...")
+        log.warning("fallback", "🔄 Using simple price data fallback...", kind="synthetic_candles")
+        metrics.count("fallbacks", kind="synthetic_candles")
         
         # Get current product info
         product = client.get_product(product_id=PRODUCT_ID)
@@ -101,7 +158,7 @@ def get_simple_price_data():
         # Create synthetic data for last 30 minutes
         data = []
         for i in range(30):
-            time_point = datetime.now() - timedelta(minutes=30-i)
+            time_point = clock.now() - timedelta(minutes=30-i)
             # Add some random variation to the price
             variation = current_price * (0.99 + 0.02 * (i / 30))  # Gradual increase
             data.append({
@@ -113,24 +170,23 @@ def get_simple_price_data():
                 'volume': 100.0
             })
         
-        df = pd.DataFrame(data)
-        df['time'] = pd.to_datetime(df['start'])
-        df = df.sort_values('time')
-        print(f"✅ Created synthetic data with {len(df)} points")
-        return df
+        store = CandleStore.from_rows(PRODUCT_ID, data)
+        log.info("fallback", "✅ Created synthetic data with {points} points", kind="synthetic_candles", points=len(store))
+        return store
         
     except Exception as e:
-        print(f"❌ Simple data fallback failed: {e}")
+        log.error("fallback_error", "❌ Simple data fallback failed: {error}", error=str(e))
         # Last resort: create very basic data
         return create_basic_data()
 
 def create_basic_data():
     """Create minimal data to keep bot running"""
-    print("⚠️ Creating basic data structure...")
+    log.warning("fallback", "⚠️ Creating basic data structure...", kind="basic_candles")
+    metrics.count("fallbacks", kind="basic_candles")
     data = []
     for i in range(50):
         data.append({
-            'start': (datetime.now() - timedelta(minutes=50-i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'start': (clock.now() - timedelta(minutes=50-i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
             'close': 19.0 + (i * 0.01),  # Simple trend
             'low': 18.9 + (i * 0.01),
             'high': 19.1 + (i * 0.01),
@@ -138,157 +194,394 @@ def create_basic_data():
             'volume': 100.0
         })
     
-    df = pd.DataFrame(data)
-    df['time'] = pd.to_datetime(df['start'])
-    return df
+    return CandleStore.from_rows(PRODUCT_ID, data)
 
 # === Get current position ===
 def get_current_position():
     try:
-        accounts = client.get_accounts()
-        for account in accounts.accounts:
-            if getattr(account, 'currency', '') == 'SOL':
-                available_balance = getattr(getattr(account, 'available_balance', None), 'value', '0')
-                sol_balance = float(available_balance) if available_balance else 0.0
-                print(f"📊 SOL balance: {sol_balance:.4f}")
-                return sol_balance
-        return 0.0
+        sol_balance = accounts.balance('SOL')
+        log.debug("balance", "📊 SOL balance: {balance:.4f}", currency="SOL", balance=sol_balance)
+        return sol_balance
     except Exception as e:
-        print(f"❌ Error checking position: {e}")
+        log.error("balance_error", "❌ Error checking position: {error}", currency="SOL", error=str(e))
         return 0.0
 
 # === Place buy/sell order ===
-def place_order(side, amount=None):
+def place_order(side, amount=None, product_id=PRODUCT_ID, signal_time=None):
     if PAPER_TRADING:
-        print(f"🧪 PAPER TRADE: Would place {side.upper()} order for {amount} {'EUR' if side.upper() == 'BUY' else 'SOL'}")
-        return {"success": True, "order_id": "paper_trade"}
+        base, quote = product_id.split('-')
+        log.info("paper_order", "🧪 PAPER TRADE: {side} order for {amount} {currency}", side=side.upper(), amount=amount,
+                 currency=quote if side.upper() == 'BUY' else base)
 
     try:
-        if side.upper() == "BUY":
-            order_config = {
-                "market_market_ioc": {
-                    "quote_size": str(amount)  # Spend exact EUR amount
-                }
-            }
-        else:  # SELL
-            order_config = {
-                "market_market_ioc": {
-                    "base_size": str(amount)  # Sell exact SOL amount
-                }
-            }
-        
-        response = client.create_order(
-            client_order_id=str(int(time.time())),
-            product_id=PRODUCT_ID,
-            side=side.upper(),
-            order_configuration=order_config
-        )
-        
-        print(f"✅ {side.upper()} order placed successfully!")
-        print(f"   Order ID: {getattr(response, 'order_id', 'Unknown')}")
-        return response
+        order_config = order_configuration(product_id, side.upper(), amount)
+        if FAST_EXECUTION and not PAPER_TRADING and "market_market_ioc" in order_config:
+            # Pre-templated order over the warm connection, logging only after it is sent
+            def send(client_order_id):
+                return executor.send(product_id, side.upper(), amount, client_order_id, signal_time)
+        else:
+            def send(client_order_id):
+                return client.create_order(
+                    client_order_id=client_order_id,
+                    product_id=product_id,
+                    side=side.upper(),
+                    order_configuration=order_config
+                )
+
+        # Unique, idempotent client_order_id; the fill is reconciled into the account snapshot
+        with metrics.span("stage", stage="order"):
+            order = orders.submit(product_id, side.upper(), amount, send)
+        if order.status == "REJECTED":
+            metrics.count("orders", side=side.upper(), result="rejected")
+            log.error("order_rejected", "❌ Order rejected: {reason}", product_id=product_id, side=side.upper(),
+                      client_order_id=order.client_order_id, reason=field(order.response, 'error_response', order.response))
+            return None
+        metrics.count("orders", side=side.upper(), result="placed")
+        log.info("order", "✅ {side} order placed successfully!\n   Order ID: {order_id}", product_id=product_id,
+                 side=side.upper(), amount=amount, client_order_id=order.client_order_id,
+                 order_id=order.order_id or 'Unknown')
+        return order.response
         
     except Exception as e:
-        print(f"❌ Order failed: {e}")
+        metrics.count("orders", side=side.upper(), result="failed")
+        log.error("order_error", "❌ Order failed: {error}", product_id=product_id, side=side.upper(), error=str(e))
         return None
 
+# === Order book ===
+_increments = {}
+
+def product_increments(product_id):
+    """(price, base size) increments of a product, fetched once; None where the client doesn't say"""
+    if product_id not in _increments:
+        product = client.get_product(product_id=product_id)
+        _increments[product_id] = tuple(float(field(product, name, 0) or 0) or None
+                                        for name in ("price_increment", "base_increment"))
+    return _increments[product_id]
+
+def uses_book():
+    return ORDER_BOOK and not (PAPER_TRADING and PAPER_REPLAY)  # Replays have candles, not depth
+
+def refresh_book(product_id=PRODUCT_ID):
+    """Fetch the product's L2 book over REST at the start of a tick, unless the stream keeps it fresh"""
+    book = get_book(product_id)
+    now = clock.time()
+    if uses_book() and not book.fresh(now):
+        try:
+            with metrics.span("stage", stage="order_book"):
+                book.load_snapshot(client.get_product_book(product_id=product_id, limit=BOOK_DEPTH), now)
+        except Exception as e:
+            log.warning("order_book", "⚠️  Order book refresh failed for {product_id}: {error}",
+                        product_id=product_id, error=str(e))
+    return book
+
+def current_book(product_id):
+    """The product's L2 book as last refreshed; placing an order never waits on a book fetch"""
+    book = get_book(product_id)
+    if not book.fresh(clock.time()):
+        raise Exception("order book is stale")
+    return book
+
+def order_configuration(product_id, side, amount):
+    """Market order, or an IOC limit capped at MAX_SLIPPAGE from mid when the book is too thin for it"""
+    if not uses_book():
+        return market_configuration(side, amount)
+    try:
+        price_increment, size_increment = product_increments(product_id)
+        config, estimate = choose_order(current_book(product_id), side, amount, MAX_SLIPPAGE,
+                                        price_increment, size_increment)
+    except Exception as e:
+        log.warning("order_book", "⚠️  No order book for {product_id}, sending a market order: {error}",
+                    product_id=product_id, error=str(e))
+        return market_configuration(side, amount)
+    if estimate["slippage"] is None:
+        log.warning("order_book", "⚠️  {product_id} order book is empty, sending a market order", product_id=product_id)
+        return config
+    limit = "sor_limit_ioc" in config
+    metrics.count("order_types", kind="limit" if limit else "market")
+    log.info("order_book", ("📖 Est. slippage {slippage:.3%}, capping with a limit at €{limit_price:.4f}" if limit
+                           else "📖 Est. slippage {slippage:.3%} at avg €{average_price:.4f}, sending a market order"),
+             product_id=product_id, side=side, **estimate)
+    return config
+
 # === Get current price ===
 def get_current_price():
     try:
         product = client.get_product(product_id=PRODUCT_ID)
         price = float(getattr(product, 'price', '0'))
-        print(f"💰 Current price: €{price:.2f}")
+        log.debug("price", "💰 Current price: €{price:.2f}", price=price)
         return price
     except Exception as e:
-        print(f"❌ Error getting price: {e}")
+        log.error("price_error", "❌ Error getting price: {error}", error=str(e))
+        metrics.count("fallbacks", kind="price")
         return 19.0  # Fallback price
 
 # === Get EUR balance ===
 def get_eur_balance():
     try:
-        accounts = client.get_accounts()
-        for account in accounts.accounts:
-            if getattr(account, 'currency', '') == 'EUR':
-                eur_balance = getattr(getattr(account, 'available_balance', None), 'value', '0')
-                balance = float(eur_balance) if eur_balance else 0.0
-                print(f"💰 EUR balance: €{balance:.2f}")
-                return balance
-        return 0.0
+        balance = accounts.balance('EUR')
+        log.debug("balance", "💰 EUR balance: €{balance:.2f}", currency="EUR", balance=balance)
+        return balance
     except Exception as e:
-        print(f"❌ Error checking EUR balance: {e}")
+        log.error("balance_error", "❌ Error checking EUR balance: {error}", currency="EUR", error=str(e))
         return 0.0
 
+# === Signal check ===
+def check_signal(df):
+    """Evaluate STRATEGY on the latest candles and trade on a signal"""
+    # An order still working would leave the balance (and so the position) half-updated
+    pending = orders.settle(PRODUCT_ID)
+    if pending:
+        log.warning("pending_orders", "⏳ {count} {product_id} orders still open, skipping this signal check",
+                    product_id=PRODUCT_ID, count=len(pending))
+        return
+
+    # Get current position and price
+    current_sol = get_current_position()
+    current_price = get_current_price()
+    
+    # Determine position (consider we have a position if we have any SOL)
+    position = "long" if current_sol > 0.001 else "flat"  # 0.001 SOL threshold
+    
+    # Calculate indicators
+    with metrics.span("stage", stage="indicators"):
+        indicators = engine_for(df, *STRATEGY.indicators)
+        indicators.sync(df)
+        latest = {spec: indicators.value(*spec) for spec in STRATEGY.indicators}
+        signal = STRATEGY.signal(df, latest)
+    values = {f"{kind}_{window}": value for (kind, window), value in latest.items()}
+
+    log.debug("tick", "\n🕒 {time}\n📊 Position: {position} ({sol:.4f} SOL)\n📊 {strategy}: {summary}",
+              time=clock.strftime(), position=position.upper(), sol=current_sol, price=current_price,
+              strategy=str(STRATEGY), summary=" | ".join(f"{name} €{value:.2f}" for name, value in values.items()),
+              **values)
+
+    # === Strategy Logic ===
+    # Orders go out first, the signal is logged once they are on the wire
+    if signal == LONG and position != "long":
+        signal_time = time.perf_counter()
+        eur_balance = accounts.balance('EUR')  # Cached from the position lookup above
+        if eur_balance >= EUR_AMOUNT:
+            place_order("BUY", EUR_AMOUNT, signal_time=signal_time)
+            log.info("signal", "🎯 BUY SIGNAL: {strategy} turned long!\n💸 Bought €{amount:.2f} worth of SOL",
+                     side="BUY", amount=EUR_AMOUNT, strategy=str(STRATEGY), price=current_price, **values)
+        else:
+            log.warning("signal", "🎯 BUY SIGNAL: {strategy} turned long!\n"
+                        "❌ Insufficient EUR balance. Need €{amount:.2f}, have €{balance:.2f}",
+                        side="BUY", amount=EUR_AMOUNT, balance=eur_balance, strategy=str(STRATEGY), skipped=True,
+                        **values)
+
+    elif signal == FLAT and position == "long":
+        place_order("SELL", current_sol, signal_time=time.perf_counter())
+        log.info("signal", "🎯 SELL SIGNAL: {strategy} turned flat!\n💸 Sold {amount:.4f} SOL",
+                 side="SELL", amount=current_sol, strategy=str(STRATEGY), price=current_price, **values)
+
+    else:
+        log.debug("no_signal", "⚪ No trade signal - waiting...")
+
+# === Order execution warm-up ===
+def start_execution(product_ids=(PRODUCT_ID,)):
+    """Start fill reconciliation, fetch product increments, open the order connection and pre-build order templates"""
+    orders.start()
+    if uses_book():
+        for product_id in product_ids:
+            try:
+                product_increments(product_id)
+            except Exception as e:
+                log.warning("order_book", "⚠️  Increments for {product_id} unavailable, will fetch on first order: {error}",
+                            product_id=product_id, error=str(e))
+    if FAST_EXECUTION and not PAPER_TRADING:
+        try:
+            executor.start(product_ids)
+            log.info("execution", "✅ Order connection warmed up")
+        except Exception as e:
+            log.warning("execution", "⚠️  Order warm-up failed, will connect on first order: {error}", error=str(e))
+
+# === Metrics ===
+def start_metrics():
+    """Serve the Prometheus endpoint and schedule periodic dumps"""
+    if METRICS_PORT:
+        try:
+            metrics.serve(METRICS_PORT)
+            log.info("metrics", "📏 Metrics at http://127.0.0.1:{port}/metrics", port=METRICS_PORT)
+        except OSError as e:
+            log.warning("metrics", "⚠️  Metrics endpoint unavailable: {error}", error=str(e))
+    if METRICS_DUMP_INTERVAL:
+        metrics.start_dump(METRICS_DUMP_INTERVAL)
+
+# === Checkpointing ===
+live_confirmed = False  # The operator confirmed live trading (this run or the one resumed)
+_last_checkpoint = None
+
+def save_state(force=False):
+    """Checkpoint the bot at most every CHECKPOINT_INTERVAL seconds (replays are never checkpointed)"""
+    global _last_checkpoint
+    if not CHECKPOINT_FILE or (PAPER_TRADING and PAPER_REPLAY):
+        return
+    now = clock.time()
+    if not force and _last_checkpoint is not None and now - _last_checkpoint < CHECKPOINT_INTERVAL:
+        return
+    store = get_store(PRODUCT_ID, "ONE_MINUTE", capacity=minute_history())
+    if len(store) == 0:
+        return
+    try:
+        with metrics.span("stage", stage="checkpoint"):
+            state = {
+                "product_id": PRODUCT_ID,
+                "strategy": str(STRATEGY),
+                "granularity": SIGNAL_GRANULARITY,
+                "paper": PAPER_TRADING,
+                "confirmed": live_confirmed,
+                "saved_at": now,
+                "indicators": engine_for(signal_candles(store), *STRATEGY.indicators).snapshot(),
+                "orders": orders.snapshot(),
+            }
+            save_checkpoint(CHECKPOINT_FILE, state, store)
+        _last_checkpoint = now
+        log.debug("checkpoint", "💾 State saved to {path}", path=CHECKPOINT_FILE, candles=len(store))
+    except Exception as e:
+        log.error("checkpoint_error", "❌ Checkpoint failed: {error}", error=str(e))
+
+def load_state():
+    """(state, candle columns) of a recent checkpoint of this configuration, or None for a cold start"""
+    if not CHECKPOINT_FILE or (PAPER_TRADING and PAPER_REPLAY):
+        return None
+    checkpoint = load_checkpoint(CHECKPOINT_FILE)
+    if checkpoint is None:
+        return None
+    state = checkpoint[0]
+    age = time.time() - state["saved_at"]
+    if (state["product_id"], state["strategy"], state["granularity"], state["paper"]) != \
+            (PRODUCT_ID, str(STRATEGY), SIGNAL_GRANULARITY, PAPER_TRADING):
+        log.warning("checkpoint", "⚠️  Checkpoint {path} is for another configuration, starting cold",
+                    path=CHECKPOINT_FILE)
+        return None
+    if age > WARM_RESTART_MAX_AGE:
+        log.info("checkpoint", "⏳ Checkpoint {path} is {age:.0f}s old, starting cold", path=CHECKPOINT_FILE, age=age)
+        return None
+    return checkpoint
+
+def restore_state(checkpoint):
+    """Resume candles, indicator accumulators, open orders and positions; the next refresh only fills the gap"""
+    global live_confirmed
+    state, columns = checkpoint
+    with metrics.span("stage", stage="restore"):
+        store = get_store(PRODUCT_ID, "ONE_MINUTE", capacity=minute_history())
+        store.extend_columns(columns)
+        engine_for(signal_candles(store), *STRATEGY.indicators).restore(state["indicators"])
+        orders.restore(state["orders"])
+    live_confirmed = live_confirmed or state["confirmed"]
+    log.info("resume", "♻️  Resumed from {path}: {candles} candles, {open_orders} open orders",
+             path=CHECKPOINT_FILE, candles=len(store), open_orders=len(state["orders"]["open_orders"]),
+             age=time.time() - state["saved_at"])
+    cost_basis = orders.cost_basis(PRODUCT_ID)
+    if cost_basis is not None:
+        position = orders.positions[PRODUCT_ID]
+        log.info("resume", "📊 Position: {size:.4f} SOL at €{cost_basis:.2f} average cost", product_id=PRODUCT_ID,
+                 size=position["size"], cost=position["cost"], cost_basis=cost_basis)
+
 # === Main trading loop ===
-def run_bot():
-    print(f"🚀 Starting LIVE Momentum Bot for {PRODUCT_ID}")
-    print(f"📈 Strategy: {FAST_MA}/{SLOW_MA} Moving Average Crossover")
-    print(f"💵 Trade Amount: €{EUR_AMOUNT:.2f} per buy")
-    print(f"⏰ Check Interval: {SLEEP_TIME} seconds")
-    print("=" * 50)
+def run_bot(checkpoint=None):
+    log.info("start", "🚀 Starting LIVE Momentum Bot for {product_id}\n"
+             "📈 Strategy: {strategy} on {granularity} bars\n"
+             "💵 Trade Amount: €{amount:.2f} per buy\n⏰ Check Interval: {interval} seconds\n" + "=" * 50,
+             product_id=PRODUCT_ID, strategy=str(STRATEGY), granularity=SIGNAL_GRANULARITY, amount=EUR_AMOUNT,
+             interval=SLEEP_TIME)
+    if checkpoint is not None:
+        restore_state(checkpoint)
+    start_metrics()
+    start_execution()
     
     while True:
         try:
-            # Get current position and price
-            current_sol = get_current_position()
-            current_price = get_current_price()
-            
-            # Determine position (consider we have a position if we have any SOL)
-            position = "long" if current_sol > 0.001 else "flat"  # 0.001 SOL threshold
-            
-            print(f"\n🕒 {time.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"📊 Position: {position.upper()} ({current_sol:.4f} SOL)")
-            
-            # Get market data
-            df = get_recent_data()
-            if len(df) < SLOW_MA:
-                print(f"⚠️  Not enough data points. Have {len(df)}, need {SLOW_MA}")
-                time.sleep(SLEEP_TIME)
+            with metrics.span("tick"):
+                # Get market data (and depth now, so a signal's order doesn't wait for it)
+                if not STREAMING:
+                    refresh_book()
+                df = signal_candles(get_recent_data())
+                if len(df) >= STRATEGY.warmup:
+                    check_signal(df)
+            if len(df) < STRATEGY.warmup:
+                log.warning("not_enough_data", "⚠️  Not enough data points. Have {have}, need {need}",
+                            have=len(df), need=STRATEGY.warmup, granularity=SIGNAL_GRANULARITY)
+                if not clock.sleep(SLEEP_TIME):
+                    break
                 continue
-            
-            # Calculate indicators
-            df["fast_ma"] = df["close"].rolling(FAST_MA).mean()
-            df["slow_ma"] = df["close"].rolling(SLOW_MA).mean()
 
-            last_fast = df["fast_ma"].iloc[-1]
-            last_slow = df["slow_ma"].iloc[-1]
+        except Exception as e:
+            metrics.count("loop_errors")
+            log.error("loop_error", "⚠️  Error in main loop: {error}", error=str(e), traceback=traceback.format_exc())
+
+        save_state()
+        log.debug("sleep", "😴 Sleeping for {seconds} seconds...", seconds=SLEEP_TIME)
+        if not clock.sleep(SLEEP_TIME):
+            break
 
-            print(f"📊 Fast MA: €{last_fast:.2f} | Slow MA: €{last_slow:.2f}")
+    if PAPER_TRADING and PAPER_REPLAY:
+        orders.reconcile()
+        log.info("replay_finished", "🏁 Replay finished: {summary}", summary=client.summary())
+        metrics.dump()
 
-            # === Strategy Logic ===
-            if last_fast > last_slow and position != "long":
-                print("🎯 BUY SIGNAL: Fast MA crossed above Slow MA!")
-                eur_balance = get_eur_balance()
-                if eur_balance >= EUR_AMOUNT:
-                    print(f"💸 Buying €{EUR_AMOUNT:.2f} worth of SOL...")
-                    place_order("BUY", EUR_AMOUNT)
-                else:
-                    print(f"❌ Insufficient EUR balance. Need €{EUR_AMOUNT:.2f}, have €{eur_balance:.2f}")
+# === Streaming trading loop ===
+async def run_stream_bot(transport=None, checkpoint=None):
+    """Check the strategy the moment a candle closes on the WebSocket trade feed"""
+    log.info("start", "🚀 Starting STREAMING Momentum Bot for {product_id}\n"
+             "📈 Strategy: {strategy} on {granularity} bars\n"
+             "💵 Trade Amount: €{amount:.2f} per buy\n" + "=" * 50,
+             product_id=PRODUCT_ID, strategy=str(STRATEGY), granularity=SIGNAL_GRANULARITY, amount=EUR_AMOUNT,
+             streaming=True)
 
-            elif last_fast < last_slow and position == "long":
-                print("🎯 SELL SIGNAL: Fast MA crossed below Slow MA!")
-                print(f"💸 Selling {current_sol:.4f} SOL...")
-                place_order("SELL", current_sol)
+    if checkpoint is not None:
+        restore_state(checkpoint)
+    start_metrics()
+    start_execution()
 
-            else:
-                print("⚪ No trade signal - waiting...")
+    import asyncio
+    from stream import MarketStream
+    store = get_store(PRODUCT_ID, "ONE_MINUTE", capacity=minute_history())
+    loop = asyncio.get_running_loop()
 
+    async def on_candle(product_id, candle):
+        store.append(*candle)
+        bars = signal_candles(store)
+        log.debug("candle", "🕯️ Candle closed at {start} (close €{close:.2f})", product_id=product_id,
+                  start=datetime.fromtimestamp(candle[0], tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S'), close=candle[4])
+        if len(bars) < STRATEGY.warmup:
+            log.warning("not_enough_data", "⚠️  Not enough data points. Have {have}, need {need}",
+                        have=len(bars), need=STRATEGY.warmup, granularity=SIGNAL_GRANULARITY)
+            return
+        try:
+            # Account and order calls block, keep them off the feed
+            await loop.run_in_executor(None, check_signal, bars)
         except Exception as e:
-            print(f"⚠️  Error in main loop: {e}")
-            import traceback
-            traceback.print_exc()
+            log.error("loop_error", "⚠️  Error in signal check: {error}", error=str(e))
+        save_state()
 
-        print(f"😴 Sleeping for {SLEEP_TIME} seconds...")
-        time.sleep(SLEEP_TIME)
+    while True:
+        try:
+            # Warm up (or fill the gap after a reconnect) over REST once
+            added = store.refresh(client, now=clock.time())
+            log.debug("candles", "📊 Received {added} new candles, {stored} stored", added=added, stored=len(store))
+        except Exception as e:
+            log.error("candle_error", "❌ SDK candle error: {error}", error=str(e))
+
+        books = {PRODUCT_ID: get_book(PRODUCT_ID)} if ORDER_BOOK else None
+        # A replay closes candles on trade time only, a live feed also on the clock
+        await MarketStream([PRODUCT_ID], on_candle, transport, books=books,
+                           clock=None if transport is not None else clock.time).run()
+        if transport is not None:
+            break  # Replays end for good
+        log.warning("feed", "🔌 Feed disconnected, reconnecting in {seconds} seconds...", seconds=RECONNECT_DELAY)
+        await asyncio.sleep(RECONNECT_DELAY)
 
 # === Safety Checks ===
 def safety_checks():
     """Perform safety checks before starting"""
-    print("🔒 Performing safety checks...")
+    log.info("safety", "🔒 Performing safety checks...")
     
     # Check if we can access the API
     try:
-        accounts = client.get_accounts()
-        print("✅ API connection: OK")
+        accounts.refresh()
+        log.info("safety", "✅ API connection: OK")
     except Exception as e:
         raise Exception(f"❌ API connection failed: {e}")
     
@@ -296,33 +589,47 @@ def safety_checks():
     try:
         product = client.get_product(product_id=PRODUCT_ID)
         product_name = getattr(product, 'display_name', PRODUCT_ID)
-        print(f"✅ Product {PRODUCT_ID}: OK ({product_name})")
+        log.info("safety", "✅ Product {product_id}: OK ({name})", product_id=PRODUCT_ID, name=product_name)
     except Exception as e:
         raise Exception(f"❌ Product {PRODUCT_ID} not found: {e}")
     
     # Check EUR balance
     eur_balance = get_eur_balance()
-    print(f"💰 EUR Balance: €{eur_balance:.2f}")
+    log.info("safety", "💰 EUR Balance: €{balance:.2f}", balance=eur_balance)
     
     if eur_balance < EUR_AMOUNT:
-        print(f"⚠️  Warning: Low EUR balance. Need €{EUR_AMOUNT:.2f}, have €{eur_balance:.2f}")
-        print("💡 You can deposit EUR or adjust EUR_AMOUNT in the code")
+        log.warning("safety", "⚠️  Warning: Low EUR balance. Need €{amount:.2f}, have €{balance:.2f}\n"
+                    "💡 You can deposit EUR or adjust EUR_AMOUNT in the code", amount=EUR_AMOUNT, balance=eur_balance)
     
-    print("✅ Safety checks completed!")
+    log.info("safety", "✅ Safety checks completed!")
 
 # === Entry point ===
 if __name__ == "__main__":
     try:
-        safety_checks()
-        print("\n" + "="*50)
-        if not PAPER_TRADING:
-            print("🚨 LIVE TRADING MODE - REAL MONEY AT RISK!")
-            confirmation = input("Type 'YES' to confirm you want to start LIVE trading: ")
-            if confirmation != "YES":
-                print("❌ Trading cancelled.")
-                exit()
-        run_bot()
+        checkpoint = load_state()
+        if checkpoint is not None and (PAPER_TRADING or checkpoint[0]["confirmed"]):
+            # Warm restart of a session that already passed the checks (and, live, was confirmed)
+            log.info("resume", "♻️  Warm restart, skipping safety checks")
+        else:
+            safety_checks()
+            log.info("start", "\n" + "=" * 50)
+            if not PAPER_TRADING:
+                log.warning("live", "🚨 LIVE TRADING MODE - REAL MONEY AT RISK!")
+                log.flush()  # Show everything before prompting
+                confirmation = input("Type 'YES' to confirm you want to start LIVE trading: ")
+                if confirmation != "YES":
+                    log.info("stop", "❌ Trading cancelled.")
+                    log.flush()
+                    exit()
+                live_confirmed = True
+        if STREAMING:
+            import asyncio
+            asyncio.run(run_stream_bot(checkpoint=checkpoint))
+        else:
+            run_bot(checkpoint)
     except KeyboardInterrupt:
-        print("\n🛑 Bot stopped by user")
+        if is_built(orders):
+            save_state(force=True)
+        log.info("stop", "\n🛑 Bot stopped by user")
     except Exception as e:
-        print(f"\n💥 Fatal error: {e}")
+        log.error("fatal", "\n💥 Fatal error: {error}", error=str(e))
@@ -1,17 +1,19 @@
 import os
-import time
-import pandas as pd
-from dotenv import load_dotenv
-from coinbase.rest import RESTClient
-from datetime import datetime, timedelta
+import traceback
+from datetime import datetime, timedelta, timezone
+from account_snapshot import AccountSnapshot
+from candle_archive import CandleArchive
+from candle_store import CandleStore, decode_candles, get_store
+from clock import WallClock
+from lazy import Lazy
+from order_manager import OrderManager, field
+from rate_limit import RateLimitedClient
+from indicators import engine_for
+from eventlog import log
+# The SDK and the paper exchange are imported where they are first used
 
-# === Load environment variables ===
-load_dotenv(dotenv_path="/home/alecrimi/Documents/coinbot/my.env")
-API_KEY = os.getenv("COINBASE_API_KEY_ID")
-PRIVATE_KEY = os.getenv("COINBASE_PRIVATE_KEY")
-
-if not all([API_KEY, PRIVATE_KEY]):
-    raise ValueError("❌ Missing Coinbase API keys in .env file!")
+# === Environment ===
+ENV_FILE = os.getenv("COINBOT_ENV_FILE", "/home/alecrimi/Documents/coinbot/my.env")
 
 # === Configuration ===
 PRODUCT_ID = "SOL-EUR"
@@ -19,107 +21,110 @@ FAST_MA = 5
 SLOW_MA = 15
 MIN_TRADE_SIZE = 0.006  # Minimum SOL amount to trade (your current balance)
 SLEEP_TIME = 60
+ACCOUNT_TTL = 15  # Seconds an account listing is reused across balance lookups
+ARCHIVE_CANDLES = True  # Keep closed candles in the on-disk archive
+CANDLE_HISTORY = 120  # Minutes of candles kept in the store
 PAPER_TRADING = False  # Real trading
+PAPER_BALANCES = {"EUR": 100.00}  # Starting balances of the simulated paper exchange
+LOG_FILE = "coinbot.jsonl"  # Structured event log, one JSON record per line
+LOG_LEVEL = "INFO"  # DEBUG adds the per-tick candle, balance and MA chatter
+
+log.configure(path=LOG_FILE, level=LOG_LEVEL)
 
 # === Initialize Coinbase Client ===
+def load_credentials():
+    """API key id and private key from the environment, after loading ENV_FILE"""
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=ENV_FILE)
+    api_key = os.getenv("COINBASE_API_KEY_ID")
+    private_key = os.getenv("COINBASE_PRIVATE_KEY")
+    if not all([api_key, private_key]):
+        raise ValueError("❌ Missing Coinbase API keys in .env file!")
+    return api_key, private_key.replace('\\n', '\n')
+
 def initialize_client():
-    fixed_private_key = PRIVATE_KEY.replace('\\n', '\n')
+    from coinbase.rest import RESTClient
+    api_key, private_key = load_credentials()
     client = RESTClient(
-        api_key=API_KEY,
-        api_secret=fixed_private_key
+        api_key=api_key,
+        api_secret=private_key
     )
-    print("✅ Coinbase Advanced API client initialized")
-    return client
+    log.info("client", "✅ Coinbase Advanced API client initialized")
+    if PAPER_TRADING:
+        from paper_exchange import SimulatedExchange
+        # Live prices, simulated balances and fills
+        log.info("client", "🧪 Paper exchange on live prices")
+        return SimulatedExchange(market=RateLimitedClient(client), balances=PAPER_BALANCES)
+    return RateLimitedClient(client)
 
-client = initialize_client()
+# Built on first use, so importing the strategy needs no credentials or network
+client = Lazy(initialize_client)
+clock = WallClock()
+accounts = Lazy(lambda: AccountSnapshot(client, ttl=ACCOUNT_TTL, clock=clock.monotonic))
+orders = Lazy(lambda: OrderManager(client, accounts))
+archive = CandleArchive()
   
-# === Get recent price candles (with epoch timestamps) ===
 # === Get recent price candles ===
 def get_recent_data():
-    """Get recent candle data using epoch timestamps"""
+    """Refresh the candle store with only the candles that are new since the last tick"""
+    store = get_store(PRODUCT_ID, "ONE_MINUTE", capacity=CANDLE_HISTORY)
     try:
-        # Calculate start and end times (last 2 hours)
-        end_time = datetime.utcnow()
-        start_time = end_time - timedelta(hours=2)
-        
-        # Convert to epoch seconds
-        start_epoch = int(start_time.timestamp())
-        end_epoch = int(end_time.timestamp())
-        
-        print(f"📊 Fetching candles from {start_time} to {end_time}")
-        
-        response = client.get_candles(
-            product_id=PRODUCT_ID,
-            start=str(start_epoch),
-            end=str(end_epoch),
-            granularity="ONE_MINUTE"
-        )
-        
-        return process_candle_response(response)
+        added = store.refresh(client, now=clock.time())
+        log.debug("candles", "📊 Received {added} new candles, {stored} stored", added=added, stored=len(store))
+        if ARCHIVE_CANDLES:
+            archive_candles(store)
+        if len(store) > 0:
+            return store
+        log.warning("fallback", "⚠️ No candle data in response, using fallback", kind="synthetic_candles")
+        return get_simple_price_data()
             
     except Exception as e:
-        print(f"❌ SDK candle error: {e}")
+        log.error("candle_error", "❌ SDK candle error: {error}", error=str(e))
+        if len(store) > 0:
+            log.warning("fallback", "⚠️ Using {stored} stored candles", kind="stored_candles", stored=len(store))
+            return store
         return get_simple_price_data()
 
 
 def process_candle_response(response):
-    """Process the candle response with correct timestamp handling"""
+    """Decode a candle response into a standalone candle store"""
     try:
         if hasattr(response, 'candles'):
             candles = response.candles
-            print(f"✅ Received {len(candles)} candles")
+            log.debug("candles", "✅ Received {received} candles", received=len(candles))
             
-            data = []
-            for candle in candles:
-                # Get the start timestamp - it might be epoch seconds or ISO string
-                start_attr = getattr(candle, 'start', '')
-                
-                # Convert to proper datetime
-                if isinstance(start_attr, (int, float)) or (isinstance(start_attr, str) and start_attr.isdigit()):
-                    # It's an epoch timestamp
-                    timestamp = int(start_attr)
-                    if timestamp > 1e9:  # If it's in seconds (not milliseconds)
-                        dt = datetime.fromtimestamp(timestamp)
-                    else:  # If it's in milliseconds
-                        dt = datetime.fromtimestamp(timestamp / 1000)
-                    start_str = dt.isoformat() + 'Z'
-                else:
-                    # It's probably already an ISO string
-                    start_str = start_attr
-                
-                data.append({
-                    'start': start_str,
-                    'low': float(getattr(candle, 'low', 0)),
-                    'high': float(getattr(candle, 'high', 0)),
-                    'open': float(getattr(candle, 'open', 0)),
-                    'close': float(getattr(candle, 'close', 0)),
-                    'volume': float(getattr(candle, 'volume', 0))
-                })
-            
-            df = pd.DataFrame(data)
-            if len(df) > 0:
-                # Parse timestamps properly
-                df['time'] = pd.to_datetime(df['start'], utc=True)
-                df = df.sort_values('time')
-                print(f"✅ Processed {len(df)} candles with proper timestamps")
-                print(f"📅 Time range: {df['time'].min()} to {df['time'].max()}")
-                return df
+            store = CandleStore.from_columns(PRODUCT_ID, decode_candles(candles))
+            if len(store) > 0:
+                first, last = (datetime.fromtimestamp(store['start'][i], tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+                               for i in (0, -1))
+                log.debug("candles", "✅ Processed {stored} candles with proper timestamps\n"
+                          "📅 Time range: {first} to {last}", stored=len(store), first=first, last=last)
+                return store
             else:
-                print("⚠️ No candle data in response, using fallback")
+                log.warning("fallback", "⚠️ No candle data in response, using fallback", kind="synthetic_candles")
                 return get_simple_price_data()
         else:
-            print("⚠️ No candles attribute in response, using fallback")
+            log.warning("fallback", "⚠️ No candles attribute in response, using fallback", kind="synthetic_candles")
             return get_simple_price_data()
             
     except Exception as e:
-        print(f"❌ Error processing candles: {e}")
+        log.error("candle_error", "❌ Error processing candles: {error}", error=str(e))
         return get_simple_price_data()
         
 
+def archive_candles(store):
+    """Append newly closed candles to the on-disk archive"""
+    try:
+        archived = archive.append_closed(store, now=clock.time())
+        if archived:
+            log.debug("archive", "🗄️ Archived {archived} closed candles", archived=archived)
+    except Exception as e:
+        log.error("archive_error", "❌ Candle archive error: {error}", error=str(e))
+
 def get_simple_price_data():
     """Fallback: Create synthetic data from recent prices"""
     try:
-        print("🔄 Using simple price data fallback...")
+        log.warning("fallback", "🔄 Using simple price data fallback...", kind="synthetic_candles")
         
         # Get current product info
         product = client.get_product(product_id=PRODUCT_ID)
@@ -128,7 +133,7 @@ def get_simple_price_data():
         # Create synthetic data for last 30 minutes
         data = []
         for i in range(30):
-            time_point = datetime.utcnow() - timedelta(minutes=30-i)
+            time_point = clock.utcnow() - timedelta(minutes=30-i)
             # Add some random variation to the price
             variation = current_price * (0.99 + 0.02 * (i / 30))  # Gradual increase
             data.append({
@@ -140,25 +145,23 @@ def get_simple_price_data():
                 'volume': 100.0
             })
         
-        df = pd.DataFrame(data)
-        df['time'] = pd.to_datetime(df['start'])
-        df = df.sort_values('time')
-        print(f"✅ Created synthetic data with {len(df)} points")
-        return df
+        store = CandleStore.from_rows(PRODUCT_ID, data)
+        log.info("fallback", "✅ Created synthetic data with {points} points", kind="synthetic_candles", points=len(store))
+        return store
         
     except Exception as e:
-        print(f"❌ Simple data fallback failed: {e}")
+        log.error("fallback_error", "❌ Simple data fallback failed: {error}", error=str(e))
         # Last resort: create very basic data
         return create_basic_data()
 
 def create_basic_data():
     """Create minimal data to keep bot running"""
-    print("⚠️ Creating basic data structure...")
+    log.warning("fallback", "⚠️ Creating basic data structure...", kind="basic_candles")
     current_price = get_current_price()
     data = []
     for i in range(50):
         data.append({
-            'start': (datetime.utcnow() - timedelta(minutes=50-i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'start': (clock.utcnow() - timedelta(minutes=50-i)).strftime('%Y-%m-%dT%H:%M:%SZ'),
             'close': current_price + (i * 0.01),  # Simple trend
             'low': current_price * 0.998 + (i * 0.01),
             'high': current_price * 1.002 + (i * 0.01),
@@ -166,38 +169,24 @@ def create_basic_data():
             'volume': 100.0
         })
     
-    df = pd.DataFrame(data)
-    df['time'] = pd.to_datetime(df['start'])
-    return df
+    return CandleStore.from_rows(PRODUCT_ID, data)
 
 # === Get current position ===
 # === Get current position ===
 def get_current_position():
     try:
-        accounts = client.get_accounts()
-        for account in accounts.accounts:
-            if getattr(account, 'currency', '') == 'SOL':
-                # Extract the available_balance dictionary and get the value
-                available_balance_obj = getattr(account, 'available_balance', {})
-                if hasattr(available_balance_obj, 'value'):
-                    available_balance = getattr(available_balance_obj, 'value', '0')
-                else:
-                    # If it's a dictionary, access it directly
-                    available_balance = available_balance_obj.get('value', '0') if isinstance(available_balance_obj, dict) else '0'
-                
-                sol_balance = float(available_balance) if available_balance else 0.0
-                print(f"📊 SOL balance: {sol_balance:.6f}")
-                return sol_balance
-        return 0.0
+        sol_balance = accounts.balance('SOL')
+        log.debug("balance", "📊 SOL balance: {balance:.6f}", currency="SOL", balance=sol_balance)
+        return sol_balance
     except Exception as e:
-        print(f"❌ Error checking position: {e}")
+        log.error("balance_error", "❌ Error checking position: {error}", currency="SOL", error=str(e))
         return 0.0
         
 # === Place buy/sell order ===
 def place_order(side, amount=None):
     if PAPER_TRADING:
-        print(f"🧪 PAPER TRADE: Would place {side.upper()} order for {amount} {'EUR' if side.upper() == 'BUY' else 'SOL'}")
-        return {"success": True, "order_id": "paper_trade"}
+        log.info("paper_order", "🧪 PAPER TRADE: {side} order for {amount} {currency}", side=side.upper(), amount=amount,
+                 currency='EUR' if side.upper() == 'BUY' else 'SOL')
 
     try:
         if side.upper() == "BUY":
@@ -213,20 +202,25 @@ def place_order(side, amount=None):
                 }
             }
         
-        print(f"🎯 Placing {side.upper()} order for {amount}...")
-        response = client.create_order(
-            client_order_id=str(int(time.time())),
+        log.debug("placing_order", "🎯 Placing {side} order for {amount}...", side=side.upper(), amount=amount)
+        # Unique, idempotent client_order_id; the fill is reconciled into the account snapshot
+        order = orders.submit(PRODUCT_ID, side.upper(), amount, lambda client_order_id: client.create_order(
+            client_order_id=client_order_id,
             product_id=PRODUCT_ID,
             side=side.upper(),
             order_configuration=order_config
-        )
-        
-        print(f"✅ {side.upper()} order placed successfully!")
-        print(f"   Order ID: {getattr(response, 'order_id', 'Unknown')}")
-        return response
+        ))
+        if order.status == "REJECTED":
+            log.error("order_rejected", "❌ Order rejected: {reason}", product_id=PRODUCT_ID, side=side.upper(),
+                      client_order_id=order.client_order_id, reason=field(order.response, 'error_response', order.response))
+            return None
+        log.info("order", "✅ {side} order placed successfully!\n   Order ID: {order_id}", product_id=PRODUCT_ID,
+                 side=side.upper(), amount=amount, client_order_id=order.client_order_id,
+                 order_id=order.order_id or 'Unknown')
+        return order.response
         
     except Exception as e:
-        print(f"❌ Order failed: {e}")
+        log.error("order_error", "❌ Order failed: {error}", product_id=PRODUCT_ID, side=side.upper(), error=str(e))
         return None
 
 # === Get current price ===
@@ -234,41 +228,29 @@ def get_current_price():
     try:
         product = client.get_product(product_id=PRODUCT_ID)
         price = float(getattr(product, 'price', '0'))
-        print(f"💰 Current price: €{price:.2f}")
+        log.debug("price", "💰 Current price: €{price:.2f}", price=price)
         return price
     except Exception as e:
-        print(f"❌ Error getting price: {e}")
+        log.error("price_error", "❌ Error getting price: {error}", error=str(e))
         return 196.0  # Fallback price
 
 # === Get EUR balance ===
 def get_eur_balance():
     try:
-        accounts = client.get_accounts()
-        for account in accounts.accounts:
-            if getattr(account, 'currency', '') == 'EUR':
-                # Extract the available_balance dictionary and get the value
-                available_balance_obj = getattr(account, 'available_balance', {})
-                if hasattr(available_balance_obj, 'value'):
-                    available_balance = getattr(available_balance_obj, 'value', '0')
-                else:
-                    # If it's a dictionary, access it directly
-                    available_balance = available_balance_obj.get('value', '0') if isinstance(available_balance_obj, dict) else '0'
-                
-                balance = float(available_balance) if available_balance else 0.0
-                print(f"💰 EUR balance: €{balance:.2f}")
-                return balance
-        return 0.0
+        balance = accounts.balance('EUR')
+        log.debug("balance", "💰 EUR balance: €{balance:.2f}", currency="EUR", balance=balance)
+        return balance
     except Exception as e:
-        print(f"❌ Error checking EUR balance: {e}")
+        log.error("balance_error", "❌ Error checking EUR balance: {error}", currency="EUR", error=str(e))
         return 0.0
 
 # === Main trading loop ===
 def run_bot():
-    print(f"🚀 Starting LIVE Momentum Bot for {PRODUCT_ID}")
-    print(f"📈 Strategy: {FAST_MA}/{SLOW_MA} Moving Average Crossover")
-    print(f"💵 Minimum Trade Size: {MIN_TRADE_SIZE} SOL")
-    print(f"⏰ Check Interval: {SLEEP_TIME} seconds")
-    print("=" * 50)
+    log.info("start", "🚀 Starting LIVE Momentum Bot for {product_id}\n"
+             "📈 Strategy: {fast_ma}/{slow_ma} Moving Average Crossover\n"
+             "💵 Minimum Trade Size: {min_size} SOL\n⏰ Check Interval: {interval} seconds\n" + "=" * 50,
+             product_id=PRODUCT_ID, fast_ma=FAST_MA, slow_ma=SLOW_MA, min_size=MIN_TRADE_SIZE, interval=SLEEP_TIME)
+    orders.start()
     
     while True:
         try:
@@ -279,69 +261,70 @@ def run_bot():
             # Determine position (you're LONG since you have SOL)
             has_position = current_sol >= MIN_TRADE_SIZE
             
-            print(f"\n🕒 {time.strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"📊 Position: {'LONG' if has_position else 'FLAT'} ({current_sol:.6f} SOL)")
-            print(f"💰 Portfolio Value: €{current_sol * current_price:.2f}")
+            log.debug("tick", "\n🕒 {time}\n📊 Position: {position} ({sol:.6f} SOL)\n"
+                      "💰 Portfolio Value: €{value:.2f}",
+                      time=clock.strftime(), position='LONG' if has_position else 'FLAT', sol=current_sol,
+                      price=current_price, value=current_sol * current_price)
             
             # Get market data
             df = get_recent_data()
             if len(df) < SLOW_MA:
-                print(f"⚠️  Not enough data points. Have {len(df)}, need {SLOW_MA}")
-                time.sleep(SLEEP_TIME)
+                log.warning("not_enough_data", "⚠️  Not enough data points. Have {have}, need {need}",
+                            have=len(df), need=SLOW_MA)
+                clock.sleep(SLEEP_TIME)
                 continue
             
             # Calculate indicators
-            df["fast_ma"] = df["close"].rolling(FAST_MA).mean()
-            df["slow_ma"] = df["close"].rolling(SLOW_MA).mean()
-
-            last_fast = df["fast_ma"].iloc[-1]
-            last_slow = df["slow_ma"].iloc[-1]
+            indicators = engine_for(df, ("sma", FAST_MA), ("sma", SLOW_MA))
+            indicators.sync(df)
+            last_fast = indicators.sma(FAST_MA)
+            last_slow = indicators.sma(SLOW_MA)
 
-            print(f"📊 Fast MA: €{last_fast:.2f} | Slow MA: €{last_slow:.2f}")
+            log.debug("indicators", "📊 Fast MA: €{fast:.2f} | Slow MA: €{slow:.2f}", fast=last_fast, slow=last_slow)
 
             # === Strategy Logic ===
             if has_position:
                 # You have SOL - look for SELL signal
                 if last_fast < last_slow:
-                    print("🎯 SELL SIGNAL: Fast MA crossed below Slow MA!")
-                    print(f"💸 Selling {current_sol:.6f} SOL...")
+                    log.info("signal", "🎯 SELL SIGNAL: Fast MA crossed below Slow MA!\n💸 Selling {amount:.6f} SOL...",
+                             side="SELL", amount=current_sol, fast=last_fast, slow=last_slow, price=current_price)
                     if current_sol >= MIN_TRADE_SIZE:
                         place_order("SELL", current_sol)
                     else:
-                        print("❌ SOL balance below minimum trade size")
+                        log.warning("signal", "❌ SOL balance below minimum trade size", side="SELL", skipped=True)
                 else:
-                    print("💎 Holding SOL - waiting for sell signal...")
+                    log.debug("no_signal", "💎 Holding SOL - waiting for sell signal...")
                     
             else:
                 # You don't have SOL - look for BUY signal
                 eur_balance = get_eur_balance()
                 if last_fast > last_slow and eur_balance >= (MIN_TRADE_SIZE * current_price):
-                    print("🎯 BUY SIGNAL: Fast MA crossed above Slow MA!")
                     buy_amount = min(eur_balance, MIN_TRADE_SIZE * current_price)
-                    print(f"💸 Buying €{buy_amount:.2f} worth of SOL...")
+                    log.info("signal", "🎯 BUY SIGNAL: Fast MA crossed above Slow MA!\n"
+                             "💸 Buying €{amount:.2f} worth of SOL...",
+                             side="BUY", amount=buy_amount, fast=last_fast, slow=last_slow, price=current_price)
                     place_order("BUY", buy_amount)
                 elif last_fast > last_slow:
-                    print("🎯 BUY SIGNAL detected but insufficient EUR balance")
+                    log.warning("signal", "🎯 BUY SIGNAL detected but insufficient EUR balance",
+                                side="BUY", balance=eur_balance, skipped=True)
                 else:
-                    print("⚪ No buy signal - waiting...")
+                    log.debug("no_signal", "⚪ No buy signal - waiting...")
 
         except Exception as e:
-            print(f"⚠️  Error in main loop: {e}")
-            import traceback
-            traceback.print_exc()
+            log.error("loop_error", "⚠️  Error in main loop: {error}", error=str(e), traceback=traceback.format_exc())
 
-        print(f"😴 Sleeping for {SLEEP_TIME} seconds...")
-        time.sleep(SLEEP_TIME)
+        log.debug("sleep", "😴 Sleeping for {seconds} seconds...", seconds=SLEEP_TIME)
+        clock.sleep(SLEEP_TIME)
 
 # === Safety Checks ===
 def safety_checks():
     """Perform safety checks before starting"""
-    print("🔒 Performing safety checks...")
+    log.info("safety", "🔒 Performing safety checks...")
     
     # Check if we can access the API
     try:
-        accounts = client.get_accounts()
-        print("✅ API connection: OK")
+        accounts.refresh()
+        log.info("safety", "✅ API connection: OK")
     except Exception as e:
         raise Exception(f"❌ API connection failed: {e}")
     
@@ -349,7 +332,7 @@ def safety_checks():
     try:
         product = client.get_product(product_id=PRODUCT_ID)
         product_name = getattr(product, 'display_name', PRODUCT_ID)
-        print(f"✅ Product {PRODUCT_ID}: OK ({product_name})")
+        log.info("safety", "✅ Product {product_id}: OK ({name})", product_id=PRODUCT_ID, name=product_name)
     except Exception as e:
         raise Exception(f"❌ Product {PRODUCT_ID} not found: {e}")
     
@@ -358,33 +341,36 @@ def safety_checks():
     current_price = get_current_price()
     eur_balance = get_eur_balance()
     
-    print(f"💰 SOL Balance: {current_sol:.6f} SOL (€{current_sol * current_price:.2f})")
-    print(f"💰 EUR Balance: €{eur_balance:.2f}")
+    log.info("safety", "💰 SOL Balance: {sol:.6f} SOL (€{value:.2f})\n💰 EUR Balance: €{eur:.2f}",
+             sol=current_sol, value=current_sol * current_price, eur=eur_balance)
     
     if current_sol >= MIN_TRADE_SIZE:
-        print(f"✅ Ready to SELL {current_sol:.6f} SOL when signal appears")
+        log.info("safety", "✅ Ready to SELL {sol:.6f} SOL when signal appears", sol=current_sol)
     elif eur_balance >= (MIN_TRADE_SIZE * current_price):
-        print(f"✅ Ready to BUY with €{eur_balance:.2f} when signal appears")
+        log.info("safety", "✅ Ready to BUY with €{eur:.2f} when signal appears", eur=eur_balance)
     else:
-        print(f"⚠️  Low balances. Need €{MIN_TRADE_SIZE * current_price:.2f} EUR to buy, or {MIN_TRADE_SIZE} SOL to sell")
+        log.warning("safety", "⚠️  Low balances. Need €{eur:.2f} EUR to buy, or {sol} SOL to sell",
+                    eur=MIN_TRADE_SIZE * current_price, sol=MIN_TRADE_SIZE)
     
-    print("✅ Safety checks completed!")
+    log.info("safety", "✅ Safety checks completed!")
 
 # === Entry point ===
 if __name__ == "__main__":
     try:
         safety_checks()
-        print("\n" + "="*50)
+        log.info("start", "\n" + "=" * 50)
         if not PAPER_TRADING:
-            print("🚨 LIVE TRADING MODE - REAL MONEY AT RISK!")
-            print(f"💎 You have {get_current_position():.6f} SOL to trade")
+            log.warning("live", "🚨 LIVE TRADING MODE - REAL MONEY AT RISK!\n💎 You have {sol:.6f} SOL to trade",
+                        sol=get_current_position())
+            log.flush()  # Show everything before prompting
             confirmation = input("Type 'YES' to confirm you want to start LIVE trading: ")
             if confirmation != "YES":
-                print("❌ Trading cancelled.")
+                log.info("stop", "❌ Trading cancelled.")
+                log.flush()
                 exit()
         run_bot()
     except KeyboardInterrupt:
-        print("\n🛑 Bot stopped by user")
+        log.info("stop", "\n🛑 Bot stopped by user")
     except Exception as e:
-        print(f"\n💥 Fatal error: {e}")
+        log.error("fatal", "\n💥 Fatal error: {error}", error=str(e))
          
@@ -0,0 +1,204 @@
+import math
+import time
+from bisect import bisect_left, insort
+from order_manager import field
+
+# === Order book configuration ===
+BOOK_DEPTH = 100  # Levels per side requested for a REST snapshot
+BOOK_MAX_AGE = 5.0  # Seconds before a book no longer fed by the stream is refetched
+MAX_SLIPPAGE = 0.002  # Estimated market slippage (vs mid) above which a capped IOC limit order is sent
+LIMIT_FEE_BUFFER = 0.006  # Quote kept back from a limit buy's size for the taker fee
+
+
+class BookSide:
+    """Price levels of one side, best first.
+
+    Sizes live in a dict keyed by price; the prices are also kept in a sorted
+    list (negated for bids, so index 0 is always the best level). A size
+    change is a dict write; adding or removing a level is a binary search
+    plus one memmove, well under a microsecond for books of a few thousand
+    levels.
+    """
+    __slots__ = ("sign", "keys", "sizes")
+
+    def __init__(self, descending):
+        self.sign = -1.0 if descending else 1.0
+        self.keys = []  # sign * price, ascending
+        self.sizes = {}  # sign * price -> size
+
+    def __len__(self):
+        return len(self.keys)
+
+    def clear(self):
+        self.keys.clear()
+        self.sizes.clear()
+
+    def update(self, price, size):
+        key = self.sign * price
+        if size <= 0:
+            if self.sizes.pop(key, None) is not None:
+                del self.keys[bisect_left(self.keys, key)]
+        else:
+            if key not in self.sizes:
+                insort(self.keys, key)
+            self.sizes[key] = size
+
+    def best(self):
+        """(price, size) of the best level, or None"""
+        if not self.keys:
+            return None
+        key = self.keys[0]
+        return self.sign * key, self.sizes[key]
+
+    def levels(self, depth=None):
+        """[(price, size)] from the best level outwards"""
+        keys = self.keys if depth is None else self.keys[:depth]
+        return [(self.sign * key, self.sizes[key]) for key in keys]
+
+    def walk(self, base_size=None, quote_size=None):
+        """(base filled, quote spent, worst price) taking liquidity for a base or quote amount"""
+        filled = spent = 0.0
+        worst = None
+        for key in self.keys:
+            price, size = self.sign * key, self.sizes[key]
+            if base_size is not None:
+                take = min(size, base_size - filled)
+            else:
+                take = min(size, (quote_size - spent) / price)
+            filled += take
+            spent += take * price
+            worst = price
+            if (base_size is not None and filled >= base_size - 1e-12) or \
+                    (quote_size is not None and spent >= quote_size - 1e-9):
+                break
+        return filled, spent, worst
+
+
+class OrderBook:
+    """Local level-2 book of one product: a snapshot plus incremental updates.
+
+    Fed by stream.MarketStream's level2 subscription (apply_event) or by a
+    REST get_product_book snapshot (load_snapshot); estimate() walks it to
+    price a market order before it is sent.
+    """
+
+    def __init__(self, product_id):
+        self.product_id = product_id
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.updated_at = None  # Clock time of the last snapshot or update
+        self.updates = 0
+
+    # === Maintenance ===
+    def update(self, side, price, size):
+        """Set one level; side is "bid"/"BUY" or "offer"/"ask"/"SELL", size 0 removes it"""
+        book_side = self.bids if side in ("bid", "BUY", "buy") else self.asks
+        book_side.update(price, size)
+        self.updates += 1
+
+    def apply_snapshot(self, bids, asks, now=None):
+        """Replace the book with (price, size) levels"""
+        self.bids.clear()
+        self.asks.clear()
+        for price, size in bids:
+            self.bids.update(float(price), float(size))
+        for price, size in asks:
+            self.asks.update(float(price), float(size))
+        self.updated_at = now if now is not None else time.time()
+
+    def apply_event(self, event, now=None):
+        """Apply one event of the WebSocket level2 channel ("snapshot" or "update")"""
+        if event.get("type") == "snapshot":
+            self.bids.clear()
+            self.asks.clear()
+        update = self.update
+        for level in event.get("updates", ()):
+            update(level["side"], float(level["price_level"]), float(level["new_quantity"]))
+        self.updated_at = now if now is not None else time.time()
+
+    def load_snapshot(self, response, now=None):
+        """Replace the book with a REST get_product_book response (SDK object or JSON)"""
+        pricebook = field(response, 'pricebook', response)
+        levels = {name: [(field(level, 'price'), field(level, 'size')) for level in field(pricebook, name, None) or ()]
+                  for name in ("bids", "asks")}
+        self.apply_snapshot(levels["bids"], levels["asks"], now)
+        return self
+
+    def fresh(self, now, max_age=BOOK_MAX_AGE):
+        return self.updated_at is not None and now - self.updated_at <= max_age and bool(self.bids) \
+            and bool(self.asks)
+
+    # === Queries ===
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def mid(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        return (bid[0] + ask[0]) / 2 if bid and ask else None
+
+    def spread(self):
+        bid, ask = self.bids.best(), self.asks.best()
+        return ask[0] - bid[0] if bid and ask else None
+
+    def estimate(self, side, base_size=None, quote_size=None):
+        """Expected fill of a market order: average and worst price, slippage vs mid, and whether depth covers it"""
+        takes = self.asks if side == "BUY" else self.bids
+        filled, spent, worst = takes.walk(base_size=base_size, quote_size=quote_size)
+        mid = self.mid()
+        average = spent / filled if filled else None
+        complete = (filled >= base_size - 1e-12) if base_size is not None else (spent >= quote_size - 1e-9)
+        slippage = abs(average / mid - 1) if average and mid else None
+        return {"average_price": average, "worst_price": worst, "mid": mid, "slippage": slippage,
+                "filled_base": filled, "spent_quote": spent, "complete": complete}
+
+
+# === Order choice ===
+def market_configuration(side, amount):
+    """market_market_ioc spending `amount` quote on a BUY, selling `amount` base on a SELL"""
+    size_key = "quote_size" if side == "BUY" else "base_size"
+    return {"market_market_ioc": {size_key: str(amount)}}
+
+
+def round_down(value, increment):
+    return value if not increment else math.floor(value / increment + 1e-9) * increment
+
+
+def round_up(value, increment):
+    return value if not increment else math.ceil(value / increment - 1e-9) * increment
+
+
+def choose_order(book, side, amount, max_slippage=MAX_SLIPPAGE, price_increment=None, size_increment=None):
+    """(order_configuration, estimate) for a BUY of `amount` quote or a SELL of `amount` base.
+
+    A market order when the book says it fills within `max_slippage` of the
+    mid price; otherwise an immediate-or-cancel limit at mid -/+ max_slippage,
+    which takes what liquidity there is up to that price and cancels the
+    remainder, so nothing is left resting on the book between decisions.
+    """
+    estimate = book.estimate(side, quote_size=amount if side == "BUY" else None,
+                             base_size=amount if side == "SELL" else None)
+    if estimate["mid"] is None or (estimate["complete"] and estimate["slippage"] <= max_slippage):
+        return market_configuration(side, amount), estimate
+
+    if side == "BUY":
+        limit_price = round_down(estimate["mid"] * (1 + max_slippage), price_increment)
+        base_size = round_down(amount / (limit_price * (1 + LIMIT_FEE_BUFFER)), size_increment)
+    else:
+        limit_price = round_up(estimate["mid"] * (1 - max_slippage), price_increment)
+        base_size = round_down(amount, size_increment)
+    estimate["limit_price"] = limit_price
+    return {"sor_limit_ioc": {"base_size": f"{base_size:.10g}", "limit_price": f"{limit_price:.10g}"}}, estimate
+
+
+# === Shared book registry ===
+_books = {}
+
+
+def get_book(product_id):
+    """Return the persistent book for a product, creating it (empty) on first use"""
+    if product_id not in _books:
+        _books[product_id] = OrderBook(product_id)
+    return _books[product_id]
@@ -0,0 +1,227 @@
+import os
+import math
+import time
+import secrets
+import itertools
+import threading
+from eventlog import log
+
+# === Order manager configuration ===
+RECONCILE_INTERVAL = 0.5  # Seconds between fill reconciliation passes
+SUBMIT_RETRIES = 2  # Resends with the same client_order_id after a timeout
+TERMINAL_STATUSES = ("FILLED", "CANCELLED", "EXPIRED", "FAILED")
+
+
+def is_retryable(error):
+    """Timeouts and dropped connections, after which the order may or may not exist"""
+    import requests  # Already loaded by whichever client sent the order
+    return isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+
+
+def field(obj, key, default=None):
+    """Field of an SDK response object or a plain JSON dict"""
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+
+class OrderIdGenerator:
+    """Monotonic client_order_ids, unique across processes and restarts.
+
+    The prefix combines start time, pid and random bits; the suffix is a
+    per-process counter, so ids also sort in submission order.
+    """
+
+    def __init__(self):
+        self.prefix = f"{int(time.time()):x}{os.getpid():x}{secrets.token_hex(3)}"
+        self._counter = itertools.count(1)
+
+    def next(self):
+        return f"{self.prefix}-{next(self._counter):08d}"
+
+
+class OrderRecord:
+    __slots__ = ("client_order_id", "product_id", "side", "amount", "status", "order_id",
+                 "response", "submitted_at", "filled_size", "filled_value", "fees")
+
+    def __init__(self, client_order_id, product_id, side, amount, submitted_at):
+        self.client_order_id = client_order_id
+        self.product_id = product_id
+        self.side = side
+        self.amount = amount
+        self.status = "PENDING"
+        self.order_id = None
+        self.response = None
+        self.submitted_at = submitted_at
+        self.filled_size = 0.0
+        self.filled_value = 0.0
+        self.fees = 0.0
+
+
+class OrderManager:
+    """Tracks every order by client_order_id and reconciles fills in the background.
+
+    Resending after a timeout reuses the same client_order_id, which Coinbase
+    treats as the same order, so a retry can never double-submit. Fills are
+    applied to the account snapshot directly instead of refetching accounts.
+    """
+
+    def __init__(self, client, accounts=None, clock=None):
+        self.client = client
+        self.accounts = accounts
+        # Submission times are compared with the snapshot's fetch time, so share its clock
+        self.clock = clock or getattr(accounts, 'clock', time.monotonic)
+        self.ids = OrderIdGenerator()
+        self.orders = {}  # client_order_id -> OrderRecord
+        self.in_flight = {}  # exchange order_id -> OrderRecord awaiting a terminal status
+        self.positions = {}  # product_id -> {"size": base held, "cost": quote paid for it, fees included}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get(self, client_order_id):
+        return self.orders.get(client_order_id)
+
+    def submit(self, product_id, side, amount, send):
+        """Send an order through send(client_order_id), retrying timeouts idempotently.
+
+        Returns the OrderRecord, with the exchange reply in record.response.
+        """
+        record = OrderRecord(self.ids.next(), product_id, side, amount, self.clock())
+        self.orders[record.client_order_id] = record
+
+        for attempt in range(SUBMIT_RETRIES + 1):
+            try:
+                response = send(record.client_order_id)
+                break
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                if attempt == SUBMIT_RETRIES:
+                    record.status = "UNKNOWN"  # May or may not have reached the exchange
+                    raise
+                log.warning("order_retry", "⚠️  Order {client_order_id} timed out, resending: {error}",
+                            client_order_id=record.client_order_id, attempt=attempt + 1, error=str(e))
+
+        record.response = response
+        success_response = field(response, 'success_response') or {}
+        record.order_id = field(success_response, 'order_id') or field(response, 'order_id')
+        if field(response, 'success', False) and record.order_id:
+            record.status = "OPEN"
+            with self._lock:
+                self.in_flight[record.order_id] = record
+        else:
+            record.status = "REJECTED"
+        return record
+
+    def reconcile(self):
+        """Poll the status of every in-flight order in one request and apply fills"""
+        with self._lock:
+            order_ids = list(self.in_flight)
+        if not order_ids:
+            return 0
+
+        response = self.client.list_orders(order_ids=order_ids)
+        settled = 0
+        for order in field(response, 'orders') or []:
+            with self._lock:
+                record = self.in_flight.get(field(order, 'order_id'))
+            if record is None:
+                continue
+            record.status = field(order, 'status', record.status)
+            record.filled_size = float(field(order, 'filled_size') or 0)
+            record.filled_value = float(field(order, 'filled_value') or 0)
+            record.fees = float(field(order, 'total_fees') or 0)
+            if record.status in TERMINAL_STATUSES:
+                # A concurrent reconcile (background thread or settle()) may have settled it first
+                with self._lock:
+                    if self.in_flight.pop(record.order_id, None) is not record:
+                        continue
+                self._apply_fill(record)
+                settled += 1
+        return settled
+
+    def _apply_fill(self, record):
+        if record.filled_size == 0:
+            return
+        self._track_position(record)
+        if self.accounts is None:
+            return
+        base, quote = record.product_id.split('-')
+        sign = 1 if record.side == "BUY" else -1
+        self.accounts.adjust(base, sign * record.filled_size, since=record.submitted_at)
+        self.accounts.adjust(quote, -sign * record.filled_value - record.fees, since=record.submitted_at)
+
+    def open_orders(self, product_id):
+        """Orders of a product not yet known to be filled, cancelled or expired"""
+        with self._lock:
+            return [record for record in self.in_flight.values() if record.product_id == product_id]
+
+    def settle(self, product_id):
+        """Reconcile a product's open orders now and cancel what is still working; returns those left open"""
+        if not self.open_orders(product_id):
+            return []
+        self.reconcile()
+        working = [record.order_id for record in self.open_orders(product_id)]
+        if working:
+            log.warning("order_cancel", "⚠️  Cancelling {count} unfilled {product_id} orders", product_id=product_id,
+                        count=len(working), order_ids=working)
+            self.client.cancel_orders(order_ids=working)
+            self.reconcile()
+        return self.open_orders(product_id)
+
+    def _track_position(self, record):
+        """Average-cost position: buys add size and cost, sells release cost pro rata"""
+        with self._lock:
+            position = self.positions.setdefault(record.product_id, {"size": 0.0, "cost": 0.0})
+            if record.side == "BUY":
+                position["size"] += record.filled_size
+                position["cost"] += record.filled_value + record.fees
+            else:
+                kept = max(0.0, 1 - record.filled_size / position["size"]) if position["size"] else 0.0
+                position["size"] *= kept
+                position["cost"] *= kept
+
+    def cost_basis(self, product_id):
+        """Average price paid per unit of the tracked position, or None when flat"""
+        position = self.positions.get(product_id)
+        return position["cost"] / position["size"] if position and position["size"] > 0 else None
+
+    # === Checkpointing ===
+    def snapshot(self):
+        """Open orders and tracked positions, as plain JSON values"""
+        with self._lock:
+            return {"open_orders": [{"client_order_id": record.client_order_id, "order_id": record.order_id,
+                                     "product_id": record.product_id, "side": record.side, "amount": record.amount}
+                                    for record in self.in_flight.values()],
+                    "positions": {product_id: dict(position) for product_id, position in self.positions.items()}}
+
+    def restore(self, snapshot):
+        """Track the open orders and positions of a previous run; reconcile() settles what filled meanwhile"""
+        with self._lock:
+            for order in snapshot["open_orders"]:
+                # Any account listing fetched from now on already reflects their fills
+                record = OrderRecord(order["client_order_id"], order["product_id"], order["side"], order["amount"],
+                                     -math.inf)
+                record.order_id = order["order_id"]
+                record.status = "OPEN"
+                self.orders[record.client_order_id] = record
+                self.in_flight[record.order_id] = record
+            self.positions.update({product_id: dict(position)
+                                   for product_id, position in snapshot["positions"].items()})
+
+    # === Background reconciliation ===
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(RECONCILE_INTERVAL):
+            try:
+                self.reconcile()
+            except Exception as e:
+                log.error("reconcile_error", "⚠️  Order reconciliation failed: {error}", error=str(e))
+
+    def stop(self):
+        self._stop.set()
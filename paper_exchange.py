@@ -0,0 +1,300 @@
+import itertools
+import threading
+import numpy as np
+from types import SimpleNamespace
+from clock import ReplayClock, WallClock
+from backtest import FEE_RATE, SLIPPAGE, INITIAL_EUR
+from candle_store import GRANULARITY_SECONDS, MAX_CANDLES_PER_REQUEST, CANDLE_FIELDS
+
+# === Paper exchange configuration ===
+MAKER_FEE_RATE = 0.004  # Coinbase maker fee, charged on resting limit fills
+INITIAL_BALANCES = {"EUR": INITIAL_EUR}
+
+
+class SimulatedExchange:
+    """In-process stand-in for the Coinbase RESTClient used by the bots.
+
+    Implements get_candles, get_product, get_accounts, create_order and
+    list_orders with SDK-shaped responses. Balances move with every fill:
+    market orders fill at the last closed candle's close plus slippage,
+    limit orders rest (holding their funds) until a later candle trades
+    through their price.
+
+    Given `candles` ({product_id: columns}), it replays them on `clock`, by
+    default a ReplayClock spanning the candles, so a bot sleeping on that
+    clock runs as fast as it can compute. Given a live `market` client
+    instead, prices and candles come from the exchange and only accounts and
+    orders are simulated; any other attribute is forwarded to `market`.
+    """
+
+    def __init__(self, candles=None, granularity="ONE_MINUTE", balances=None, market=None,
+                 fee_rate=FEE_RATE, maker_fee_rate=MAKER_FEE_RATE, slippage=SLIPPAGE, start=None,
+                 clock=None, speed=None):
+        self.market = market
+        self.granularity = granularity
+        self.seconds = GRANULARITY_SECONDS[granularity]
+        self.candles = {product_id: {name: np.asarray(columns[name]) for name in CANDLE_FIELDS}
+                        for product_id, columns in (candles or {}).items()}
+        self.balances = dict(INITIAL_BALANCES if balances is None else balances)
+        self.holds = {}  # currency -> amount reserved by resting limit orders
+        self.fee_rate = fee_rate
+        self.maker_fee_rate = maker_fee_rate
+        self.slippage = slippage
+        self.orders = {}  # order_id -> order dict
+        self.resting = []  # order_ids of open limit orders
+        self.fills = 0
+        self.fees = 0.0
+        self._by_client_id = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()  # The order manager reconciles from its own thread
+
+        firsts = [int(columns["start"][0]) for columns in self.candles.values() if len(columns["start"])]
+        lasts = [int(columns["start"][-1]) for columns in self.candles.values() if len(columns["start"])]
+        self.end = max(lasts) + self.seconds if lasts else None
+        if clock is None:
+            if self.replaying:
+                start = start if start is not None else min(firsts) + self.seconds
+                clock = ReplayClock(start, end=self.end, speed=speed)
+            else:
+                clock = WallClock()
+        self.clock = clock
+        self._matched_until = self.now
+
+    def __getattr__(self, name):
+        market = self.__dict__.get("market")
+        if market is None:
+            raise AttributeError(name)
+        return getattr(market, name)
+
+    # === Clock ===
+    @property
+    def replaying(self):
+        return self.end is not None
+
+    @property
+    def now(self):
+        return int(self.clock.time())
+
+    def _sync(self):
+        """Fill resting orders against candles that closed since the last call (hold the lock)"""
+        if self.resting and (self.now != self._matched_until or not self.replaying):
+            self._match_resting()
+        self._matched_until = self.now
+
+    # === Market data ===
+    def _closed(self, product_id):
+        """Number of replayed candles that have closed by now"""
+        starts = self.candles[product_id]["start"]
+        return int(np.searchsorted(starts, self.now - self.seconds, side="right"))
+
+    def price(self, product_id):
+        if product_id in self.candles:
+            closed = self._closed(product_id)
+            if closed == 0:
+                raise ValueError(f"No {product_id} candles before {self.now}")
+            return float(self.candles[product_id]["close"][closed - 1])
+        return float(getattr(self.market.get_product(product_id=product_id), 'price', 0))
+
+    def get_candles(self, product_id, start, end, granularity=None, limit=None):
+        if product_id not in self.candles:
+            if self.market is None:
+                raise ValueError(f"Unknown product {product_id}")
+            kwargs = {"limit": limit} if limit is not None else {}
+            return self.market.get_candles(product_id=product_id, start=start, end=end,
+                                           granularity=granularity or self.granularity, **kwargs)
+        columns = self.candles[product_id]
+        starts = columns["start"]
+        first = int(np.searchsorted(starts, int(start)))
+        last = min(int(np.searchsorted(starts, int(end), side="right")), self._closed(product_id))
+        first = max(first, last - (limit or MAX_CANDLES_PER_REQUEST))
+        candles = [SimpleNamespace(**{name: str(columns[name][i]) for name in CANDLE_FIELDS})
+                   for i in range(last - 1, first - 1, -1)]  # Newest first, like Coinbase
+        return SimpleNamespace(candles=candles)
+
+    def get_product(self, product_id):
+        if product_id not in self.candles:
+            return self.market.get_product(product_id=product_id)
+        return SimpleNamespace(product_id=product_id, price=str(self.price(product_id)),
+                               display_name=product_id.replace('-', '/'))
+
+    # === Accounts ===
+    def get_accounts(self, limit=None, cursor=None):
+        with self._lock:
+            self._sync()
+            accounts = [SimpleNamespace(currency=currency,
+                                        available_balance={"value": str(balance - self.holds.get(currency, 0.0)),
+                                                           "currency": currency},
+                                        hold={"value": str(self.holds.get(currency, 0.0)), "currency": currency})
+                        for currency, balance in self.balances.items()]
+        return SimpleNamespace(accounts=accounts, has_next=False, cursor="", size=len(accounts))
+
+    def _available(self, currency):
+        return self.balances.get(currency, 0.0) - self.holds.get(currency, 0.0)
+
+    def _credit(self, currency, amount):
+        self.balances[currency] = self.balances.get(currency, 0.0) + amount
+
+    # === Orders ===
+    def create_order(self, client_order_id, product_id, side, order_configuration):
+        """Fill a market order at once or rest a limit order; resending a client_order_id is a no-op"""
+        with self._lock:
+            self._sync()
+            if client_order_id in self._by_client_id:
+                return self._response(self.orders[self._by_client_id[client_order_id]])
+
+            base, quote = product_id.split('-')
+            order = {"order_id": f"paper-{next(self._ids)}", "client_order_id": client_order_id,
+                     "product_id": product_id, "side": side, "status": "OPEN",
+                     "filled_size": 0.0, "filled_value": 0.0, "total_fees": 0.0, "error": None}
+            self._by_client_id[client_order_id] = order["order_id"]
+            self.orders[order["order_id"]] = order
+
+            if "market_market_ioc" in order_configuration:
+                config = order_configuration["market_market_ioc"]
+                price = self.price(product_id)
+                if side == "BUY":
+                    spend = float(config["quote_size"])
+                    if spend > self._available(quote) + 1e-9:
+                        order["error"] = "INSUFFICIENT_FUND"
+                    else:
+                        fill_price = price * (1 + self.slippage)
+                        fee = spend * self.fee_rate
+                        self._fill(order, (spend - fee) / fill_price, fill_price, fee)
+                else:
+                    size = float(config["base_size"])
+                    if size > self._available(base) + 1e-9:
+                        order["error"] = "INSUFFICIENT_FUND"
+                    else:
+                        fill_price = price * (1 - self.slippage)
+                        self._fill(order, size, fill_price, size * fill_price * self.fee_rate)
+            elif "sor_limit_ioc" in order_configuration:
+                # Fills in full at once if the price is within the limit, else is cancelled unfilled
+                config = order_configuration["sor_limit_ioc"]
+                limit, size = float(config["limit_price"]), float(config["base_size"])
+                price = self.price(product_id)
+                fill_price = price * (1 + self.slippage) if side == "BUY" else price * (1 - self.slippage)
+                fee = size * fill_price * self.fee_rate
+                if (side == "BUY" and size * fill_price + fee > self._available(quote) + 1e-9) or \
+                        (side == "SELL" and size > self._available(base) + 1e-9):
+                    order["error"] = "INSUFFICIENT_FUND"
+                elif (fill_price <= limit) if side == "BUY" else (fill_price >= limit):
+                    self._fill(order, size, fill_price, fee)
+                else:
+                    order["status"] = "CANCELLED"
+            elif "limit_limit_gtc" in order_configuration:
+                config = order_configuration["limit_limit_gtc"]
+                order["limit_price"] = float(config["limit_price"])
+                order["base_size"] = float(config["base_size"])
+                currency, amount = ((quote, order["base_size"] * order["limit_price"] * (1 + self.maker_fee_rate))
+                                    if side == "BUY" else (base, order["base_size"]))
+                if amount > self._available(currency) + 1e-9:
+                    order["error"] = "INSUFFICIENT_FUND"
+                else:
+                    order["hold"] = (currency, amount)
+                    self.holds[currency] = self.holds.get(currency, 0.0) + amount
+                    self.resting.append(order["order_id"])
+                    if not self.replaying:
+                        self._sync()
+            else:
+                order["error"] = "UNSUPPORTED_ORDER_CONFIGURATION"
+
+            if order["error"]:
+                order["status"] = "FAILED"
+            return self._response(order)
+
+    def _fill(self, order, size, price, fee):
+        base, quote = order["product_id"].split('-')
+        value = size * price
+        if order["side"] == "BUY":
+            self._credit(base, size)
+            self._credit(quote, -value - fee)
+        else:
+            self._credit(base, -size)
+            self._credit(quote, value - fee)
+        order.update(status="FILLED", filled_size=size, filled_value=value, total_fees=fee)
+        self.fills += 1
+        self.fees += fee
+
+    def _match_resting(self):
+        """Fill resting limit orders that candles closed since the last match traded through"""
+        still_resting = []
+        for order_id in self.resting:
+            order = self.orders[order_id]
+            if order["status"] != "OPEN":
+                continue
+            product_id = order["product_id"]
+            if product_id in self.candles:
+                columns = self.candles[product_id]
+                first = int(np.searchsorted(columns["start"], self._matched_until - self.seconds, side="right"))
+                last = self._closed(product_id)
+                lows, highs, opens = (columns[name][first:last] for name in ("low", "high", "open"))
+            else:
+                lows = highs = opens = np.array([self.price(product_id)])
+
+            limit = order["limit_price"]
+            crossed = np.flatnonzero(lows <= limit if order["side"] == "BUY" else highs >= limit)
+            if len(crossed) == 0:
+                still_resting.append(order_id)
+                continue
+            # A candle opening through the limit fills at its (better) open
+            opened = opens[crossed[0]]
+            price = min(limit, opened) if order["side"] == "BUY" else max(limit, opened)
+            currency, amount = order.pop("hold")
+            self.holds[currency] -= amount
+            size = order["base_size"]
+            self._fill(order, size, price, size * price * self.maker_fee_rate)
+        self.resting = still_resting
+
+    def cancel_orders(self, order_ids):
+        with self._lock:
+            self._sync()
+            results = []
+            for order_id in order_ids:
+                order = self.orders.get(order_id)
+                success = order is not None and order["status"] == "OPEN"
+                if success:
+                    order["status"] = "CANCELLED"
+                    currency, amount = order.pop("hold")
+                    self.holds[currency] -= amount
+                    self.resting.remove(order_id)
+                results.append({"success": success, "order_id": order_id})
+        return SimpleNamespace(results=results)
+
+    def _response(self, order):
+        if order["error"]:
+            return SimpleNamespace(success=False, order_id=order["order_id"],
+                                   error_response={"error": order["error"], "product_id": order["product_id"]})
+        return SimpleNamespace(success=True, order_id=order["order_id"],
+                               success_response={"order_id": order["order_id"], "product_id": order["product_id"],
+                                                 "side": order["side"], "client_order_id": order["client_order_id"]})
+
+    def _order_view(self, order):
+        filled_size = order["filled_size"]
+        return SimpleNamespace(
+            order_id=order["order_id"], client_order_id=order["client_order_id"],
+            product_id=order["product_id"], side=order["side"], status=order["status"],
+            filled_size=str(filled_size), filled_value=str(order["filled_value"]),
+            total_fees=str(order["total_fees"]),
+            average_filled_price=str(order["filled_value"] / filled_size if filled_size else 0),
+        )
+
+    def get_order(self, order_id):
+        with self._lock:
+            self._sync()
+            return SimpleNamespace(order=self._order_view(self.orders[order_id]))
+
+    def list_orders(self, order_ids=None, **kwargs):
+        with self._lock:
+            self._sync()
+            orders = [self.orders[order_id] for order_id in (order_ids or self.orders) if order_id in self.orders]
+            return SimpleNamespace(orders=[self._order_view(order) for order in orders], has_next=False, cursor="")
+
+    # === Reporting ===
+    def summary(self, quote="EUR"):
+        """Balances, fills, fees and total equity in the quote currency at current prices"""
+        equity = self.balances.get(quote, 0.0)
+        for product_id in self.candles:
+            base, product_quote = product_id.split('-')
+            if product_quote == quote:
+                equity += self.balances.get(base, 0.0) * self.price(product_id)
+        return {"balances": dict(self.balances), "fills": self.fills, "fees": self.fees, "equity": equity}
@@ -0,0 +1,193 @@
+import time
+import threading
+from concurrent.futures import Future
+from metrics import metrics
+from eventlog import log
+
+# === Rate limit configuration ===
+# Coinbase Advanced Trade allows about 30 private requests per second per user.
+ACCOUNT_RATE = 30.0
+ENDPOINT_CLASSES = {
+    # class: (requests per second, burst, priority - lower goes first)
+    "orders": (30.0, 10, 0),
+    "accounts": (10.0, 5, 1),
+    "market": (20.0, 10, 2),
+}
+ENDPOINTS = {
+    "create_order": "orders",
+    "cancel_orders": "orders",
+    "edit_order": "orders",
+    "get_order": "orders",
+    "list_orders": "orders",
+    "get_accounts": "accounts",
+    "get_account": "accounts",
+    "get_candles": "market",
+    "get_product": "market",
+    "get_products": "market",
+    "get_best_bid_ask": "market",
+    "get_product_book": "market",
+    "get_market_trades": "market",
+}
+READ_ONLY_CLASSES = ("accounts", "market")  # Identical in-flight calls of these are shared
+MAX_RETRIES = 4
+BACKOFF_START = 0.5  # Seconds paused after the first 429
+MIN_RATE_FACTOR = 0.1  # Adaptive rate never drops below this share of the limit
+RECOVERY_STEP = 0.02  # Share of the limit regained per successful request
+
+
+def is_rate_limited(error):
+    status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status == 429 or '429' in str(error) or 'Too Many Requests' in str(error)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _fill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until one token is available"""
+        self._fill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def slow_down(self):
+        self.rate = max(self.max_rate * MIN_RATE_FACTOR, self.rate / 2)
+
+    def recover(self):
+        self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+
+class RequestScheduler:
+    """Token-bucket budgets per endpoint class under one account-wide budget.
+
+    Waiting order requests always go before account and market-data reads,
+    identical read requests already in flight are shared, and a 429 halves the
+    request rate and pauses everyone with exponential backoff.
+    """
+
+    def __init__(self, account_rate=ACCOUNT_RATE, classes=ENDPOINT_CLASSES):
+        self.account = TokenBucket(account_rate, int(account_rate))
+        self.buckets = {name: TokenBucket(rate, burst) for name, (rate, burst, _) in classes.items()}
+        self.priorities = {name: priority for name, (_, _, priority) in classes.items()}
+        self._waiting = {priority: 0 for priority in self.priorities.values()}
+        self._condition = threading.Condition()
+        self._paused_until = 0.0
+        self._backoff = BACKOFF_START
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+
+    def acquire(self, endpoint_class):
+        """Block until the request may be sent"""
+        priority = self.priorities[endpoint_class]
+        bucket = self.buckets[endpoint_class]
+        with self._condition:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    ahead = any(count for p, count in self._waiting.items() if p < priority)
+                    if ahead:
+                        self._condition.wait(0.05)
+                        continue
+                    wait = max(self._paused_until - now, self.account.wait_time(now), bucket.wait_time(now))
+                    if wait <= 0:
+                        self.account.take()
+                        bucket.take()
+                        return
+                    self._condition.wait(wait)
+            finally:
+                self._waiting[priority] -= 1
+                self._condition.notify_all()
+
+    def _on_success(self, endpoint_class):
+        with self._condition:
+            self.account.recover()
+            self.buckets[endpoint_class].recover()
+            self._backoff = BACKOFF_START
+
+    def _on_rate_limited(self, endpoint_class):
+        with self._condition:
+            self.account.slow_down()
+            self.buckets[endpoint_class].slow_down()
+            self._paused_until = max(self._paused_until, time.monotonic() + self._backoff)
+            self._backoff = min(self._backoff * 2, 30.0)
+
+    def call(self, endpoint_class, function, *args, **kwargs):
+        """Send one request through the budgets, retrying with backoff on 429"""
+        for attempt in range(MAX_RETRIES + 1):
+            with metrics.span("rate_limit_wait", endpoint_class=endpoint_class):
+                self.acquire(endpoint_class)
+            try:
+                result = function(*args, **kwargs)
+            except Exception as e:
+                if not is_rate_limited(e) or attempt == MAX_RETRIES:
+                    raise
+                metrics.count("rate_limited", endpoint_class=endpoint_class)
+                log.warning("rate_limited", "⏳ Rate limited on {endpoint_class}, backing off {backoff:.1f}s",
+                            endpoint_class=endpoint_class, backoff=self._backoff)
+                self._on_rate_limited(endpoint_class)
+                continue
+            self._on_success(endpoint_class)
+            return result
+
+    def call_shared(self, key, endpoint_class, function, *args, **kwargs):
+        """Like call(), but concurrent callers with the same key share one request"""
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            future.set_result(self.call(endpoint_class, function, *args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+        return future.result()
+
+
+class RateLimitedClient:
+    """Drop-in wrapper around RESTClient that routes every call through a scheduler"""
+
+    def __init__(self, client, scheduler=None):
+        self._client = client
+        self.scheduler = scheduler or RequestScheduler()
+
+    def __getattr__(self, name):
+        attribute = getattr(self._client, name)
+        if not callable(attribute):
+            return attribute
+        endpoint_class = ENDPOINTS.get(name, "market")
+
+        def timed(*args, **kwargs):
+            with metrics.span("api", endpoint=name):
+                try:
+                    return attribute(*args, **kwargs)
+                except Exception:
+                    metrics.count("api_errors", endpoint=name)
+                    raise
+
+        def scheduled(*args, **kwargs):
+            if endpoint_class in READ_ONLY_CLASSES:
+                key = (name, args, tuple(sorted(kwargs.items())))
+                try:
+                    hash(key)
+                except TypeError:
+                    return self.scheduler.call(endpoint_class, timed, *args, **kwargs)
+                return self.scheduler.call_shared(key, endpoint_class, timed, *args, **kwargs)
+            return self.scheduler.call(endpoint_class, timed, *args, **kwargs)
+        return scheduled
@@ -0,0 +1,173 @@
+import hmac
+import time
+import base64
+import hashlib
+import secrets
+import binascii
+import threading
+
+# === Signing configuration ===
+API_HOST = "api.coinbase.com"
+JWT_LIFETIME = 120  # Seconds a Coinbase JWT stays valid (the API rejects longer)
+JWT_REFRESH_MARGIN = 30  # Re-sign this many seconds before expiry
+
+
+def load_private_key(api_secret):
+    """Parse a CDP API secret (PEM EC key or base64 Ed25519 key) into a cryptography key object"""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ed25519
+
+    if api_secret.lstrip().startswith("-----BEGIN"):
+        return serialization.load_pem_private_key(api_secret.encode(), password=None)
+    try:
+        raw = base64.b64decode("".join(api_secret.split()), validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError("API secret is neither a PEM key nor valid base64")
+    if len(raw) not in (32, 64):
+        raise ValueError(f"Ed25519 key must decode to 32 or 64 bytes, got {len(raw)}")
+    return ed25519.Ed25519PrivateKey.from_private_bytes(raw[:32])
+
+
+def is_cdp_secret(api_secret):
+    """True for CDP secrets (PEM EC key or base64 Ed25519 key), False for legacy HMAC secrets.
+
+    Legacy secrets are base64 too, and decode to 64 bytes just like an
+    Ed25519 seed + public key, so a 64-byte secret only counts as Ed25519
+    when its second half is the public key of its first half.
+    """
+    if api_secret.lstrip().startswith("-----BEGIN"):
+        return True
+    try:
+        raw = base64.b64decode("".join(api_secret.split()), validate=True)
+    except (binascii.Error, ValueError):
+        return False
+    if len(raw) == 32:
+        return True
+    if len(raw) != 64:
+        return False
+    try:
+        from cryptography.hazmat.primitives.asymmetric import ed25519
+    except ImportError:
+        return False  # JWT signing needs cryptography anyway
+    public_key = ed25519.Ed25519PrivateKey.from_private_bytes(raw[:32]).public_key()
+    return public_key.public_bytes_raw() == raw[32:]
+
+
+class JwtSigner:
+    """Signs Advanced Trade requests with cached CDP JWTs.
+
+    The private key is parsed once, and the JWT for each "METHOD host/path"
+    is reused until it is within `refresh_margin` seconds of expiring, so a
+    request normally costs one dict lookup instead of an EC signature.
+    Safe to share between threads and event loops.
+    """
+
+    def __init__(self, api_key, api_secret, lifetime=JWT_LIFETIME, refresh_margin=JWT_REFRESH_MARGIN,
+                 host=API_HOST, clock=time.time):
+        self.api_key = api_key
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self.host = host
+        self.clock = clock
+        self.signed = 0  # JWTs actually signed, as opposed to served from the cache
+        self._secret = api_secret
+        self._key = None
+        self._algorithm = None
+        self._tokens = {}  # uri -> (token, expires)
+        self._lock = threading.Lock()
+
+    def _load(self):
+        import jwt
+        from cryptography.hazmat.primitives.asymmetric import ec
+        key = load_private_key(self._secret)
+        self._algorithm = "ES256" if isinstance(key, ec.EllipticCurvePrivateKey) else "EdDSA"
+        self._encode = jwt.encode
+        self._key = key
+        self._secret = None  # Only the parsed key is kept
+
+    def _sign(self, uri, now):
+        if self._key is None:
+            self._load()
+        issued = int(now)
+        payload = {"sub": self.api_key, "iss": "cdp", "nbf": issued, "exp": issued + self.lifetime, "uri": uri}
+        token = self._encode(payload, self._key, algorithm=self._algorithm,
+                             headers={"kid": self.api_key, "nonce": secrets.token_hex()})
+        self.signed += 1
+        return token, issued + self.lifetime
+
+    def token(self, method, path):
+        """Bearer JWT for `method path`, signed only when the cached one is about to expire"""
+        uri = f"{method} {self.host}{path.split('?')[0]}"
+        now = self.clock()
+        cached = self._tokens.get(uri)
+        if cached is not None and now < cached[1] - self.refresh_margin:
+            return cached[0]
+        with self._lock:
+            cached = self._tokens.get(uri)
+            if cached is None or now >= cached[1] - self.refresh_margin:
+                cached = self._tokens[uri] = self._sign(uri, now)
+            return cached[0]
+
+    def headers(self, method, path, body=""):
+        return {"Authorization": f"Bearer {self.token(method, path)}", "Content-Type": "application/json"}
+
+    def prewarm(self, routes):
+        """Sign the JWTs for (method, path) routes ahead of the first request"""
+        for method, path in routes:
+            self.token(method, path)
+
+    def refresh(self):
+        """Re-sign every cached JWT that is due, so requests never wait on a signature"""
+        now = self.clock()
+        for uri, (_, expires) in list(self._tokens.items()):
+            if now >= expires - self.refresh_margin:
+                method, _, path = uri.partition(f" {self.host}")
+                self.token(method, path)
+
+
+class HmacSigner:
+    """Signs legacy key/secret/passphrase requests (CB-ACCESS-* headers).
+
+    An HMAC covers the timestamp and body, so it can't be reused across
+    requests; the secret is decoded once and each request copies a keyed
+    SHA-256 state instead of rebuilding it.
+    """
+
+    def __init__(self, api_key, api_secret, passphrase=None, clock=time.time):
+        self.clock = clock
+        self._mac = hmac.new(base64.b64decode(api_secret), digestmod=hashlib.sha256)
+        self._static = {"CB-ACCESS-KEY": api_key, "Content-Type": "application/json"}
+        if passphrase:
+            self._static["CB-ACCESS-PASSPHRASE"] = passphrase
+
+    def sign(self, message):
+        mac = self._mac.copy()
+        mac.update(message.encode())
+        return base64.b64encode(mac.digest()).decode()
+
+    def headers(self, method, path, body=""):
+        timestamp = str(int(self.clock()))
+        headers = dict(self._static)
+        headers["CB-ACCESS-SIGN"] = self.sign(f"{timestamp}{method}{path}{body}")
+        headers["CB-ACCESS-TIMESTAMP"] = timestamp
+        return headers
+
+    def prewarm(self, routes):
+        pass
+
+    def refresh(self):
+        pass
+
+
+_signers = {}
+_signers_lock = threading.Lock()
+
+
+def shared_signer(api_key, api_secret, passphrase=None):
+    """One signer per API key for the whole process, picked from the secret's format (see is_cdp_secret)"""
+    with _signers_lock:
+        signer = _signers.get(api_key)
+        if signer is None:
+            signer = _signers[api_key] = (JwtSigner(api_key, api_secret) if is_cdp_secret(api_secret)
+                                          else HmacSigner(api_key, api_secret, passphrase))
+        return signer
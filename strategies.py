@@ -0,0 +1,148 @@
+import functools
+import numpy as np
+from candle_store import PRICE_COLUMNS
+from indicators import indicator_arrays
+
+# === Signal values ===
+LONG = 1  # Be long from this bar on
+FLAT = -1  # Be flat from this bar on
+HOLD = 0  # Keep whatever position is held
+
+
+def jit(function):
+    """Compile a per-bar loop with Numba on first call when it is installed, else run it as Python"""
+    compiled = None
+
+    @functools.wraps(function)
+    def call(*args):
+        nonlocal compiled
+        if compiled is None:
+            try:
+                from numba import njit
+                compiled = njit(cache=True)(function)
+            except ImportError:
+                compiled = function
+        return compiled(*args)
+    return call
+
+
+def hold_state(regime):
+    """Long (True) / flat per bar from a LONG/FLAT/HOLD regime, HOLD carrying the last call forward"""
+    regime = np.asarray(regime)
+    index = np.where(regime != HOLD, np.arange(regime.shape[-1]), -1)
+    np.maximum.accumulate(index, axis=-1, out=index)
+    last = np.take_along_axis(regime, np.maximum(index, 0), axis=-1)
+    return np.where(index >= 0, last, HOLD) == LONG
+
+
+def stack_candles(stores, length=None):
+    """Candle columns of several products as 2-D (products x bars) arrays over their last common bars"""
+    length = length or min(len(store["close"]) for store in stores)
+    return {name: np.stack([np.asarray(store[name][len(store[name]) - length:]) for store in stores])
+            for name in ("start",) + PRICE_COLUMNS}
+
+
+# === Strategy interface ===
+class Strategy:
+    """A trading rule over whole arrays of bars.
+
+    A strategy lists the (kind, window) `indicators` it needs and implements
+    regime(candles, values): candle columns and {(kind, window): array} in,
+    an int array of LONG/FLAT/HOLD per bar out. Arrays are 1-D for one
+    product or 2-D (products x bars) for many, so the same code drives
+    backtest(strategy=...), a batch over many products (state()) and the
+    live loops (signal() / signals()), which evaluate it on the newest bar only.
+    Strategies whose regime depends on earlier bars (per-bar state) set
+    `stateless = False` and are evaluated over the whole window live.
+    """
+    name = "strategy"
+    indicators = ()
+    stateless = True
+
+    @property
+    def warmup(self):
+        """Bars needed before the first signal"""
+        return max((window for _, window in self.indicators), default=1)
+
+    def regime(self, candles, values):
+        raise NotImplementedError
+
+    def state(self, candles, values=None):
+        """Long/flat per bar (and per product for 2-D candles)"""
+        if values is None:
+            values = indicator_arrays(candles, self.indicators)
+        return hold_state(self.regime(candles, values))
+
+    def signal(self, candles, latest=None):
+        """LONG/FLAT/HOLD for the newest bar of a candle store.
+
+        `latest` holds the streaming indicator values for that bar
+        ({(kind, window): float}, as an IndicatorEngine keeps them).
+        """
+        return self.signals([candles], None if latest is None else [latest])[0]
+
+    def signals(self, stores, latest=None):
+        """LONG/FLAT/HOLD for the newest bar of each store, in one vectorized regime() call"""
+        if not self.stateless or latest is None:
+            candles = stack_candles(stores, min(len(store["close"]) for store in stores))
+            return self.regime(candles, indicator_arrays(candles, self.indicators))[:, -1].tolist()
+        candles = {name: np.array([[store[name][-1]] for store in stores], dtype=np.float64)
+                   for name in PRICE_COLUMNS}
+        values = {spec: np.array([[values[spec]] for values in latest], dtype=np.float64)
+                  for spec in self.indicators}
+        return self.regime(candles, values)[:, -1].tolist()
+
+    def __repr__(self):
+        return self.name
+
+
+# === Built-in strategies ===
+class MACrossover(Strategy):
+    """Long after the fast average crosses above the slow one, flat after it crosses below"""
+
+    def __init__(self, fast, slow, kind="sma"):
+        self.fast = (kind, fast)
+        self.slow = (kind, slow)
+        self.indicators = (self.fast, self.slow)
+        self.name = f"{kind.upper()} {fast}/{slow} crossover"
+
+    def regime(self, candles, values):
+        return np.sign(np.nan_to_num(values[self.fast] - values[self.slow])).astype(np.int8)
+
+
+@jit
+def _confirmed_regime(difference, confirm):
+    """LONG/FLAT once `difference` has kept its sign for `confirm` bars, per row"""
+    regime = np.zeros(difference.shape, dtype=np.int8)
+    for row in range(difference.shape[0]):
+        run = 0
+        for i in range(difference.shape[1]):
+            value = difference[row, i]
+            side = 1 if value > 0 else (-1 if value < 0 else 0)
+            if side == 0:
+                run = 0
+            elif run * side > 0:
+                run += side
+            else:
+                run = side
+            if abs(run) >= confirm:
+                regime[row, i] = side
+    return regime
+
+
+class ConfirmedCrossover(MACrossover):
+    """MA crossover that only acts once the fast average has stayed on one side for `confirm` bars"""
+    stateless = False
+
+    def __init__(self, fast, slow, confirm=3, kind="sma"):
+        super().__init__(fast, slow, kind)
+        self.confirm = confirm
+        self.name = f"{kind.upper()} {fast}/{slow} crossover, {confirm}-bar confirmation"
+
+    @property
+    def warmup(self):
+        return self.slow[1] + self.confirm - 1
+
+    def regime(self, candles, values):
+        difference = np.nan_to_num(values[self.fast] - values[self.slow])
+        return _confirmed_regime(np.atleast_2d(difference), self.confirm).reshape(difference.shape)
@@ -0,0 +1,229 @@
+import sys
+import json
+import time
+import asyncio
+import calendar
+from candle_store import GRANULARITY_SECONDS
+
+# === Stream configuration ===
+WS_URL = "wss://advanced-trade-ws.coinbase.com"
+FLUSH_INTERVAL = 1.0  # Seconds between checks for candles closed by the clock
+
+
+def trade_epoch(value):
+    """Epoch seconds of a feed timestamp like 2024-01-01T12:00:00.123456789Z"""
+    return calendar.timegm(time.strptime(value[:19], "%Y-%m-%dT%H:%M:%S"))
+
+
+# === Transports ===
+# A transport only needs connect/send/recv/close; recv returns None once the
+# feed has ended, so the same stream code runs live or against a replay.
+
+class WebSocketTransport:
+    """Live Coinbase Advanced Trade WebSocket feed (or any compatible server)"""
+
+    def __init__(self, url=WS_URL):
+        self.url = url
+        self._ws = None
+
+    async def connect(self):
+        import websockets
+        self._ws = await websockets.connect(self.url, max_size=None)
+
+    async def send(self, message):
+        await self._ws.send(message)
+
+    async def recv(self):
+        import websockets
+        try:
+            return await self._ws.recv()
+        except websockets.ConnectionClosed:
+            return None
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+
+
+class ReplayTransport:
+    """Plays back recorded feed messages (one JSON message per line) in-process"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+        self.sent = []
+
+    async def connect(self):
+        self._file = open(self.path)
+
+    async def send(self, message):
+        self.sent.append(message)
+
+    async def recv(self):
+        line = self._file.readline()
+        return line or None
+
+    async def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+# === Candle building ===
+class CandleBuilder:
+    """Builds candles for one product from individual trades.
+
+    A candle is emitted once; trades stamped in it or an earlier interval
+    that arrive after it closed (on a later trade or on the clock) are dropped.
+    """
+
+    def __init__(self, seconds=60):
+        self.seconds = seconds
+        self.current = None  # [start, low, high, open, close, volume]
+        self.closed_start = None  # Start of the last emitted candle
+
+    def add_trade(self, timestamp, price, size):
+        """Add a trade; returns the candle it closed, if any"""
+        start = timestamp - timestamp % self.seconds
+        if self.closed_start is not None and start <= self.closed_start:
+            return None  # Late trade for an already closed candle
+        candle = self.current
+        if candle is not None and start < candle[0]:
+            return None  # Late trade for an already closed candle
+        if candle is not None and start == candle[0]:
+            candle[1] = min(candle[1], price)
+            candle[2] = max(candle[2], price)
+            candle[4] = price
+            candle[5] += size
+            return None
+        self.current = [start, price, price, price, price, size]
+        return self._close(candle) if candle is not None else None
+
+    def flush(self, now):
+        """Close the current candle once its interval is over"""
+        candle = self.current
+        if candle is not None and now >= candle[0] + self.seconds:
+            self.current = None
+            return self._close(candle)
+        return None
+
+    def _close(self, candle):
+        self.closed_start = candle[0]
+        return tuple(candle)
+
+
+class MarketStream:
+    """Subscribes to market trades and calls on_candle(product_id, candle) on every close.
+
+    `clock` drives closing candles when no further trade arrives; pass None for
+    replays so candles close purely on trade time. Given `books`
+    ({product_id: OrderBook}), it also subscribes to level2 and keeps them current.
+    Candles are handed to on_candle one at a time, whether a trade or the
+    clock closed them.
+    """
+
+    def __init__(self, product_ids, on_candle, transport=None, granularity="ONE_MINUTE",
+                 clock=time.time, books=None):
+        self.product_ids = list(product_ids)
+        self.on_candle = on_candle
+        self.transport = transport or WebSocketTransport()
+        self.clock = clock
+        self.books = books
+        seconds = GRANULARITY_SECONDS[granularity]
+        self.builders = {product_id: CandleBuilder(seconds) for product_id in self.product_ids}
+        self._emitting = None  # asyncio.Lock, made on the running loop
+
+    async def run(self):
+        """Consume the feed until the transport ends"""
+        self._emitting = asyncio.Lock()
+        await self.transport.connect()
+        channels = ("market_trades", "heartbeats") + (("level2",) if self.books else ())
+        for channel in channels:
+            await self.transport.send(json.dumps({
+                "type": "subscribe",
+                "product_ids": self.product_ids,
+                "channel": channel,
+            }))
+
+        flusher = asyncio.create_task(self._flush_periodically()) if self.clock else None
+        try:
+            while True:
+                message = await self.transport.recv()
+                if message is None:
+                    break
+                await self.handle(message)
+            # Feed ended: whatever is still open is as complete as it gets
+            for product_id, builder in self.builders.items():
+                closed = builder.flush(float("inf"))
+                if closed:
+                    await self._emit(product_id, closed)
+        finally:
+            if flusher:
+                flusher.cancel()
+            await self.transport.close()
+
+    async def handle(self, message):
+        data = json.loads(message)
+        channel = data.get("channel")
+        if channel == "l2_data" and self.books:
+            now = self.clock() if self.clock else None
+            for event in data.get("events", []):
+                book = self.books.get(event.get("product_id"))
+                if book is not None:
+                    book.apply_event(event, now)
+            return
+        if channel != "market_trades":
+            return
+        for event in data.get("events", []):
+            for trade in event.get("trades", []):
+                builder = self.builders.get(trade.get("product_id"))
+                if builder is None:
+                    continue
+                closed = builder.add_trade(trade_epoch(trade["time"]),
+                                           float(trade["price"]), float(trade["size"]))
+                if closed:
+                    await self._emit(trade["product_id"], closed)
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            now = self.clock()
+            for product_id, builder in self.builders.items():
+                closed = builder.flush(now)
+                if closed:
+                    await self._emit(product_id, closed)
+
+    async def _emit(self, product_id, candle):
+        # The flusher and the message loop both close candles; never run two on_candle at once
+        async with self._emitting:
+            result = self.on_candle(product_id, candle)
+            if asyncio.iscoroutine(result):
+                await result
+
+
+# === Local replay server ===
+async def serve_replay(path, host="localhost", port=8765, delay=0.0):
+    """Serve a recorded feed over WebSocket so WebSocketTransport can be pointed at it"""
+    import websockets
+
+    async def handler(websocket):
+        await websocket.recv()  # Wait for the first subscribe
+        with open(path) as f:
+            for line in f:
+                await websocket.send(line.rstrip("\n"))
+                if delay:
+                    await asyncio.sleep(delay)
+
+    async with websockets.serve(handler, host, port):
+        print(f"📡 Replaying {path} on ws://{host}:{port}")
+        await asyncio.Future()
+
+
+# === Entry point ===
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python stream.py <recorded_feed.jsonl>")
+        sys.exit(1)
+    try:
+        asyncio.run(serve_replay(sys.argv[1]))
+    except KeyboardInterrupt:
+        print("\n🛑 Replay server stopped")
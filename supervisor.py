@@ -0,0 +1,142 @@
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+import momentum
+from candle_store import get_store
+from indicators import engine_for
+from metrics import metrics
+from strategies import FLAT, LONG
+from eventlog import log
+
+# === Supervisor configuration ===
+PRODUCT_IDS = ["SOL-EUR", "ETH-EUR", "BTC-EUR"]
+STRATEGY = momentum.STRATEGY
+QUOTE_AMOUNT = momentum.EUR_AMOUNT  # Quote currency spent per buy
+POSITION_VALUE = 0.15  # Quote value above which a product counts as long (~0.001 SOL)
+SLEEP_TIME = momentum.SLEEP_TIME
+WORKERS = 16  # Concurrent candle refreshes
+
+
+class ProductState:
+    """Everything the supervisor keeps per product"""
+    __slots__ = ("product_id", "base", "quote", "store", "bars", "indicators")
+
+    def __init__(self, product_id):
+        self.product_id = product_id
+        self.base, self.quote = product_id.split('-')
+        self.store = get_store(product_id, "ONE_MINUTE", capacity=momentum.minute_history())
+        self.bars = momentum.signal_candles(self.store)  # The store itself for ONE_MINUTE signals
+        self.indicators = engine_for(self.bars, *STRATEGY.indicators)
+
+
+def refresh_product(state):
+    """Fetch new candles (and depth) for one product and return its latest {(kind, window): value} indicators"""
+    momentum.refresh_book(state.product_id)
+    try:
+        with metrics.span("stage", stage="candles"):
+            state.store.refresh(momentum.client, now=momentum.clock.time())
+    except Exception as e:
+        metrics.count("candle_errors", product_id=state.product_id)
+        log.error("candle_error", "❌ {product_id} candle error: {error}", product_id=state.product_id, error=str(e))
+    momentum.signal_candles(state.store)  # Brings state.bars up to date
+    if len(state.bars) < STRATEGY.warmup:
+        return None
+    state.indicators.sync(state.bars)
+    return {spec: state.indicators.value(*spec) for spec in STRATEGY.indicators}
+
+
+def run_tick(states, pool):
+    """One supervisor pass: one account fetch, concurrent candle refreshes, then orders"""
+    # Products with an order still working are skipped, their balances are not final yet
+    pending = {state.product_id for state in states if momentum.orders.settle(state.product_id)}
+    balances = momentum.accounts.refresh()
+    latest = list(pool.map(refresh_product, states))
+    for i, (state, values) in enumerate(zip(states, latest)):
+        if state.product_id in pending:
+            log.warning("pending_orders", "⏳ {product_id}: orders still open, skipping", product_id=state.product_id)
+            latest[i] = None
+        elif values is None:
+            log.warning("not_enough_data", "⚠️  {product_id}: not enough data points", product_id=state.product_id)
+    ready = [(state, values) for state, values in zip(states, latest) if values is not None]
+    if not ready:
+        return 0
+    # Every product's signal in one vectorized strategy call
+    with metrics.span("stage", stage="signals"):
+        decisions = STRATEGY.signals([state.bars for state, _ in ready], [values for _, values in ready])
+
+    # Buys draw on the same quote balance, so spend it down as orders go out
+    available = dict(balances)
+    signals = 0
+    for (state, values), signal in zip(ready, decisions):
+        fields = {f"{kind}_{window}": value for (kind, window), value in values.items()}
+        held = available.get(state.base, 0.0)
+        long = held * state.store["close"][-1] > POSITION_VALUE
+
+        if signal == LONG and not long:
+            if available.get(state.quote, 0.0) >= QUOTE_AMOUNT:
+                order = momentum.place_order("BUY", QUOTE_AMOUNT, product_id=state.product_id,
+                                             signal_time=time.perf_counter())
+                log.info("signal", "🎯 {product_id} BUY: {amount:.2f} {currency}", product_id=state.product_id, side="BUY",
+                         amount=QUOTE_AMOUNT, currency=state.quote, **fields)
+                if order:
+                    available[state.quote] -= QUOTE_AMOUNT
+                    signals += 1
+            else:
+                log.warning("signal", "❌ {product_id} BUY signal but insufficient {currency}", product_id=state.product_id,
+                            side="BUY", currency=state.quote, skipped=True)
+        elif signal == FLAT and long:
+            order = momentum.place_order("SELL", held, product_id=state.product_id,
+                                         signal_time=time.perf_counter())
+            log.info("signal", "🎯 {product_id} SELL: {amount:.6f} {currency}", product_id=state.product_id, side="SELL",
+                     amount=held, currency=state.base, **fields)
+            if order:
+                available[state.base] = 0.0
+                signals += 1
+    return signals
+
+
+def run_supervisor(product_ids=PRODUCT_IDS):
+    log.info("start", "🚀 Starting Momentum Supervisor for {products} products\n"
+             "📈 Strategy: {strategy} on {granularity} bars\n"
+             "⏰ Check Interval: {interval} seconds\n" + "=" * 50,
+             products=len(product_ids), product_ids=list(product_ids), strategy=str(STRATEGY),
+             granularity=momentum.SIGNAL_GRANULARITY, interval=SLEEP_TIME)
+
+    momentum.start_metrics()
+    momentum.start_execution(product_ids)
+    states = [ProductState(product_id) for product_id in product_ids]
+    clock = momentum.clock
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        while True:
+            started = clock.time()
+            try:
+                with metrics.span("tick"):
+                    signals = run_tick(states, pool)
+                log.info("tick", "\n🕒 {time} checked {products} products, {orders} orders in {seconds:.2f}s",
+                         time=clock.strftime(), products=len(states), orders=signals, seconds=clock.time() - started)
+            except Exception as e:
+                metrics.count("loop_errors")
+                log.error("loop_error", "⚠️  Error in supervisor loop: {error}", error=str(e),
+                          traceback=traceback.format_exc())
+
+            if not clock.sleep(max(0.0, SLEEP_TIME - (clock.time() - started))):
+                break
+
+
+# === Entry point ===
+if __name__ == "__main__":
+    try:
+        momentum.safety_checks()
+        if not momentum.PAPER_TRADING:
+            log.warning("live", "🚨 LIVE TRADING MODE - REAL MONEY AT RISK!")
+            log.flush()  # Show everything before prompting
+            confirmation = input(f"Type 'YES' to start LIVE trading on {len(PRODUCT_IDS)} products: ")
+            if confirmation != "YES":
+                log.info("stop", "❌ Trading cancelled.")
+                log.flush()
+                exit()
+        run_supervisor()
+    except KeyboardInterrupt:
+        log.info("stop", "\n🛑 Supervisor stopped by user")
+    except Exception as e:
+        log.error("fatal", "\n💥 Fatal error: {error}", error=str(e))
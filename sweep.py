@@ -0,0 +1,99 @@
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from backtest import backtest, load_candles, FEE_RATE, INITIAL_EUR, SLIPPAGE
+from indicators import prefix_sums, sma_array
+from strategies import MACrossover
+
+# === Sweep grid ===
+FAST_RANGE = range(2, 31)
+SLOW_RANGE = range(5, 241, 5)
+THRESHOLDS = (0.001, 0.1, 0.25)  # SOL run_bot must hold to count as long; a fill at or below it is bought again
+TRADE_SIZES = (10.0, 25.0, 50.0)
+WORKERS = os.cpu_count()
+RESULTS_FILE = "sweep_results.csv"
+RESULT_COLUMNS = ("fast_ma", "slow_ma", "threshold", "eur_amount", "pnl", "max_drawdown",
+                  "round_trips", "win_rate", "fees", "ran_out_of_eur", "rebuys")
+
+# Candle history shared by every task in a worker process
+_close = None
+_cumsum = None
+
+
+def _init_worker(close):
+    """Load the history and its prefix sums once per worker"""
+    global _close, _cumsum
+    _close = close
+    _cumsum = prefix_sums(close)
+
+
+def _evaluate_pair(pair):
+    """Run every threshold/size combination for one (fast, slow) pair"""
+    fast_ma, slow_ma = pair
+    candles = {"close": _close}
+    strategy = MACrossover(fast_ma, slow_ma)
+    state = strategy.state(candles, {strategy.fast: sma_array(_close, fast_ma, _cumsum),
+                                     strategy.slow: sma_array(_close, slow_ma, _cumsum)})
+
+    # Thresholds below the smallest possible fill never trigger a re-buy, so they share one run
+    entries = np.flatnonzero(state & ~np.concatenate(([False], state[:-1])))
+    highest_entry = _close[entries].max() if len(entries) else np.inf
+
+    rows = []
+    for eur_amount in TRADE_SIZES:
+        smallest_fill = eur_amount * (1 - FEE_RATE) / (highest_entry * (1 + SLIPPAGE))
+        shared = None
+        for threshold in THRESHOLDS:
+            if threshold < smallest_fill and shared is not None:
+                summary = shared
+            else:
+                summary = backtest(candles, fast_ma, slow_ma, eur_amount, threshold,
+                                   initial_eur=INITIAL_EUR, state=state)["summary"]
+                if threshold < smallest_fill:
+                    shared = summary
+            rows.append((fast_ma, slow_ma, threshold, eur_amount, summary["pnl"],
+                         summary["max_drawdown"], summary["round_trips"], summary["win_rate"],
+                         summary["fees"], summary["ran_out_of_eur"], summary["rebuys"]))
+    return rows
+
+
+def run_sweep(close, workers=WORKERS):
+    """Evaluate the whole grid and return result rows ranked by PnL"""
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    pairs = [(fast, slow) for fast in FAST_RANGE for slow in SLOW_RANGE if fast < slow]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(close,)) as pool:
+        chunksize = max(1, len(pairs) // (4 * (workers or 1)))
+        results = [row for rows in pool.map(_evaluate_pair, pairs, chunksize=chunksize) for row in rows]
+
+    results.sort(key=lambda row: row[4], reverse=True)
+    return results
+
+
+def write_results(results, path=RESULTS_FILE):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("rank",) + RESULT_COLUMNS)
+        for rank, row in enumerate(results, start=1):
+            writer.writerow((rank,) + row)
+
+
+# === Entry point ===
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python sweep.py <archive series dir|candles.npz|candles.csv> [results.csv]")
+        sys.exit(1)
+    output = sys.argv[2] if len(sys.argv) == 3 else RESULTS_FILE
+
+    close = load_candles(sys.argv[1])["close"]
+    started = time.time()
+    results = run_sweep(close)
+    write_results(results, output)
+
+    print(f"✅ Evaluated {len(results)} combinations over {len(close)} candles "
+          f"in {time.time() - started:.1f}s")
+    print(f"🏆 Best: {dict(zip(RESULT_COLUMNS, results[0]))}")
+    print(f"📄 Ranked results written to {output}")
@@ -1,27 +1,16 @@
-import requests, time, hmac, hashlib, base64, os
-from datetime import datetime
+import requests, os
+from signing import shared_signer
 
 API_KEY = os.getenv("COINBASE_API_KEY")
 API_SECRET = os.getenv("COINBASE_API_SECRET")
 API_PASSPHRASE = os.getenv("COINBASE_API_PASSPHRASE")
 BASE_URL = "https://api.coinbase.com/api/v3/brokerage"  # Advanced Trade base URL
 
-def sign(message):
-    return base64.b64encode(
-        hmac.new(base64.b64decode(API_SECRET), message.encode(), hashlib.sha256).digest()
-    ).decode()
+# Secret decoded once; CDP keys (PEM or Ed25519) sign with cached JWTs, legacy key/secret pairs with HMAC
+signer = shared_signer(API_KEY, API_SECRET, API_PASSPHRASE)
 
 def headers(path, method="GET", body=""):
-    timestamp = str(int(time.time()))
-    prehash = f"{timestamp}{method}{path}{body}"
-    signature = sign(prehash)
-    return {
-        "CB-ACCESS-KEY": API_KEY,
-        "CB-ACCESS-SIGN": signature,
-        "CB-ACCESS-TIMESTAMP": timestamp,
-        "CB-ACCESS-PASSPHRASE": API_PASSPHRASE,
-        "Content-Type": "application/json",
-    }
+    return signer.headers(method, path, body)
 
 def get_accounts():
     r = requests.get(BASE_URL + "/accounts", headers=headers("/api/v3/brokerage/accounts"))
@@ -0,0 +1,333 @@
+import os
+import json
+import time
+import base64
+import shutil
+import asyncio
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import numpy as np
+import candle_store
+import momentum
+from account_snapshot import AccountSnapshot
+from backtest import backtest
+from bench import synthetic_candles
+from candle_archive import CandleArchive
+from clock import ReplayClock
+from eventlog import EventLog, log
+from lazy import Lazy
+from order_manager import OrderManager, field
+from paper_exchange import SimulatedExchange
+from signing import HmacSigner, JwtSigner, shared_signer
+import stream
+from stream import CandleBuilder, MarketStream, ReplayTransport
+
+# Offline checks against the paper exchange, the mock API server and recorded feeds.
+# Run with: python -m pytest -q test_offline.py (or python -m unittest test_offline)
+
+log.configure(path="", level="ERROR", echo=False)
+
+try:
+    import aiohttp  # noqa: F401
+    HAVE_AIOHTTP = True
+except ImportError:
+    HAVE_AIOHTTP = False
+
+try:
+    import cryptography  # noqa: F401
+    HAVE_CRYPTOGRAPHY = True
+except ImportError:
+    HAVE_CRYPTOGRAPHY = False
+
+
+@unittest.skipUnless(HAVE_AIOHTTP, "aiohttp is not installed")
+class AsyncClientTest(unittest.TestCase):
+    """AsyncAdvancedTradeClient against MockAdvancedTradeServer on a frozen paper exchange"""
+
+    def setUp(self):
+        self.candles = synthetic_candles(600)
+        clock = ReplayClock(int(self.candles["start"][-1]) + 60)
+        self.exchange = SimulatedExchange({"SOL-EUR": self.candles}, clock=clock, balances={"EUR": 100.0})
+
+    def run_with_client(self, scenario, signer=True):
+        from async_client import AsyncAdvancedTradeClient
+        from mock_server import MockAdvancedTradeServer
+
+        async def run():
+            server = await MockAdvancedTradeServer(self.exchange, port=0).start()
+            try:
+                signer_ = HmacSigner("key", base64.b64encode(b"secret").decode()) if signer else None
+                async with AsyncAdvancedTradeClient(base_url=server.url, signer=signer_) as client:
+                    return await scenario(client)
+            finally:
+                await server.stop()
+        return asyncio.run(run())
+
+    def test_accounts_products_and_candles(self):
+        now = self.exchange.now
+
+        async def scenario(client):
+            return await asyncio.gather(client.get_accounts(), client.get_product("SOL-EUR"),
+                                        client.get_candles_many(["SOL-EUR"] * 3, now - 300 * 60, now, "ONE_MINUTE"))
+        accounts, product, candles = self.run_with_client(scenario)
+
+        balances = {account.currency: float(account.available_balance.value) for account in accounts.accounts}
+        self.assertEqual(balances["EUR"], 100.0)
+        self.assertAlmostEqual(float(product.price), float(self.candles["close"][-1]))
+        self.assertEqual(len(candles["SOL-EUR"].candles), 300)
+        self.assertEqual(int(candles["SOL-EUR"].candles[0].start), int(self.candles["start"][-1]))
+
+    def test_market_order_fills_and_reconciles(self):
+        async def scenario(client):
+            order = await client.market_order_buy("client-1", "SOL-EUR", 10)
+            again = await client.market_order_buy("client-1", "SOL-EUR", 10)  # Same client_order_id
+            listed = await client.list_orders(order_ids=[order.order_id])
+            return order, again, listed
+        order, again, listed = self.run_with_client(scenario)
+
+        self.assertTrue(order.success)
+        self.assertEqual(again.order_id, order.order_id)
+        self.assertEqual(listed.orders[0].status, "FILLED")
+        self.assertEqual(self.exchange.fills, 1)
+        self.assertAlmostEqual(self.exchange.balances["EUR"], 90.0)
+
+    def test_unsigned_request_is_rejected(self):
+        from async_client import AdvancedTradeError
+
+        with self.assertRaises(AdvancedTradeError) as raised:
+            self.run_with_client(lambda client: client.get_accounts(), signer=False)
+        self.assertEqual(raised.exception.status, 401)
+
+
+def write_feed(path, trades, product_id="SOL-EUR"):
+    """Record (epoch, price, size) trades as market_trades messages, one per line"""
+    with open(path, "w") as f:
+        for epoch, price, size in trades:
+            stamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(epoch)) + ".250000Z"
+            f.write(json.dumps({"channel": "market_trades", "events": [{"type": "update", "trades": [
+                {"product_id": product_id, "price": str(price), "size": str(size), "time": stamp}]}]}) + "\n")
+
+
+class StreamTest(unittest.TestCase):
+    """MarketStream building candles from a recorded trade feed over ReplayTransport"""
+
+    def replay(self, trades, on_candle=None, clock=None):
+        emitted = []
+
+        async def record(product_id, candle):
+            emitted.append(candle)
+            if on_candle is not None:
+                await on_candle(candle)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "feed.jsonl")
+            write_feed(path, trades)
+            transport = ReplayTransport(path)
+            asyncio.run(MarketStream(["SOL-EUR"], record, transport, clock=clock).run())
+        return emitted, transport
+
+    def test_candles_close_on_trade_time(self):
+        emitted, transport = self.replay([(130, 10.0, 1.0), (150, 12.0, 2.0), (170, 9.0, 1.0),
+                                          (185, 11.0, 1.0), (250, 13.0, 0.5)])
+        self.assertEqual(emitted, [(120, 9.0, 12.0, 10.0, 9.0, 4.0), (180, 11.0, 11.0, 11.0, 11.0, 1.0),
+                                   (240, 13.0, 13.0, 13.0, 13.0, 0.5)])
+        channels = [json.loads(message)["channel"] for message in transport.sent]
+        self.assertEqual(channels, ["market_trades", "heartbeats"])
+
+    def test_late_trades_for_emitted_candles_are_dropped(self):
+        # 179 and 130 arrive after minute 120 closed; neither may re-emit or change it
+        emitted, _ = self.replay([(130, 10.0, 1.0), (185, 11.0, 1.0), (179, 50.0, 9.0), (130, 1.0, 9.0),
+                                  (200, 12.0, 1.0)])
+        self.assertEqual(emitted, [(120, 10.0, 10.0, 10.0, 10.0, 1.0), (180, 11.0, 12.0, 11.0, 12.0, 2.0)])
+
+    def test_late_trade_after_clock_flush_is_dropped(self):
+        builder = CandleBuilder(60)
+        builder.add_trade(130, 10.0, 1.0)
+        self.assertEqual(builder.flush(181), (120, 10.0, 10.0, 10.0, 10.0, 1.0))
+        self.assertIsNone(builder.add_trade(179, 50.0, 1.0))
+        self.assertIsNone(builder.flush(10 ** 9))
+
+    def test_clock_and_feed_closes_never_overlap(self):
+        active, overlaps = [0], []
+
+        async def slow_handler(candle):
+            active[0] += 1
+            overlaps.append(active[0])
+            await asyncio.sleep(0.02)  # Long enough for the flusher to fire meanwhile
+            active[0] -= 1
+
+        # A clock far ahead closes every candle the moment the flusher runs
+        with mock.patch.object(stream, "FLUSH_INTERVAL", 0.001):
+            emitted, _ = self.replay([(130, 10.0, 1.0), (185, 11.0, 1.0), (250, 12.0, 1.0)],
+                                     on_candle=slow_handler, clock=lambda: 10 ** 9)
+        self.assertEqual(max(overlaps), 1)
+        self.assertEqual([candle[0] for candle in emitted], [120, 180, 240])
+
+
+class CandleStoreTest(unittest.TestCase):
+    """CandleStore.refresh paging over a gap longer than one get_candles page"""
+
+    def test_refresh_pages_lose_no_candles(self):
+        candles = synthetic_candles(1200)
+        now = int(candles["start"][-1]) + 60
+        exchange = SimulatedExchange({"SOL-EUR": candles}, clock=ReplayClock(now))
+        store = candle_store.CandleStore("SOL-EUR", capacity=1000)
+        store.refresh(exchange, now)
+
+        np.testing.assert_array_equal(store["start"], candles["start"][-1000:])
+
+
+class ArchiveTest(unittest.TestCase):
+    """CandleArchive recovering from a compact() cut short at each step of the swap"""
+
+    def check_recovers(self, crash):
+        candles = synthetic_candles(300)
+        with tempfile.TemporaryDirectory() as directory:
+            archive = CandleArchive(directory)
+            archive.append("SOL-EUR", "ONE_MINUTE", candles)
+            day = os.path.join(archive.series_dir("SOL-EUR", "ONE_MINUTE"), archive.days("SOL-EUR")[0])
+            crash(day)
+
+            fresh = CandleArchive(directory)
+            np.testing.assert_array_equal(fresh.read("SOL-EUR")["close"], candles["close"])
+            self.assertEqual(sorted(os.listdir(os.path.dirname(day))), fresh.days("SOL-EUR"))
+            self.assertEqual(fresh.check("SOL-EUR"), [])
+
+    def test_crash_while_writing_the_copy(self):
+        self.check_recovers(lambda day: (os.makedirs(day + ".tmp"),
+                                         open(os.path.join(day + ".tmp", "start.bin"), "wb").close()))
+
+    def test_crash_between_the_renames(self):
+        self.check_recovers(lambda day: (shutil.copytree(day, day + ".tmp"), os.rename(day, day + ".old")))
+
+    def test_crash_before_removing_the_original(self):
+        self.check_recovers(lambda day: shutil.copytree(day, day + ".old"))
+
+
+class EventLogTest(unittest.TestCase):
+    """One malformed event never costs the rest of its batch"""
+
+    def test_bad_records_are_written_alongside_good_ones(self):
+        loop = []
+        loop.append(loop)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "events.jsonl")
+            events = EventLog(path=path, echo=False)
+            events.info("format_spec", "{price:.2f}", price=None)
+            events.info("attribute", "{order.missing}", order=1)
+            events.info("circular", "ok", fields=loop)
+            events.info("good", "sold {amount}", amount=2)
+            events.flush()
+            with open(path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+            events._file.close()
+
+        self.assertEqual([record["event"] for record in records], ["format_spec", "attribute", "circular", "good"])
+        self.assertEqual(records[0]["msg"], "{price:.2f}")
+        self.assertEqual(records[3]["msg"], "sold 2")
+
+
+class OrderManagerTest(unittest.TestCase):
+    """Fill reconciliation against the paper exchange"""
+
+    def test_concurrent_reconciles_apply_each_fill_once(self):
+        candles = synthetic_candles(300)
+        exchange = SimulatedExchange({"SOL-EUR": candles}, clock=ReplayClock(int(candles["start"][-1]) + 60),
+                                     balances={"EUR": 100.0})
+        accounts = AccountSnapshot(exchange)
+        accounts.refresh()
+        orders = OrderManager(exchange, accounts, clock=lambda: float("inf"))  # Submitted after the fetch
+        for _ in range(2):
+            orders.submit("SOL-EUR", "BUY", 10.0, lambda client_order_id: exchange.create_order(
+                client_order_id, "SOL-EUR", "BUY", {"market_market_ioc": {"quote_size": "10"}}))
+
+        # Both passes pick up the same in-flight orders before either settles them
+        barrier = threading.Barrier(2)
+
+        def slow_field(obj, key, default=None):
+            if key == 'status':
+                barrier.wait(timeout=5)
+            return field(obj, key, default)
+        with mock.patch("order_manager.field", slow_field):
+            threads = [threading.Thread(target=orders.reconcile) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertAlmostEqual(accounts.balances["SOL"], exchange.balances["SOL"])
+        self.assertAlmostEqual(accounts.balances["EUR"], exchange.balances["EUR"])
+        self.assertAlmostEqual(orders.positions["SOL-EUR"]["size"], exchange.balances["SOL"])
+        self.assertAlmostEqual(orders.positions["SOL-EUR"]["cost"], 20.0)
+        self.assertEqual(orders.in_flight, {})
+
+    def test_fill_older_than_listing_forces_refetch(self):
+        candles = synthetic_candles(300)
+        exchange = SimulatedExchange({"SOL-EUR": candles}, clock=ReplayClock(int(candles["start"][-1]) + 60),
+                                     balances={"EUR": 100.0})
+        now = [0.0]
+        accounts = AccountSnapshot(exchange, clock=lambda: now[0])
+        accounts.refresh()
+        orders = OrderManager(exchange, accounts)
+        orders.submit("SOL-EUR", "BUY", 10.0, lambda client_order_id: exchange.create_order(
+            client_order_id, "SOL-EUR", "BUY", {"market_market_ioc": {"quote_size": "10"}}))
+        now[0] = 1.0
+        accounts.refresh()  # Fetched after submission: may or may not include the fill
+        orders.reconcile()
+
+        self.assertTrue(accounts.stale)
+        self.assertAlmostEqual(accounts.balance("EUR"), exchange.balances["EUR"])
+        self.assertAlmostEqual(accounts.balance("SOL"), exchange.balances["SOL"])
+
+
+@unittest.skipUnless(HAVE_CRYPTOGRAPHY, "cryptography is not installed")
+class SignerTest(unittest.TestCase):
+    """shared_signer picks JWT or HMAC from the secret's format, not from the passphrase"""
+
+    def test_signer_follows_key_format(self):
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+        ed_key = ed25519.Ed25519PrivateKey.generate()
+        ed_secret = base64.b64encode(ed_key.private_bytes_raw() + ed_key.public_key().public_bytes_raw()).decode()
+        pem_secret = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()).decode()
+        legacy_secret = base64.b64encode(os.urandom(64)).decode()  # Same length as an Ed25519 secret
+
+        with mock.patch.dict("signing._signers", clear=True):
+            self.assertIsInstance(shared_signer("legacy", legacy_secret), HmacSigner)
+            self.assertIsInstance(shared_signer("ed25519", ed_secret), JwtSigner)
+            self.assertIsInstance(shared_signer("ec", pem_secret), JwtSigner)
+
+
+class ReplayTest(unittest.TestCase):
+    """run_bot replayed on the paper exchange trades exactly like the vectorized backtest"""
+
+    def test_run_bot_replay_matches_backtest(self):
+        candles = synthetic_candles(1500)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "candles.npz")
+            np.savez(path, **candles)
+            client = Lazy(momentum.initialize_client)
+            clock = Lazy(momentum.initialize_clock)
+            accounts = Lazy(lambda: AccountSnapshot(client, ttl=momentum.ACCOUNT_TTL, clock=clock.monotonic))
+            orders = Lazy(lambda: OrderManager(client, accounts))
+            with mock.patch.multiple(momentum, PAPER_TRADING=True, PAPER_REPLAY=path, METRICS_PORT=None,
+                                     METRICS_DUMP_INTERVAL=None, client=client, clock=clock, accounts=accounts,
+                                     orders=orders), \
+                    mock.patch.dict(candle_store._stores, clear=True):
+                try:
+                    momentum.run_bot()
+                finally:
+                    orders.stop()
+                summary = client.summary()
+
+        expected = backtest(candles)["summary"]
+        self.assertEqual(summary["fills"], expected["trades"])
+        self.assertAlmostEqual(summary["equity"], momentum.PAPER_BALANCES["EUR"] + expected["pnl"], places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
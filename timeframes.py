@@ -0,0 +1,110 @@
+import weakref
+import numpy as np
+from candle_store import GRANULARITY_SECONDS, CandleStore
+
+
+# === Bar aggregation ===
+class Timeframe:
+    """Bars of one higher granularity built incrementally from 1-minute candles.
+
+    The bar in progress is kept as the minutes already superseded (folded
+    into open/high/low/volume) plus the newest minute, which may still be
+    amended by the next refresh. Every minute therefore costs the same few
+    comparisons however long the bar is, and the bar is rewritten in `store`
+    in place until a minute of the next interval arrives.
+    """
+
+    def __init__(self, product_id, granularity, capacity=500):
+        self.seconds = GRANULARITY_SECONDS[granularity]
+        self.store = CandleStore(product_id, granularity, capacity)
+        self.bucket = None  # Start of the bar in progress
+        self.folded = None  # (open, high, low, volume) of its superseded minutes
+        self.latest = None  # Newest minute: (start, low, high, open, close, volume)
+
+    def push(self, start, low, high, open_, close, volume):
+        """Add or amend one minute; returns True if it started a new bar"""
+        latest = self.latest
+        if latest is not None and start < latest[0]:
+            return False  # Older than what we hold, already seen
+        bucket = start - start % self.seconds
+        new_bar = bucket != self.bucket
+        if new_bar:
+            self.bucket, self.folded = bucket, None
+        elif start != latest[0]:
+            # The previous minute is final now: fold it into the bar
+            _, l_low, l_high, l_open, _, l_volume = latest
+            folded = self.folded
+            self.folded = ((l_open, l_high, l_low, l_volume) if folded is None else
+                           (folded[0], max(folded[1], l_high), min(folded[2], l_low), folded[3] + l_volume))
+        self.latest = (start, low, high, open_, close, volume)
+
+        folded = self.folded
+        if folded is None:
+            self.store.append(bucket, low, high, open_, close, volume)
+        else:
+            self.store.append(bucket, min(folded[2], low), max(folded[1], high), folded[0], close, folded[3] + volume)
+        return new_bar
+
+
+class CandleAggregator:
+    """Higher-timeframe stores kept in step with one 1-minute store.
+
+    sync() feeds only the minutes added (or amended) since the last call, so
+    any number of timeframes costs no extra get_candles requests and constant
+    work per new minute. The oldest bar may be partial when the minute
+    history starts mid-interval.
+    """
+
+    def __init__(self, product_id, capacity=500):
+        self.product_id = product_id
+        self.capacity = capacity
+        self.timeframes = {}  # granularity -> Timeframe
+        self.last_start = None
+
+    def require(self, granularity):
+        timeframe = self.timeframes.get(granularity)
+        if timeframe is None:
+            timeframe = self.timeframes[granularity] = Timeframe(self.product_id, granularity, self.capacity)
+            self.last_start = None  # Replay the minute window for the new timeframe
+        return timeframe
+
+    def __getitem__(self, granularity):
+        return self.timeframes[granularity].store
+
+    def push(self, start, low, high, open_, close, volume):
+        """Add one minute candle to every timeframe (the streaming path)"""
+        for timeframe in self.timeframes.values():
+            timeframe.push(start, low, high, open_, close, volume)
+        self.last_start = start
+
+    def sync(self, store):
+        """Feed the minutes the store gained since the last sync, including the amended newest one"""
+        starts = store["start"]
+        if len(starts) == 0:
+            return
+        first = 0 if self.last_start is None else int(np.searchsorted(starts, self.last_start))
+        if first == len(starts):
+            return
+        lows, highs, opens, closes, volumes = (store[name][first:].tolist()
+                                               for name in ("low", "high", "open", "close", "volume"))
+        timeframes = list(self.timeframes.values())
+        for row in zip(starts[first:].tolist(), lows, highs, opens, closes, volumes):
+            for timeframe in timeframes:
+                timeframe.push(*row)
+        self.last_start = int(starts[-1])
+
+
+# === Aggregator registry ===
+_aggregators = weakref.WeakKeyDictionary()
+
+
+def timeframe_store(store, granularity, capacity=None):
+    """Up-to-date `granularity` bars derived from a 1-minute store (the store itself for ONE_MINUTE)"""
+    if granularity == store.granularity:
+        return store
+    aggregator = _aggregators.get(store)
+    if aggregator is None:
+        aggregator = _aggregators[store] = CandleAggregator(store.product_id, capacity or store.capacity)
+    aggregator.require(granularity)
+    aggregator.sync(store)
+    return aggregator[granularity]